@@ -0,0 +1 @@
+"""Analytics over the daily sentiment aggregates."""
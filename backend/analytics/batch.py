@@ -0,0 +1,69 @@
+"""Sentiment series of many keywords assembled from one grouped query.
+
+A comparison view used to request /api/sentiments once per keyword, each
+request opening a connection and scanning the articles again. The batch
+endpoint reads the daily rollups of all requested keywords with a single
+GROUP BY query and, if asked for, the latest articles of every keyword
+with a single windowed query, then splits both by keyword here.
+"""
+from typing import Any, Dict, List, Optional, Sequence
+
+# Keywords one batch request may ask for
+MAX_KEYWORDS = 50
+# Latest articles one batch request may return per keyword
+MAX_ARTICLES = 100
+
+
+def parse_list(value: Optional[str]) -> List[str]:
+    """Comma-separated values, stripped and de-duplicated in order."""
+    if not value:
+        return []
+    return list(dict.fromkeys(part.strip() for part in value.split(",") if part.strip()))
+
+
+def _mean(total: float, count: int) -> Optional[float]:
+    return round(total / count, 4) if count else None
+
+
+def build_batch(keywords: Sequence[str], daily_rows: List[Dict[str, Any]],
+                columns: Optional[List[str]] = None, article_rows: Optional[List[tuple]] = None) -> List[Dict[str, Any]]:
+    """One entry per requested keyword, in the order requested.
+
+    Args:
+        keywords: Requested keywords
+        daily_rows: Rows from Database.get_daily_aggregates for those keywords
+        columns: Column names of `article_rows`
+        article_rows: Rows from Database.get_latest_rows_per_keyword, if
+            articles were requested
+
+    Returns:
+        Entries with keyword, articles, avg_sentiment, series (date,
+        articles, avg_sentiment per day with data) and, with article_rows,
+        latest (column name -> value per article, newest first)
+    """
+    entries = {keyword: {"keyword": keyword, "articles": 0, "sentiment_sum": 0.0, "series": []}
+               for keyword in keywords}
+    for row in daily_rows:
+        entry = entries.get(row["keyword"])
+        if entry is None:
+            continue
+        articles = int(row["articles"] or 0)
+        total = row["sentiment_sum"] or 0.0
+        entry["articles"] += articles
+        entry["sentiment_sum"] += total
+        entry["series"].append({"date": row["day"], "articles": articles, "avg_sentiment": _mean(total, articles)})
+
+    if article_rows is not None:
+        keyword_index = columns.index("keyword")
+        for entry in entries.values():
+            entry["latest"] = []
+        for row in article_rows:
+            entry = entries.get(row[keyword_index])
+            if entry is not None:
+                entry["latest"].append(dict(zip(columns, row)))
+
+    result = []
+    for entry in entries.values():
+        entry["avg_sentiment"] = _mean(entry.pop("sentiment_sum"), entry["articles"])
+        result.append(entry)
+    return result
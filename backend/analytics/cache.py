@@ -0,0 +1,49 @@
+"""Result cache keyed on the database data generation."""
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class GenerationCache:
+    """Small LRU cache whose entries are valid for a single data generation.
+
+    Results are computed once per (key, generation). When the ETL stores new
+    data the generation counter moves and stale entries are recomputed on
+    their next access.
+    """
+
+    def __init__(self, max_entries: int = 128):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached results
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key: Hashable, generation: int, compute: Callable[[], Any]) -> Any:
+        """Return the cached result for `key`, computing it if stale or missing."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == generation:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = compute()
+
+        with self._lock:
+            self._entries[key] = (generation, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        """Drop every cached result."""
+        with self._lock:
+            self._entries.clear()
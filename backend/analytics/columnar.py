@@ -0,0 +1,373 @@
+"""In-memory columnar copy of the sentiment links for fast dashboard queries.
+
+SQLite remains the source of truth. The store keeps one NumPy array per
+column (one entry per article/keyword link) and answers trend, stats and
+count queries with vectorized masks instead of building a dict per row.
+
+Keeping in sync: every insert into ``article_keywords`` bumps the data
+generation by exactly one, so when the generation moved by as many steps
+as there are new link rows, appending those rows is enough. Any other
+difference means rows were updated or deleted and the store reloads.
+
+Snapshots: every API worker saves the store after a change, so each
+snapshot is written into its own directory under ``snapshot_path`` and
+published by atomically replacing the ``CURRENT`` pointer file. Readers
+only ever see a complete snapshot, and writers never share a file name.
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from database.db import Database
+
+COLUMNS = {
+    "rowid": np.int64,
+    "article_id": np.int64,
+    "ts": np.int64,
+    "keyword_id": np.int32,
+    "source_id": np.int16,
+    "score": np.float32,
+}
+
+SECONDS_PER_DAY = 86400
+
+# Pointer file naming the snapshot directory that is current
+SNAPSHOT_POINTER = "CURRENT"
+SNAPSHOT_PREFIX = "snapshot-"
+# Unpublished snapshot directories older than this are left over from
+# crashed or superseded writers and are removed
+SNAPSHOT_GRACE_SECONDS = 300
+
+LINK_QUERY = """
+SELECT ak.rowid, ak.article_id, CAST(strftime('%s', ak.created_at) AS INTEGER),
+       ak.keyword, a.source, a.sentiment_score
+FROM article_keywords ak
+JOIN articles a ON a.id = ak.article_id
+WHERE ak.rowid > ?
+ORDER BY ak.rowid
+"""
+
+
+def _day_to_ts(day: str) -> int:
+    """Epoch seconds at 00:00 UTC of a YYYY-MM-DD date."""
+    return int(datetime.strptime(day[:10], "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp())
+
+
+class ColumnarStore:
+    """Columnar cache of (timestamp, keyword, source, score) per link."""
+
+    def __init__(self, db: Database = None, snapshot_path: Optional[str] = None):
+        """Initialize an empty store.
+
+        Args:
+            db: Database to mirror. Creates new one if not provided.
+            snapshot_path: Directory for the memory-mapped snapshot, if any
+        """
+        self.db = db or Database()
+        self.snapshot_path = snapshot_path
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS.items()
+        }
+        self.keywords: List[str] = []
+        self.sources: List[str] = []
+        self._keyword_ids: Dict[str, int] = {}
+        self._source_ids: Dict[str, int] = {}
+        self.generation = -1
+        self.last_rowid = 0
+        self._article_mask: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.columns["rowid"])
+
+    # --- Loading and syncing ---
+
+    def load(self):
+        """Load from the snapshot if one exists, otherwise from SQLite."""
+        with self._lock:
+            if not (self.snapshot_path and self._load_snapshot()):
+                self.reload()
+            self.sync()
+
+    def reload(self):
+        """Rebuild the store from scratch."""
+        with self._lock:
+            self._reset()
+            self._append_since_last(full=True)
+            self._save_snapshot()
+
+    def sync(self) -> int:
+        """Bring the store up to date with the database.
+
+        Returns:
+            Number of rows appended, or -1 if a full reload was needed
+        """
+        with self._lock:
+            generation = self.db.get_data_generation()
+            if generation == self.generation:
+                return 0
+            appended = self._append_since_last()
+            if self.generation != generation:
+                print(f"Columnar store: data rewritten (generation {generation}), reloading")
+                self.reload()
+                return -1
+            if appended:
+                self._save_snapshot()
+            return appended
+
+    def _append_since_last(self, full: bool = False) -> int:
+        with self.db.get_connection() as conn:
+            # One read transaction so the generation matches the rows we read
+            conn.execute("BEGIN")
+            generation = conn.execute("SELECT generation FROM data_generation WHERE id = 1").fetchone()[0]
+            rows = conn.execute(LINK_QUERY, (self.last_rowid,)).fetchall()
+
+        expected = generation - self.generation
+        if not full and len(rows) != expected:
+            # Something besides appends happened; force the caller to reload
+            self.generation = None
+            return len(rows)
+
+        if rows:
+            rowid, article_id, ts, keywords, sources, scores = zip(*rows)
+            new = {
+                "rowid": np.array(rowid, dtype=np.int64),
+                "article_id": np.array(article_id, dtype=np.int64),
+                "ts": np.array(ts, dtype=np.int64),
+                "keyword_id": np.array([self._intern(self._keyword_ids, self.keywords, k) for k in keywords], dtype=np.int32),
+                "source_id": np.array([self._intern(self._source_ids, self.sources, s) for s in sources], dtype=np.int16),
+                "score": np.array(scores, dtype=np.float32),
+            }
+            self.columns = {
+                name: np.concatenate([self.columns[name], new[name]]) for name in COLUMNS
+            }
+            self.last_rowid = int(new["rowid"][-1])
+            self._article_mask = None
+
+        self.generation = generation
+        return len(rows)
+
+    @staticmethod
+    def _intern(ids: Dict[str, int], names: List[str], name: str) -> int:
+        if name not in ids:
+            ids[name] = len(names)
+            names.append(name)
+        return ids[name]
+
+    # --- Snapshot ---
+
+    def _save_snapshot(self):
+        if not self.snapshot_path:
+            return
+        directory = None
+        try:
+            os.makedirs(self.snapshot_path, exist_ok=True)
+            directory = tempfile.mkdtemp(prefix=SNAPSHOT_PREFIX, dir=self.snapshot_path)
+            for name, values in self.columns.items():
+                np.save(os.path.join(directory, f"{name}.npy"), values)
+            meta = {
+                "generation": self.generation,
+                "last_rowid": self.last_rowid,
+                "rows": len(self),
+                "keywords": self.keywords,
+                "sources": self.sources,
+            }
+            with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+
+            previous = self._current_snapshot()
+            fd, tmp = tempfile.mkstemp(prefix=f"{SNAPSHOT_POINTER}.", dir=self.snapshot_path)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(os.path.basename(directory))
+            os.replace(tmp, os.path.join(self.snapshot_path, SNAPSHOT_POINTER))
+        except OSError as e:
+            # The snapshot only speeds up the next start; never fail a query over it
+            print(f"Columnar store: could not save snapshot: {e}")
+            if directory:
+                shutil.rmtree(directory, ignore_errors=True)
+            return
+        if previous:
+            shutil.rmtree(os.path.join(self.snapshot_path, previous), ignore_errors=True)
+        self._remove_stale_snapshots(keep=os.path.basename(directory))
+
+    def _current_snapshot(self) -> Optional[str]:
+        """Name of the published snapshot directory, if any."""
+        try:
+            with open(os.path.join(self.snapshot_path, SNAPSHOT_POINTER), "r", encoding="utf-8") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _remove_stale_snapshots(self, keep: str):
+        cutoff = time.time() - SNAPSHOT_GRACE_SECONDS
+        for entry in os.scandir(self.snapshot_path):
+            if entry.name == keep or not entry.name.startswith((SNAPSHOT_PREFIX, f"{SNAPSHOT_POINTER}.")):
+                continue
+            try:
+                if entry.stat().st_mtime >= cutoff:
+                    continue
+            except OSError:
+                continue
+            if entry.is_dir():
+                shutil.rmtree(entry.path, ignore_errors=True)
+            else:
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+    def _load_snapshot(self) -> bool:
+        try:
+            name = self._current_snapshot()
+            if not name:
+                return False
+            directory = os.path.join(self.snapshot_path, name)
+            with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            columns = {
+                name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+                for name in COLUMNS
+            }
+        except Exception as e:
+            print(f"Columnar store: ignoring unreadable snapshot: {e}")
+            return False
+        if not self._snapshot_is_consistent(meta, columns):
+            print(f"Columnar store: ignoring inconsistent snapshot {name}")
+            return False
+        if meta["generation"] > self.db.get_data_generation():
+            # Snapshot from a different (or reset) database
+            return False
+
+        self._reset()
+        self.columns = columns
+        self.generation = meta["generation"]
+        self.last_rowid = meta["last_rowid"]
+        self.keywords = meta["keywords"]
+        self.sources = meta["sources"]
+        self._keyword_ids = {k: i for i, k in enumerate(self.keywords)}
+        self._source_ids = {s: i for i, s in enumerate(self.sources)}
+        return True
+
+    @staticmethod
+    def _snapshot_is_consistent(meta: Dict[str, Any], columns: Dict[str, np.ndarray]) -> bool:
+        """Whether every column matches meta's row count, last rowid and id tables."""
+        rows = meta.get("rows")
+        if any(len(values) != rows for values in columns.values()):
+            return False
+        if rows == 0:
+            return meta["last_rowid"] == 0
+        return (int(columns["rowid"][-1]) == meta["last_rowid"]
+                and int(columns["keyword_id"].max()) < len(meta["keywords"])
+                and int(columns["source_id"].max()) < len(meta["sources"]))
+
+    # --- Queries ---
+
+    def _mask(self, keyword: Optional[str] = None, source: Optional[str] = None,
+               start_date: Optional[str] = None, end_date: Optional[str] = None) -> Optional[np.ndarray]:
+        """Boolean row mask for the filters, or None when nothing can match."""
+        mask = np.ones(len(self), dtype=bool)
+        if keyword:
+            if keyword not in self._keyword_ids:
+                return None
+            mask &= self.columns["keyword_id"] == self._keyword_ids[keyword]
+        if source:
+            if source not in self._source_ids:
+                return None
+            mask &= self.columns["source_id"] == self._source_ids[source]
+        if start_date:
+            mask &= self.columns["ts"] >= _day_to_ts(start_date)
+        if end_date:
+            mask &= self.columns["ts"] < _day_to_ts(end_date) + SECONDS_PER_DAY
+        return mask
+
+    def count(self, keyword: Optional[str] = None, source: Optional[str] = None,
+              start_date: Optional[str] = None, end_date: Optional[str] = None) -> int:
+        """Number of sentiment rows matching the filters (same semantics as get_sentiments)."""
+        self.sync()
+        with self._lock:
+            mask = self._mask(keyword, source, start_date, end_date)
+            return int(np.count_nonzero(mask)) if mask is not None else 0
+
+    def trends(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Daily average sentiment per keyword over the `limit` most recent rows."""
+        self.sync()
+        with self._lock:
+            ts = self.columns["ts"]
+            if len(ts) == 0:
+                return []
+            if limit < len(ts):
+                recent = np.argpartition(ts, len(ts) - limit)[len(ts) - limit:]
+            else:
+                recent = np.arange(len(ts))
+
+            days = ts[recent] // SECONDS_PER_DAY
+            keyword_ids = self.columns["keyword_id"][recent].astype(np.int64)
+            first_day = days.min()
+            group = keyword_ids * (days.max() - first_day + 1) + (days - first_day)
+            groups, inverse = np.unique(group, return_inverse=True)
+            counts = np.bincount(inverse)
+            sums = np.bincount(inverse, weights=self.columns["score"][recent].astype(np.float64))
+
+            span = days.max() - first_day + 1
+            group_keywords = (groups // span).tolist()
+            group_days = (groups % span + first_day).astype("datetime64[D]").astype(str).tolist()
+            averages = np.round(sums / counts, 2).tolist()
+
+            data = [
+                {
+                    "date": group_days[i],
+                    "keyword": self.keywords[group_keywords[i]],
+                    "name": self.keywords[group_keywords[i]],
+                    "sentiment": averages[i],
+                    "articles": int(counts[i]),
+                }
+                for i in range(len(groups))
+            ]
+            data.sort(key=lambda x: x["date"])
+            return data
+
+    def stats(self) -> Dict[str, Any]:
+        """Same shape as Database.get_advanced_stats."""
+        self.sync()
+        with self._lock:
+            if len(self) == 0:
+                return {"total_articles": 0, "average_sentiment": 0.0, "top_keywords": [], "bottom_keywords": []}
+            if self._article_mask is None:
+                # One row per article, for article-level totals
+                _, first = np.unique(self.columns["article_id"], return_index=True)
+                self._article_mask = np.zeros(len(self), dtype=bool)
+                self._article_mask[first] = True
+
+            scores = self.columns["score"].astype(np.float64)
+            article_scores = scores[self._article_mask]
+            avg = float(article_scores.mean()) if len(article_scores) else 0.0
+
+            keyword_ids = self.columns["keyword_id"]
+            counts = np.bincount(keyword_ids, minlength=len(self.keywords))
+            sums = np.bincount(keyword_ids, weights=scores, minlength=len(self.keywords))
+            present = np.flatnonzero(counts)
+            averages = sums[present] / counts[present]
+            order = np.argsort(averages, kind="stable")
+
+            def ranked(indices):
+                return [
+                    {"keyword": self.keywords[present[i]], "avg_sentiment": round(float(averages[i]), 2)}
+                    for i in indices
+                ]
+
+            return {
+                "total_articles": int(len(article_scores)),
+                "average_sentiment": round(avg, 2) if avg else 0.0,
+                "top_keywords": ranked(order[::-1][:3]),
+                "bottom_keywords": ranked(order[:3]),
+            }
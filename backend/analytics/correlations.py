@@ -0,0 +1,118 @@
+"""Correlation of daily sentiment between keywords.
+
+Works on the keywords x days matrix from analytics.timeseries. Days a
+keyword has no articles are NaN; each pair of keywords is correlated over
+the days both have data ("pairwise complete"), and every pair is computed
+at once from a few matrix products over the masked series instead of a
+Python loop over pairs.
+
+With a lag L, entry (i, j) correlates keyword i on day t with keyword j on
+day t + L, i.e. how well i's sentiment leads j's by L days.
+"""
+from typing import Any, Dict, List
+
+import numpy as np
+
+from analytics.timeseries import DailyMatrix
+
+METHODS = ("pearson", "spearman")
+
+
+def rank_rows(values: np.ndarray) -> np.ndarray:
+    """Average ranks (1-based) of each row's non-NaN values; NaN stays NaN."""
+    ranks = np.full(values.shape, np.nan)
+    for row in range(values.shape[0]):
+        valid = ~np.isnan(values[row])
+        if not valid.any():
+            continue
+        _, inverse, counts = np.unique(values[row, valid], return_inverse=True, return_counts=True)
+        # Ties share the mean of the ranks they span
+        upper = np.cumsum(counts)
+        ranks[row, valid] = (upper - (counts - 1) / 2.0)[inverse]
+    return ranks
+
+
+def correlation_matrix(values: np.ndarray, lag: int = 0, min_periods: int = 5):
+    """Pairwise-complete Pearson correlation of every row pair.
+
+    Args:
+        values: keywords x days, NaN where there is no data
+        lag: Days row i leads row j (negative: j leads i)
+        min_periods: Overlapping days needed for a coefficient
+
+    Returns:
+        Tuple of (correlations, overlapping day counts); correlations are
+        NaN below `min_periods` or when a series is constant on the overlap
+    """
+    if lag < 0:
+        corr, overlap = correlation_matrix(values, -lag, min_periods)
+        return corr.T, overlap.T
+
+    days = values.shape[1]
+    if lag >= days:
+        empty = np.full((values.shape[0], values.shape[0]), np.nan)
+        return empty, np.zeros(empty.shape, dtype=np.int64)
+
+    a, b = values[:, :days - lag], values[:, lag:]
+    mask_a, mask_b = (~np.isnan(a)).astype(np.float64), (~np.isnan(b)).astype(np.float64)
+    a0, b0 = np.nan_to_num(a), np.nan_to_num(b)
+
+    # Sums restricted to the days both series have data
+    n = mask_a @ mask_b.T
+    sum_a = a0 @ mask_b.T
+    sum_b = mask_a @ b0.T
+    sum_aa = (a0 * a0) @ mask_b.T
+    sum_bb = mask_a @ (b0 * b0).T
+    sum_ab = a0 @ b0.T
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sum_ab - sum_a * sum_b / n
+        var_a = sum_aa - sum_a * sum_a / n
+        var_b = sum_bb - sum_b * sum_b / n
+        corr = cov / np.sqrt(var_a * var_b)
+
+    # Guard against round-off on (near) constant overlaps
+    tiny = 1e-12
+    corr[(n < max(min_periods, 2)) | (var_a <= tiny) | (var_b <= tiny)] = np.nan
+    return np.clip(corr, -1.0, 1.0), n.round().astype(np.int64)
+
+
+def compute_correlations(matrix: DailyMatrix, method: str = "pearson", lag: int = 0,
+                         min_periods: int = 5) -> Dict[str, Any]:
+    """Correlation matrix and strongest pairs for the keywords of `matrix`.
+
+    Spearman ranks each keyword's days once over its whole range and then
+    correlates the ranks, rather than re-ranking every pair's overlap.
+
+    Returns:
+        Dictionary with keywords, matrix, overlap and pairs (strongest first)
+    """
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {', '.join(METHODS)}")
+
+    values = rank_rows(matrix.mean) if method == "spearman" else matrix.mean
+    corr, overlap = correlation_matrix(values, lag=lag, min_periods=min_periods)
+
+    keywords = matrix.keywords
+    rounded = np.round(corr, 4)
+    table = [[None if np.isnan(v) else v for v in row] for row in rounded.tolist()]
+
+    pairs: List[Dict[str, Any]] = []
+    for i, j in zip(*np.nonzero(~np.isnan(corr))):
+        # Without lag the matrix is symmetric; report each pair once
+        if i == j or (lag == 0 and i > j):
+            continue
+        # With a lag the first keyword is the one leading
+        pairs.append({
+            "keywords": [keywords[i], keywords[j]],
+            "correlation": table[i][j],
+            "days": int(overlap[i, j]),
+        })
+    pairs.sort(key=lambda p: abs(p["correlation"]), reverse=True)
+
+    return {
+        "keywords": keywords,
+        "matrix": table,
+        "overlap": overlap.tolist(),
+        "pairs": pairs,
+    }
@@ -0,0 +1,97 @@
+"""Keywords whose sentiment moved most between two date windows.
+
+Each window is summarized from the daily rollups as (articles, sum of
+scores, sum of squared scores), which is enough for the mean and variance
+of the per-article scores. The change in mean sentiment is scored with
+Welch's z statistic, so a shift backed by many articles ranks above the
+same shift seen in two posts.
+"""
+import math
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+# Variance assumed for a window whose scores are all identical (or that
+# has a single article), so tiny samples do not look infinitely certain
+MIN_VARIANCE = 0.01
+
+SORT_KEYS = ("significance", "delta", "volume")
+
+
+def _window(articles: int, total: float, sq_total: float):
+    """Mean and sample variance of one window's scores."""
+    if not articles:
+        return None, None
+    mean = total / articles
+    variance = (sq_total - total * total / articles) / (articles - 1) if articles > 1 else 0.0
+    return mean, max(variance, MIN_VARIANCE)
+
+
+def compute_movers(rows: List[Dict[str, Any]], min_articles: int = 3,
+                   sort: str = "significance") -> List[Dict[str, Any]]:
+    """Rank keywords by the change between the previous and current window.
+
+    Args:
+        rows: Rows from Database.get_window_totals
+        min_articles: Articles needed in each window for a z-score; keywords
+            below it are listed after the scored ones
+        sort: "significance" (|z|), "delta" (|sentiment change|) or
+            "volume" (|article count change|)
+
+    Returns:
+        One entry per keyword, best first
+    """
+    if sort not in SORT_KEYS:
+        raise ValueError(f"sort must be one of {', '.join(SORT_KEYS)}")
+
+    movers = []
+    for row in rows:
+        cur_n, prev_n = int(row["cur_articles"] or 0), int(row["prev_articles"] or 0)
+        cur_mean, cur_var = _window(cur_n, row["cur_sentiment_sum"] or 0.0, row["cur_sentiment_sq_sum"] or 0.0)
+        prev_mean, prev_var = _window(prev_n, row["prev_sentiment_sum"] or 0.0, row["prev_sentiment_sq_sum"] or 0.0)
+
+        delta = cur_mean - prev_mean if cur_mean is not None and prev_mean is not None else None
+        z_score = p_value = None
+        if delta is not None and cur_n >= min_articles and prev_n >= min_articles:
+            z_score = delta / math.sqrt(cur_var / cur_n + prev_var / prev_n)
+            # Two-sided, normal approximation
+            p_value = math.erfc(abs(z_score) / math.sqrt(2))
+
+        movers.append({
+            "keyword": row["keyword"],
+            "current_sentiment": round(cur_mean, 4) if cur_mean is not None else None,
+            "previous_sentiment": round(prev_mean, 4) if prev_mean is not None else None,
+            "delta": round(delta, 4) if delta is not None else None,
+            "current_articles": cur_n,
+            "previous_articles": prev_n,
+            "volume_change": cur_n - prev_n,
+            "volume_change_pct": round((cur_n - prev_n) / prev_n, 4) if prev_n else None,
+            "z_score": round(z_score, 4) if z_score is not None else None,
+            "p_value": round(p_value, 6) if p_value is not None else None,
+        })
+
+    def rank(mover: Dict[str, Any]):
+        if sort == "volume":
+            return (False, -abs(mover["volume_change"]))
+        value = mover["z_score"] if sort == "significance" else mover["delta"]
+        # Unscored keywords last, then by magnitude of change
+        return (value is None, -abs(value or 0.0), -abs(mover["delta"] or 0.0))
+
+    movers.sort(key=rank)
+    return movers
+
+
+def window_bounds(end_date: str, window: int, compare: Optional[int] = None):
+    """(current, previous) inclusive date windows ending at `end_date`.
+
+    Args:
+        end_date: Last day of the current window (YYYY-MM-DD)
+        window: Days in the current window
+        compare: Days in the previous window, which ends the day before the
+            current one starts. Defaults to `window`.
+    """
+    end = datetime.strptime(end_date, "%Y-%m-%d")
+    start = end - timedelta(days=window - 1)
+    prev_end = start - timedelta(days=1)
+    prev_start = prev_end - timedelta(days=(compare or window) - 1)
+    fmt = "%Y-%m-%d"
+    return (start.strftime(fmt), end.strftime(fmt)), (prev_start.strftime(fmt), prev_end.strftime(fmt))
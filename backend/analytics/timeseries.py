@@ -0,0 +1,170 @@
+"""Vectorized time-series statistics over daily sentiment aggregates.
+
+All keywords are processed together as a (keywords x days) matrix, so the
+cost is a handful of NumPy passes regardless of how many keywords we track.
+Days without articles are NaN and are skipped by every statistic.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+@dataclass
+class DailyMatrix:
+    """Daily mean sentiment and article counts laid out keywords x days."""
+
+    keywords: List[str]
+    days: np.ndarray  # datetime64[D], one entry per calendar day
+    mean: np.ndarray  # float64, NaN where a keyword had no articles
+    counts: np.ndarray  # int64
+
+
+def build_daily_matrix(rows: List[Dict[str, Any]], keywords: Optional[List[str]] = None,
+                       start_date: Optional[str] = None, end_date: Optional[str] = None) -> DailyMatrix:
+    """Lay out rollup rows as a dense keywords x days matrix.
+
+    Args:
+        rows: Rows from Database.get_daily_aggregates
+        keywords: Row order of the matrix. Defaults to the keywords in `rows`.
+        start_date: First day of the matrix. Defaults to the earliest row.
+        end_date: Last day of the matrix. Defaults to the latest row.
+    """
+    keywords = list(keywords) if keywords else sorted({row["keyword"] for row in rows})
+    if not rows and not (start_date and end_date):
+        empty = np.empty((len(keywords), 0))
+        return DailyMatrix(keywords, np.array([], dtype="datetime64[D]"), empty, empty.astype(np.int64))
+
+    row_days = np.array([row["day"] for row in rows], dtype="datetime64[D]")
+    first = np.datetime64(start_date, "D") if start_date else row_days.min()
+    last = np.datetime64(end_date, "D") if end_date else row_days.max()
+    days = np.arange(first, last + 1, dtype="datetime64[D]")
+
+    mean = np.full((len(keywords), len(days)), np.nan)
+    counts = np.zeros((len(keywords), len(days)), dtype=np.int64)
+    if rows:
+        index = {keyword: i for i, keyword in enumerate(keywords)}
+        k = np.array([index.get(row["keyword"], -1) for row in rows])
+        d = (row_days - first).astype(np.int64)
+        n = np.array([row["articles"] for row in rows], dtype=np.int64)
+        total = np.array([row["sentiment_sum"] for row in rows], dtype=np.float64)
+
+        keep = (k >= 0) & (d >= 0) & (d < len(days)) & (n > 0)
+        counts[k[keep], d[keep]] = n[keep]
+        mean[k[keep], d[keep]] = total[keep] / n[keep]
+
+    return DailyMatrix(keywords, days, mean, counts)
+
+
+def _rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing sum over `window` columns via cumulative sums."""
+    cumulative = np.cumsum(values, axis=1)
+    result = cumulative.copy()
+    if window < values.shape[1]:
+        result[:, window:] -= cumulative[:, :-window]
+    return result
+
+
+def rolling_stats(mean: np.ndarray, window: int, min_periods: int = 1):
+    """Trailing rolling mean and sample standard deviation, ignoring NaN days.
+
+    Returns:
+        Tuple of (rolling_mean, rolling_std), NaN where fewer than
+        `min_periods` days with data fall inside the window
+    """
+    valid = ~np.isnan(mean)
+    x = np.where(valid, mean, 0.0)
+
+    n = _rolling_sum(valid.astype(np.float64), window)
+    s1 = _rolling_sum(x, window)
+    s2 = _rolling_sum(x * x, window)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rolling_mean = s1 / n
+        variance = (s2 - s1 * s1 / n) / (n - 1)
+    rolling_std = np.sqrt(np.clip(variance, 0.0, None))
+
+    rolling_mean[n < max(min_periods, 1)] = np.nan
+    rolling_std[n < max(min_periods, 2)] = np.nan
+    return rolling_mean, rolling_std
+
+
+def ewma(mean: np.ndarray, alpha: float) -> np.ndarray:
+    """Exponentially weighted moving average, carried forward across gaps.
+
+    The recursion runs over days but is vectorized over keywords.
+    """
+    result = np.full(mean.shape, np.nan)
+    state = np.full(mean.shape[0], np.nan)
+    for day in range(mean.shape[1]):
+        x = mean[:, day]
+        has_value = ~np.isnan(x)
+        start = has_value & np.isnan(state)
+        update = has_value & ~start
+        state[start] = x[start]
+        state[update] = alpha * x[update] + (1 - alpha) * state[update]
+        result[:, day] = state
+    return result
+
+
+def compute_timeseries(matrix: DailyMatrix, window: int = 7, alpha: float = 0.3,
+                       z_threshold: float = 2.0, min_periods: int = 3,
+                       min_std: float = 0.05) -> Dict[str, Any]:
+    """Rolling statistics, EWMA, deltas and z-score anomaly flags per keyword.
+
+    A day's z-score compares it against the rolling window that ends the day
+    before, so a spike does not dilute its own baseline. `min_std` floors the
+    baseline deviation so a flat history does not flag every small change.
+
+    Returns:
+        Dictionary with per-keyword `series` and a flat list of `anomalies`
+    """
+    mean = matrix.mean
+    roll_mean, roll_std = rolling_stats(mean, window, min_periods)
+    smoothed = ewma(mean, alpha)
+
+    delta = np.full(mean.shape, np.nan)
+    delta[:, 1:] = mean[:, 1:] - mean[:, :-1]
+
+    baseline_mean = np.full(mean.shape, np.nan)
+    baseline_std = np.full(mean.shape, np.nan)
+    baseline_mean[:, 1:] = roll_mean[:, :-1]
+    baseline_std[:, 1:] = roll_std[:, :-1]
+    with np.errstate(invalid="ignore"):
+        zscore = (mean - baseline_mean) / np.maximum(baseline_std, min_std)
+        anomaly = np.abs(zscore) >= z_threshold
+
+    dates = matrix.days.astype(str).tolist()
+    columns = {
+        "sentiment": np.round(mean, 4),
+        "rolling_mean": np.round(roll_mean, 4),
+        "rolling_std": np.round(roll_std, 4),
+        "ewma": np.round(smoothed, 4),
+        "delta": np.round(delta, 4),
+        "zscore": np.round(zscore, 3),
+    }
+
+    series: Dict[str, List[Dict[str, Any]]] = {}
+    anomalies: List[Dict[str, Any]] = []
+    for k, keyword in enumerate(matrix.keywords):
+        points = []
+        values = {name: column[k].tolist() for name, column in columns.items()}
+        counts = matrix.counts[k].tolist()
+        flags = anomaly[k].tolist()
+        for d in np.flatnonzero(matrix.counts[k]).tolist():
+            point = {"date": dates[d], "articles": counts[d], "anomaly": flags[d]}
+            for name, column in values.items():
+                value = column[d]
+                point[name] = None if value != value else value  # NaN -> null
+            points.append(point)
+            if flags[d]:
+                anomalies.append({
+                    "keyword": keyword,
+                    "date": dates[d],
+                    "sentiment": point["sentiment"],
+                    "zscore": point["zscore"],
+                })
+        series[keyword] = points
+
+    anomalies.sort(key=lambda a: a["date"], reverse=True)
+    return {"series": series, "anomalies": anomalies}
@@ -0,0 +1 @@
+"""Helpers shared by the HTTP API: serialization and response encoding."""
@@ -0,0 +1,234 @@
+"""Precomputed /api/dashboard snapshot.
+
+The dashboard needs stats, keywords and trend series. Instead of computing
+them on every request, the payload is built once per data generation,
+serialized once, gzip-compressed once and stored in ``dashboard_snapshot``.
+The ETL refreshes it right after loading; API workers check the generation
+counter on each request and rebuild only when some other writer (retention,
+a score update) moved it without refreshing the snapshot.
+
+Each worker keeps the current snapshot in memory, so a dashboard request
+is one generation lookup plus returning the stored bytes, and the ETag
+lets browsers skip even that transfer.
+"""
+import gzip
+import hashlib
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from api.serialization import dumps
+from config import Config
+from database.db import Database
+
+
+def compute_trends(db: Database, column_store=None, limit: int = 100) -> Tuple[Dict[str, Any], int]:
+    """Build the /api/trends payload; returns (payload, status)."""
+    try:
+        if column_store:
+            formatted_data = column_store.trends(limit=limit)
+            return {
+                "success": True,
+                "count": len(formatted_data),
+                "data": formatted_data
+            }, 200
+
+        # Fetch data from database as plain tuples
+        columns, sentiments_data = db.get_recent_sentiment_rows(limit=limit)
+
+        if not sentiments_data:
+            return {
+                "success": True,
+                "count": 0,
+                "data": [],
+                "message": "No data in database. Use POST /api/trigger-etl to fetch data."
+            }, 200
+
+        # Transform data for chart consumption
+        # Group by keyword and date, calculate average sentiment per day
+        chart_data = {}
+        keyword_index, date_index, sentiment_index = (
+            columns.index(name) for name in ('keyword', 'created_at', 'sentiment')
+        )
+
+        for item in sentiments_data:
+            keyword = item[keyword_index]
+            if not keyword:
+                keyword = 'Unknown'
+
+            # Date handling
+            raw_date = item[date_index]
+            try:
+                # Handle both string and datetime objects
+                if isinstance(raw_date, str):
+                    # SQLite timestamps look like "YYYY-MM-DD HH:MM:SS"
+                    date = raw_date.split('T')[0].split(' ')[0]
+                else:
+                    date = raw_date.strftime("%Y-%m-%d")
+            except:
+                date = datetime.now().strftime("%Y-%m-%d")
+
+            sentiment = item[sentiment_index]
+
+            # Create unique key
+            key = f"{keyword}_{date}"
+
+            if key not in chart_data:
+                chart_data[key] = {
+                    'keyword': keyword,
+                    'date': date,
+                    'sentiments': [],
+                    'articles': 0
+                }
+
+            chart_data[key]['sentiments'].append(sentiment)
+            chart_data[key]['articles'] += 1
+
+        # Calculate averages and format for chart
+        formatted_data = []
+        for key, data in chart_data.items():
+            avg_sentiment = sum(data['sentiments']) / len(data['sentiments']) if data['sentiments'] else 0.0
+
+            formatted_data.append({
+                'date': data['date'],
+                'keyword': data['keyword'],
+                'name': data['keyword'],
+                'sentiment': round(avg_sentiment, 2),
+                'articles': data['articles']
+            })
+
+        # Sort by date
+        formatted_data.sort(key=lambda x: x['date'])
+
+        return {
+            "success": True,
+            "count": len(formatted_data),
+            "data": formatted_data
+        }, 200
+
+    except Exception as e:
+        print(f"Error in get_trends: {e}")
+        return {
+            "success": False,
+            "error": str(e)
+        }, 500
+
+
+class Snapshot:
+    """One serialized dashboard payload."""
+
+    __slots__ = ("generation", "etag", "gzipped", "raw_size", "_body")
+
+    def __init__(self, generation: int, etag: str, gzipped: bytes, raw_size: int, body: bytes = None):
+        self.generation = generation
+        self.etag = etag
+        self.gzipped = gzipped
+        self.raw_size = raw_size
+        self._body = body
+
+    @property
+    def body(self) -> bytes:
+        """Uncompressed JSON, for clients that do not accept gzip."""
+        if self._body is None:
+            self._body = gzip.decompress(self.gzipped)
+        return self._body
+
+
+def build_payload(db: Database, column_store=None, trends_limit: int = None) -> Tuple[int, Dict[str, Any]]:
+    """Compute the dashboard payload.
+
+    Returns:
+        Tuple of (data generation the payload reflects, payload)
+    """
+    # Read first: a write during the build leaves the snapshot one
+    # generation behind, so it is rebuilt on the next request
+    generation = db.get_data_generation()
+    trends, status = compute_trends(db, column_store, limit=trends_limit or Config.DASHBOARD_TRENDS_LIMIT)
+    if status != 200:
+        raise RuntimeError(trends["error"])
+    stats = column_store.stats() if column_store else db.get_advanced_stats()
+    return generation, {
+        "success": True,
+        "generation": generation,
+        "generated_at": datetime.now().isoformat(),
+        "stats": stats,
+        "keywords": db.get_keywords(),
+        "trends": trends["data"]
+    }
+
+
+def build_snapshot(db: Database, column_store=None, trends_limit: int = None) -> Snapshot:
+    """Build, serialize and compress the dashboard payload, and store it."""
+    generation, payload = build_payload(db, column_store, trends_limit)
+    body = dumps(payload)
+    gzipped = gzip.compress(body, compresslevel=Config.DASHBOARD_COMPRESSION_LEVEL, mtime=0)
+    etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+    db.save_dashboard_snapshot(generation, etag, gzipped, len(body))
+    return Snapshot(generation, etag, gzipped, len(body), body)
+
+
+def refresh_snapshot(db: Database, column_store=None) -> Optional[Snapshot]:
+    """Rebuild the stored snapshot if the data changed since it was built.
+
+    Called by the ETL after loading. Failures are reported, not raised, so
+    they never fail a run; API workers rebuild on demand anyway.
+
+    Returns:
+        The new snapshot, or None if it was current or could not be built
+    """
+    try:
+        stored = db.get_dashboard_snapshot()
+        if stored and stored["generation"] == db.get_data_generation():
+            return None
+        return build_snapshot(db, column_store)
+    except Exception as e:
+        print(f"Dashboard snapshot refresh failed: {e}")
+        return None
+
+
+class DashboardCache:
+    """The current dashboard snapshot of one API worker."""
+
+    def __init__(self, db: Database, column_store=None):
+        """Initialize with no snapshot loaded.
+
+        Args:
+            db: Database the snapshot is read from and stored in
+            column_store: Optional ColumnarStore used when rebuilding
+        """
+        self.db = db
+        self.column_store = column_store
+        self._snapshot: Optional[Snapshot] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+        self.builds = 0
+
+    def get(self) -> Snapshot:
+        """Snapshot for the current data generation, loading or building it
+        when the in-memory one is stale."""
+        generation = self.db.get_data_generation()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.generation == generation:
+            self.hits += 1
+            return snapshot
+
+        # One rebuild per worker at a time; concurrent requests wait for it
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.generation == generation:
+                self.hits += 1
+                return snapshot
+            stored = self.db.get_dashboard_snapshot()
+            if stored and stored["generation"] == generation:
+                snapshot = Snapshot(stored["generation"], stored["etag"], bytes(stored["body"]), stored["raw_size"])
+                self.loads += 1
+            else:
+                snapshot = build_snapshot(self.db, self.column_store)
+                self.builds += 1
+            self._snapshot = snapshot
+            return snapshot
+
+    def metrics(self) -> Dict[str, int]:
+        """Hits, loads from the database and rebuilds in this worker."""
+        return {"hits": self.hits, "loads": self.loads, "builds": self.builds}
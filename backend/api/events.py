@@ -0,0 +1,289 @@
+"""In-process pub/sub behind the /api/stream Server-Sent Events endpoint.
+
+``EventBus`` keeps the most recent events in a ring buffer and wakes
+waiting subscribers with a single Condition, so an idle subscriber costs
+one blocked thread and nothing else; events are encoded once, not once
+per client.
+
+``ChangeFeed`` turns database changes into events. It follows
+``article_keywords`` by rowid (the same cursor the columnar store uses),
+so every event id is a link id and a client that reconnects with
+``Last-Event-ID`` gets exactly the links it missed. Each batch produces an
+``articles`` event with the new links and an ``aggregates`` event with the
+updated keyword/day totals; changes that add no links (score updates,
+deletes) produce a ``refresh`` event telling clients to refetch.
+
+The in-process ETL (``/api/trigger-etl``, etl/data_fetcher.py) calls
+publish_changes() after writing, which pushes immediately. Everything else
+(the ETL pipeline and its workers, the scheduler daemon, the backfill)
+runs in other processes; the feed polls in the background so their writes
+reach subscribers within ``poll_interval`` seconds.
+
+A client that reconnects further back than ``replay_limit`` links gets a
+``refresh`` event instead of the whole history.
+"""
+import threading
+import weakref
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from api.serialization import dumps
+from database.db import Database
+
+# Live feeds in this process, so the ETL can push without knowing the app
+_feeds: "weakref.WeakSet[ChangeFeed]" = weakref.WeakSet()
+
+
+def format_sse(event: str, data: Any, event_id: Optional[int] = None) -> bytes:
+    """Encode one Server-Sent Event."""
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\n".encode("utf-8") + b"data: " + dumps(data) + b"\n\n"
+
+
+class EventBus:
+    """Fan out encoded events to any number of subscribers."""
+
+    def __init__(self, buffer_size: int = 256):
+        """Initialize the bus.
+
+        Args:
+            buffer_size: Events kept for subscribers that fall behind.
+        """
+        self._events: deque = deque(maxlen=buffer_size)
+        self._seq = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self.subscribers = 0
+        # Buffered events cover every event id above this one
+        self.floor: Optional[int] = None
+
+    @property
+    def seq(self) -> int:
+        """Sequence number of the latest event."""
+        return self._seq
+
+    def publish(self, event: str, data: Any, event_id: Optional[int] = None) -> int:
+        """Encode an event once and wake every subscriber.
+
+        Returns:
+            Sequence number of the event
+        """
+        payload = format_sse(event, data, event_id)
+        with self._condition:
+            self._seq += 1
+            if len(self._events) == self._events.maxlen and self._events[0][1] is not None:
+                self.floor = self._events[0][1]
+            self._events.append((self._seq, event_id, payload))
+            self._condition.notify_all()
+            return self._seq
+
+    def events_after(self, seq: int) -> Tuple[List[bytes], int, bool]:
+        """Buffered events newer than `seq`.
+
+        Returns:
+            Tuple of (payloads, latest sequence number, whether events
+            between `seq` and the oldest buffered one were dropped)
+        """
+        with self._condition:
+            gap = bool(self._events) and self._events[0][0] > seq + 1
+            return [payload for s, _, payload in self._events if s > seq], self._seq, gap
+
+    def seq_after_event_id(self, event_id: int) -> Optional[int]:
+        """Sequence number to resume from for a client's Last-Event-ID.
+
+        Returns None when the buffer no longer reaches back that far.
+        """
+        with self._condition:
+            if self.floor is None or event_id < self.floor:
+                return None
+            seq = self._events[0][0] - 1 if self._events else self._seq
+            for s, eid, _ in self._events:
+                if eid is not None and eid <= event_id:
+                    seq = s
+            return seq
+
+    def wait(self, seq: int, timeout: float) -> bool:
+        """Block until an event newer than `seq` exists or `timeout` passes."""
+        with self._condition:
+            if self._seq <= seq and not self._closed:
+                self._condition.wait(timeout)
+            return self._seq > seq
+
+    def close(self):
+        """Wake every subscriber so its stream ends."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def subscribe(self, last_event_id: Optional[int] = None, feed: "ChangeFeed" = None,
+                  heartbeat: float = 15.0) -> Iterator[bytes]:
+        """Generate the SSE byte stream for one client.
+
+        Args:
+            last_event_id: Last-Event-ID sent by a reconnecting client
+            feed: Change feed used to replay events no longer buffered
+            heartbeat: Seconds between keep-alive comments
+        """
+        with self._condition:
+            self.subscribers += 1
+        try:
+            seq = self._seq
+            yield b"retry: 3000\n\n"
+            if last_event_id is not None:
+                resume = self.seq_after_event_id(last_event_id)
+                if resume is not None:
+                    seq = resume
+                elif feed:
+                    # Too old for the buffer: replay from the database
+                    for payload in feed.replay(last_event_id):
+                        yield payload
+            elif feed:
+                yield format_sse("ready", {"cursor": feed.cursor}, feed.cursor)
+
+            while not self._closed:
+                if not self.wait(seq, heartbeat):
+                    yield b": keep-alive\n\n"
+                    continue
+                payloads, seq, gap = self.events_after(seq)
+                if gap:
+                    # This client fell further behind than the buffer holds
+                    yield format_sse("refresh", {"reason": "lagged"})
+                for payload in payloads:
+                    yield payload
+        finally:
+            with self._condition:
+                self.subscribers -= 1
+
+
+class ChangeFeed:
+    """Publish database changes to an EventBus as delta events."""
+
+    def __init__(self, db: Database, bus: EventBus, poll_interval: float = 2.0, batch_size: int = 400,
+                 replay_limit: int = 256):
+        """Initialize the feed at the current end of the data.
+
+        Args:
+            db: Database to follow
+            bus: Bus to publish to
+            poll_interval: Seconds between background checks for changes
+                made by other processes
+            batch_size: Links per articles event
+            replay_limit: Most links replayed to a reconnecting client
+        """
+        self.db = db
+        self.bus = bus
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.replay_limit = replay_limit
+        self.cursor = db.get_latest_link_id()
+        bus.floor = self.cursor
+        self._generation = db.get_data_generation()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        _feeds.add(self)
+
+    def collect(self, after_id: int) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """New links after `after_id` and the totals of the keyword/days they touch."""
+        links = self.db.get_links_since(after_id, limit=self.batch_size)
+        pairs = sorted({(link["keyword"], link["created_at"][:10]) for link in links})
+        aggregates = [
+            {
+                "date": row["day"],
+                "keyword": row["keyword"],
+                "name": row["keyword"],
+                "sentiment": round(row["sentiment_sum"] / row["articles"], 2) if row["articles"] else 0.0,
+                "articles": row["articles"],
+            }
+            for row in self.db.get_keyword_day_totals(pairs)
+        ]
+        return links, aggregates
+
+    def _events(self, links, aggregates) -> List[Tuple[str, Any, int]]:
+        last_id = links[-1]["link_id"]
+        return [("articles", links, last_id), ("aggregates", aggregates, last_id)]
+
+    def poll(self) -> int:
+        """Publish everything written since the last poll.
+
+        Returns:
+            Number of new links published
+        """
+        with self._lock:
+            generation = self.db.get_data_generation()
+            if generation == self._generation:
+                return 0
+
+            published = 0
+            while True:
+                links, aggregates = self.collect(self.cursor)
+                if not links:
+                    break
+                for event, data, event_id in self._events(links, aggregates):
+                    self.bus.publish(event, data, event_id)
+                self.cursor = links[-1]["link_id"]
+                published += len(links)
+                if len(links) < self.batch_size:
+                    break
+
+            if not published:
+                # Scores changed or rows were deleted; nothing to append
+                self.bus.publish("refresh", {"reason": "updated"}, self.cursor)
+            self._generation = generation
+            return published
+
+    def replay(self, after_id: int) -> Iterator[bytes]:
+        """Encoded events for links after `after_id`, read from the database.
+
+        More than `replay_limit` missed links produce a single refresh event
+        instead, telling the client to refetch and continue from the cursor.
+        """
+        cursor = self.cursor
+        if self.db.count_links_between(after_id, cursor, self.replay_limit + 1) > self.replay_limit:
+            yield format_sse("refresh", {"reason": "too_far_behind"}, cursor)
+            return
+        while after_id < cursor:
+            links, aggregates = self.collect(after_id)
+            links = [link for link in links if link["link_id"] <= cursor]
+            if not links:
+                break
+            for event, data, event_id in self._events(links, aggregates):
+                yield format_sse(event, data, event_id)
+            after_id = links[-1]["link_id"]
+
+    def start(self) -> threading.Thread:
+        """Poll in a background daemon thread."""
+        if self._thread and self._thread.is_alive():
+            return self._thread
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="change-feed", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Change feed poll failed: {e}")
+
+    def stop(self):
+        """Stop the background thread and end open streams."""
+        self._stop.set()
+        self.bus.close()
+
+
+def publish_changes():
+    """Push new data to every live change feed in this process.
+
+    Called by the ETL after it writes; a no-op when nothing is subscribed.
+    """
+    for feed in list(_feeds):
+        try:
+            feed.poll()
+        except Exception as e:
+            print(f"Change feed poll failed: {e}")
@@ -0,0 +1,95 @@
+"""Fast JSON encoding for API responses.
+
+orjson is used when installed and the standard library otherwise, so the
+output is the same JSON either way. Query results can be passed as
+``Rows`` (column names plus plain tuples from SQLite); they are encoded
+without first turning every row into a ``sqlite3.Row`` and then a dict.
+NumPy scalars from the analytics code encode as plain numbers and booleans;
+NumPy itself is not imported here, so API workers only load it when the
+analytics code does.
+"""
+import json
+import sys
+from typing import Any, Iterable, List, Sequence
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Optional dependency; falls back to the json module
+    orjson = None
+
+SERIALIZER = "orjson" if orjson else "json"
+
+
+class Rows:
+    """Query result kept as column names and row tuples.
+
+    Encoded as a list of objects by default, or, with ``shape="table"``, as
+    ``{"columns": [...], "rows": [[...], ...]}`` which skips the per-row
+    keys entirely and is written straight from the tuples.
+    """
+
+    __slots__ = ("columns", "rows", "shape")
+
+    def __init__(self, columns: Sequence[str], rows: List[tuple], shape: str = "records"):
+        if shape not in ("records", "table"):
+            raise ValueError(f"Unknown shape: {shape}")
+        self.columns = list(columns)
+        self.rows = rows
+        self.shape = shape
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def records(self) -> Iterable[dict]:
+        """Rows as dicts, built one at a time."""
+        columns = self.columns
+        return (dict(zip(columns, row)) for row in self.rows)
+
+    def to_json_value(self) -> Any:
+        """Plain value the JSON encoders understand."""
+        if self.shape == "table":
+            return {"columns": self.columns, "rows": self.rows}
+        return list(self.records())
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, Rows):
+        return obj.to_json_value()
+    np = sys.modules.get("numpy")
+    if np is not None and isinstance(obj, np.generic):
+        return obj.item()
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode("utf-8", "replace")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode `obj` as compact UTF-8 JSON."""
+    if orjson:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by dumps(), so every jsonify() call uses it.
+
+    Keys are not sorted; the frontend never relied on key order.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return dumps(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        if orjson:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype=self.mimetype)
@@ -0,0 +1,103 @@
+"""Request coalescing ("single-flight") for identical concurrent queries.
+
+When several threads ask for the same key at once, the first one computes
+the value and the others wait for it and share the result (or the raised
+exception) instead of running the same queries again. Nothing is cached:
+once the computation finishes, the next request starts a new one.
+
+Coalescing is per process. Under a pre-fork server each worker coalesces
+its own requests, so a burst of N identical requests costs at most one
+computation per worker. State is reset in forked children so a lock held
+by the parent at fork time cannot deadlock a worker.
+"""
+import os
+import threading
+import weakref
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+_instances: "weakref.WeakSet[SingleFlight]" = weakref.WeakSet()
+
+
+def _reset_after_fork():
+    for instance in list(_instances):
+        instance._reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+class _Call:
+    """One in-flight computation and the threads waiting for it."""
+
+    __slots__ = ("done", "value", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Run at most one computation per key at a time and share its result."""
+
+    def __init__(self):
+        """Initialize with empty state and zeroed metrics."""
+        self._reset()
+        _instances.add(self)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executions = 0
+        self.coalesced = 0
+        self.max_waiters = 0
+
+    def do(self, key: Hashable, compute: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Return compute()'s result, joining an identical call in flight.
+
+        Returns:
+            Tuple of (result, whether it was shared from another request)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                self.max_waiters = max(self.max_waiters, call.waiters)
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value, True
+
+        try:
+            call.value = compute()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.value, False
+
+    def metrics(self) -> Dict[str, Any]:
+        """Executions, coalesced requests and the share of requests coalesced."""
+        with self._lock:
+            requests = self.executions + self.coalesced
+            return {
+                "requests": requests,
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "coalescing_ratio": round(self.coalesced / requests, 4) if requests else 0.0,
+                "in_flight": len(self._calls),
+                "max_waiters": self.max_waiters,
+            }
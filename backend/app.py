@@ -1,26 +1,140 @@
-"""Flask API server for Tech Trend Sentiment Analyst."""
-from flask import Flask, jsonify, request
+"""Flask API server for Tech Trend Sentiment Analyst.
+
+Use create_app() to build the application. Heavy modules (the ETL pipeline,
+the Gemini SDK and NumPy analytics) are imported on first use, so API
+workers that only serve reads start fast.
+"""
+from flask import Blueprint, Flask, Response, current_app, jsonify, request
 from flask_cors import CORS
 from datetime import datetime, timedelta
+import os
+import threading
 from typing import Optional
 from config import Config
-from database.db import Database
-from etl.data_fetcher import fetch_all_trends_data
+from database.db import Database, decode_search_cursor
+from analytics.cache import GenerationCache
+from api.compression import init_compression
+from api.dashboard import DashboardCache, compute_trends
+from api.events import ChangeFeed, EventBus
+from api.serialization import FastJSONProvider, Rows
+from api.singleflight import SingleFlight
+from etl import http_client, resilience
+
+api = Blueprint("api", __name__)
+_change_feed_lock = threading.Lock()
+
+
+def create_app(db: Optional[Database] = None, column_store=None, prewarm: bool = False) -> Flask:
+    """Application factory.
+    
+    Args:
+        db: Database to serve. Creates new one if not provided.
+        column_store: Optional ColumnarStore. Built from Config.COLUMNAR_CACHE
+            when not provided.
+        prewarm: Touch the database and load caches before the first request.
+        
+    Returns:
+        Configured Flask application
+    """
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    # Enable CORS for frontend (allow requests from localhost:3000)
+    CORS(app, resources={r"/api/*": {"origins": "http://localhost:3000"}})
+    
+    db = db or Database()
+    if column_store is None and Config.COLUMNAR_CACHE:
+        from analytics.columnar import ColumnarStore
+        column_store = ColumnarStore(db, snapshot_path=Config.COLUMNAR_SNAPSHOT_PATH or None)
+        column_store.load()
+    
+    app.extensions["db"] = db
+    app.extensions["column_store"] = column_store
+    app.extensions["analytics_cache"] = GenerationCache()
+    app.extensions["single_flight"] = SingleFlight()
+    app.extensions["dashboard"] = DashboardCache(db, column_store)
+    app.extensions["event_bus"] = EventBus(buffer_size=Config.STREAM_BUFFER_SIZE)
+    # Started on the first /api/stream request, i.e. after any pre-fork
+    app.extensions["change_feed"] = None
+    app.register_blueprint(api)
+    init_compression(
+        app,
+        min_size=Config.RESPONSE_COMPRESSION_MIN_SIZE,
+        level=Config.RESPONSE_COMPRESSION_LEVEL
+    )
+    
+    if prewarm:
+        prewarm_app(app)
+    
+    return app
+
+
+def prewarm_app(app: Flask):
+    """Do first-request work up front: import analytics, open the database
+    file so its pages are cached, and fill the column store.
+    
+    Call this in a pre-fork master so every worker inherits the warm state.
+    """
+    import analytics.timeseries  # noqa: F401  (pulls in NumPy)
+    
+    db = app.extensions["db"]
+    db.get_data_generation()
+    db.get_keywords()
+    db.get_advanced_stats()
+    column_store = app.extensions["column_store"]
+    if column_store:
+        column_store.sync()
+
+
+def get_db() -> Database:
+    """Database of the current application."""
+    return current_app.extensions["db"]
+
+
+def get_column_store():
+    """ColumnarStore of the current application, or None when disabled."""
+    return current_app.extensions["column_store"]
 
-app = Flask(__name__)
-# Enable CORS for frontend (allow requests from localhost:3000)
-CORS(app, resources={r"/api/*": {"origins": "http://localhost:3000"}})
 
-db = Database()
+def get_change_feed() -> ChangeFeed:
+    """Change feed of the current application, started on first use."""
+    extensions = current_app.extensions
+    with _change_feed_lock:
+        if extensions["change_feed"] is None:
+            feed = ChangeFeed(
+                extensions["db"],
+                extensions["event_bus"],
+                poll_interval=Config.STREAM_POLL_INTERVAL,
+                replay_limit=Config.STREAM_BUFFER_SIZE
+            )
+            feed.start()
+            extensions["change_feed"] = feed
+    return extensions["change_feed"]
 
 
-@app.route("/api/health", methods=["GET"])
+@api.route("/api/health", methods=["GET"])
 def health_check():
     """Health check endpoint."""
     return jsonify({"status": "healthy", "timestamp": datetime.now().isoformat()})
 
 
-@app.route("/api/sentiments", methods=["GET"])
+@api.route("/api/metrics", methods=["GET"])
+def get_metrics():
+    """In-process metrics of this worker (coalescing, caches and source health)."""
+    cache = current_app.extensions["analytics_cache"]
+    bus = current_app.extensions["event_bus"]
+    return jsonify({
+        "success": True,
+        "pid": os.getpid(),
+        "single_flight": current_app.extensions["single_flight"].metrics(),
+        "analytics_cache": {"hits": cache.hits, "misses": cache.misses},
+        "dashboard": current_app.extensions["dashboard"].metrics(),
+        "sources": resilience.sources.metrics(),
+        "http_cache": http_client.client.metrics(),
+        "stream_subscribers": bus.subscribers
+    })
+
+
+@api.route("/api/sentiments", methods=["GET"])
 def get_sentiments():
     """Get sentiment data with optional filters.
     
@@ -30,7 +144,18 @@ def get_sentiments():
         start_date: Start date (YYYY-MM-DD)
         end_date: End date (YYYY-MM-DD)
         limit: Maximum number of results
+        shape: "records" (default, list of objects) or "table"
+            ({"columns": [...], "rows": [[...]]}, smaller and faster)
+        total: "true" to add the number of matches ignoring `limit`; always
+            included when the column store is loaded, where counting is cheap
     """
+    shape = request.args.get("shape", "records")
+    if shape not in ("records", "table"):
+        return jsonify({
+            "success": False,
+            "error": "shape must be 'records' or 'table'"
+        }), 400
+
     try:
         keyword = request.args.get("keyword")
         source = request.args.get("source")
@@ -43,19 +168,27 @@ def get_sentiments():
             end_date = datetime.now().strftime("%Y-%m-%d")
             start_date = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
         
-        sentiments = db.get_sentiments(
+        columns, rows = get_db().get_sentiment_rows(
             keyword=keyword,
             source=source,
             start_date=start_date,
             end_date=end_date,
             limit=limit
         )
-        
-        return jsonify({
+        sentiments = Rows(columns, rows, shape=shape)
+        result = {
             "success": True,
             "count": len(sentiments),
             "data": sentiments
-        })
+        }
+        
+        # Total matches ignoring `limit`; without the store it is a second query
+        column_store = get_column_store()
+        if column_store or request.args.get("total", "false").lower() == "true":
+            counter = column_store.count if column_store else get_db().count_sentiments
+            result["total"] = counter(keyword=keyword, source=source, start_date=start_date, end_date=end_date)
+        
+        return jsonify(result)
     
     except Exception as e:
         return jsonify({
@@ -64,11 +197,89 @@ def get_sentiments():
         }), 500
 
 
-@app.route("/api/keywords", methods=["GET"])
+@api.route("/api/articles/<int:article_id>", methods=["GET"])
+def get_article(article_id: int):
+    """Get a single article, including archived content and summary."""
+    try:
+        article = get_db().get_article(article_id)
+        if not article:
+            return jsonify({
+                "success": False,
+                "error": "Article not found"
+            }), 404
+
+        return jsonify({
+            "success": True,
+            "data": article
+        })
+
+    except Exception as e:
+        print(f"Error in get_article: {e}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+@api.route("/api/search", methods=["GET"])
+def search_articles():
+    """Full-text search over article titles, summaries and content.
+
+    Query parameters:
+        q: Search terms (required)
+        keyword: Filter by keyword
+        start_date: Start date (YYYY-MM-DD)
+        end_date: End date (YYYY-MM-DD)
+        limit: Page size (default: 20, max: 100)
+        cursor: `next_cursor` from the previous page
+    """
+    query = (request.args.get("q") or "").strip()
+    if not query:
+        return jsonify({
+            "success": False,
+            "error": "Query parameter 'q' is required"
+        }), 400
+
+    try:
+        after = decode_search_cursor(request.args["cursor"]) if request.args.get("cursor") else None
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
+
+    try:
+        limit = min(max(request.args.get("limit", type=int) or 20, 1), 100)
+
+        page = get_db().search(
+            query,
+            keyword=request.args.get("keyword"),
+            start_date=request.args.get("start_date"),
+            end_date=request.args.get("end_date"),
+            limit=limit,
+            after=after
+        )
+
+        return jsonify({
+            "success": True,
+            "count": len(page["results"]),
+            "data": page["results"],
+            "next_cursor": page["next_cursor"]
+        })
+
+    except Exception as e:
+        print(f"Error in search_articles: {e}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+@api.route("/api/keywords", methods=["GET"])
 def get_keywords():
     """Get all available keywords."""
     try:
-        keywords = db.get_keywords()
+        keywords = get_db().get_keywords()
         return jsonify({
             "success": True,
             "keywords": keywords
@@ -81,7 +292,7 @@ def get_keywords():
         }), 500
 
 
-@app.route("/api/stats", methods=["GET"])
+@api.route("/api/stats", methods=["GET"])
 def get_stats():
     """Get advanced statistics for sentiments including top/bottom keywords.
     
@@ -91,23 +302,23 @@ def get_stats():
         - top_keywords: Top 3 keywords with highest sentiment
         - bottom_keywords: Bottom 3 keywords with lowest sentiment
     """
-    try:
-        stats = db.get_advanced_stats()
-        
-        return jsonify({
-            "success": True,
-            "stats": stats
-        })
+    column_store = get_column_store()
+    db = get_db()
     
-    except Exception as e:
-        print(f"Error in get_stats: {e}")
-        return jsonify({
-            "success": False,
-            "error": str(e)
-        }), 500
+    def compute():
+        try:
+            stats = column_store.stats() if column_store else db.get_advanced_stats()
+            return {"success": True, "stats": stats}, 200
+        except Exception as e:
+            print(f"Error in get_stats: {e}")
+            return {"success": False, "error": str(e)}, 500
+    
+    # Identical concurrent requests share one computation
+    (payload, status), _ = current_app.extensions["single_flight"].do(("/api/stats",), compute)
+    return jsonify(payload), status
 
 
-@app.errorhandler(404)
+@api.app_errorhandler(404)
 def not_found(error):
     """Handle 404 errors."""
     return jsonify({
@@ -116,7 +327,7 @@ def not_found(error):
     }), 404
 
 
-@app.route("/api/trends", methods=["GET"])
+@api.route("/api/trends", methods=["GET"])
 def get_trends():
     """Get trend data from the database.
     
@@ -126,87 +337,407 @@ def get_trends():
     Query parameters:
         limit: Maximum number of records to return (default: 100)
     """
+    limit = request.args.get("limit", type=int) or 100
+    column_store = get_column_store()
+    db = get_db()
+    
+    # Identical concurrent requests share one computation
+    (payload, status), _ = current_app.extensions["single_flight"].do(
+        ("/api/trends", limit), lambda: compute_trends(db, column_store, limit)
+    )
+    return jsonify(payload), status
+
+
+@api.route("/api/dashboard", methods=["GET"])
+def get_dashboard():
+    """Stats, keywords and trend series in one payload.
+    
+    Served from a snapshot built once per data change and stored
+    gzip-compressed; clients that accept gzip get the stored bytes as-is.
+    Send If-None-Match with the returned ETag to get 304 when unchanged;
+    the gzip and identity bodies have different ETags.
+    """
     try:
-        limit = request.args.get("limit", type=int) or 100
-        
-        # Fetch data from database
-        sentiments_data = db.get_recent_sentiments(limit=limit)
-        
-        if not sentiments_data:
+        snapshot = current_app.extensions["dashboard"].get()
+    except Exception as e:
+        print(f"Error in get_dashboard: {e}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+    
+    gzipped = bool(request.accept_encodings["gzip"])
+    # Each encoding is a different representation and needs its own strong ETag
+    etag = f"{snapshot.etag}-gzip" if gzipped else snapshot.etag
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    elif gzipped:
+        response = Response(snapshot.gzipped, mimetype="application/json")
+        response.headers["Content-Encoding"] = "gzip"
+    else:
+        response = Response(snapshot.body, mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+@api.route("/api/analytics/timeseries", methods=["GET"])
+def get_timeseries_analytics():
+    """Rolling statistics and spike detection per keyword.
+
+    Computed from the daily rollups for all requested keywords at once and
+    cached until the stored data changes.
+
+    Query parameters:
+        keywords: Comma-separated keywords (default: all)
+        start_date: Start date (YYYY-MM-DD, default: 90 days ago)
+        end_date: End date (YYYY-MM-DD, default: today)
+        window: Rolling window in days (default: 7)
+        alpha: EWMA smoothing factor in (0, 1] (default: 0.3)
+        threshold: Absolute z-score that flags an anomaly (default: 2.0)
+    """
+    try:
+        keywords_param = request.args.get("keywords")
+        keywords = sorted({k.strip() for k in keywords_param.split(",") if k.strip()}) if keywords_param else None
+        end_date = request.args.get("end_date") or datetime.now().strftime("%Y-%m-%d")
+        start_date = request.args.get("start_date") or (
+            datetime.strptime(end_date, "%Y-%m-%d") - timedelta(days=90)
+        ).strftime("%Y-%m-%d")
+        window = request.args.get("window", default=7, type=int)
+        alpha = request.args.get("alpha", default=0.3, type=float)
+        threshold = request.args.get("threshold", default=2.0, type=float)
+
+        if window < 2 or not 0 < alpha <= 1 or threshold <= 0:
             return jsonify({
-                "success": True,
-                "count": 0,
-                "data": [],
-                "message": "No data in database. Use POST /api/trigger-etl to fetch data."
-            })
-        
-        # Transform data for chart consumption
-        # Group by keyword and date, calculate average sentiment per day
-        chart_data = {}
-        
-        for item in sentiments_data:
-            keyword = item.get('keyword', 'Unknown')
-            if not keyword:
-                keyword = 'Unknown'
-                
-            # Date handling
-            raw_date = item.get('created_at', datetime.now().isoformat())
-            try:
-                # Handle both string and datetime objects
-                if isinstance(raw_date, str):
-                    date = raw_date.split('T')[0]
-                else:
-                    date = raw_date.strftime("%Y-%m-%d")
-            except:
-                date = datetime.now().strftime("%Y-%m-%d")
-
-            sentiment = item.get('sentiment', 0.0)
-            
-            # Create unique key
-            key = f"{keyword}_{date}"
-            
-            if key not in chart_data:
-                chart_data[key] = {
-                    'keyword': keyword,
-                    'date': date,
-                    'sentiments': [],
-                    'articles': 0
-                }
-            
-            chart_data[key]['sentiments'].append(sentiment)
-            chart_data[key]['articles'] += 1
-        
-        # Calculate averages and format for chart
-        formatted_data = []
-        for key, data in chart_data.items():
-            avg_sentiment = sum(data['sentiments']) / len(data['sentiments']) if data['sentiments'] else 0.0
-            
-            formatted_data.append({
-                'date': data['date'],
-                'keyword': data['keyword'],
-                'name': data['keyword'], 
-                'sentiment': round(avg_sentiment, 2),
-                'articles': data['articles']
-            })
-        
-        # Sort by date
-        formatted_data.sort(key=lambda x: x['date'])
-        
+                "success": False,
+                "error": "Require window >= 2, 0 < alpha <= 1 and threshold > 0"
+            }), 400
+
+        from analytics.timeseries import build_daily_matrix, compute_timeseries
+        db = get_db()
+
+        def compute():
+            rows = db.get_daily_aggregates(keywords=keywords, start_date=start_date, end_date=end_date)
+            matrix = build_daily_matrix(rows, keywords=keywords, start_date=start_date, end_date=end_date)
+            return compute_timeseries(matrix, window=window, alpha=alpha, z_threshold=threshold)
+
+        key = ("timeseries", tuple(keywords or ()), start_date, end_date, window, alpha, threshold)
+        result = current_app.extensions["analytics_cache"].get_or_compute(key, db.get_data_generation(), compute)
+
         return jsonify({
             "success": True,
-            "count": len(formatted_data),
-            "data": formatted_data
+            "start_date": start_date,
+            "end_date": end_date,
+            "window": window,
+            "alpha": alpha,
+            "threshold": threshold,
+            "data": result["series"],
+            "anomalies": result["anomalies"]
         })
-    
+
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
+    except Exception as e:
+        print(f"Error in get_timeseries_analytics: {e}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+@api.route("/api/analytics/correlations", methods=["GET"])
+def get_correlation_analytics():
+    """Correlation of daily sentiment between keywords.
+
+    Each keyword's daily mean sentiment is aligned on a shared calendar;
+    every pair is correlated over the days both have articles. Cached until
+    the stored data changes.
+
+    Query parameters:
+        keywords: Comma-separated keywords (default: all)
+        start_date: Start date (YYYY-MM-DD, default: 90 days ago)
+        end_date: End date (YYYY-MM-DD, default: today)
+        method: pearson (default) or spearman
+        lag: Days the row keyword leads the column keyword (default: 0)
+        min_periods: Overlapping days needed for a coefficient (default: 5)
+    """
+    try:
+        keywords_param = request.args.get("keywords")
+        keywords = sorted({k.strip() for k in keywords_param.split(",") if k.strip()}) if keywords_param else None
+        end_date = request.args.get("end_date") or datetime.now().strftime("%Y-%m-%d")
+        start_date = request.args.get("start_date") or (
+            datetime.strptime(end_date, "%Y-%m-%d") - timedelta(days=90)
+        ).strftime("%Y-%m-%d")
+        method = request.args.get("method", "pearson")
+        lag = request.args.get("lag", default=0, type=int)
+        min_periods = request.args.get("min_periods", default=5, type=int)
+
+        if abs(lag) > 60 or min_periods < 2:
+            return jsonify({
+                "success": False,
+                "error": "Require -60 <= lag <= 60 and min_periods >= 2"
+            }), 400
+
+        from analytics.correlations import compute_correlations
+        from analytics.timeseries import build_daily_matrix
+        db = get_db()
+
+        def compute():
+            rows = db.get_daily_aggregates(keywords=keywords, start_date=start_date, end_date=end_date)
+            matrix = build_daily_matrix(rows, keywords=keywords, start_date=start_date, end_date=end_date)
+            return compute_correlations(matrix, method=method, lag=lag, min_periods=min_periods)
+
+        key = ("correlations", tuple(keywords or ()), start_date, end_date, method, lag, min_periods)
+        result = current_app.extensions["analytics_cache"].get_or_compute(key, db.get_data_generation(), compute)
+
+        return jsonify({
+            "success": True,
+            "start_date": start_date,
+            "end_date": end_date,
+            "method": method,
+            "lag": lag,
+            "min_periods": min_periods,
+            "data": result
+        })
+
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
+    except Exception as e:
+        print(f"Error in get_correlation_analytics: {e}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+@api.route("/api/movers", methods=["GET"])
+def get_movers():
+    """Keywords ranked by how much their sentiment moved between two windows.
+
+    Compares the last `window` days up to end_date with the `compare` days
+    before them, using the daily rollups, and caches the result until the
+    stored data changes.
+
+    Query parameters:
+        window: Days in the current window (default: 7)
+        compare: Days in the previous window (default: same as window)
+        end_date: Last day of the current window (YYYY-MM-DD, default: today)
+        source: Only this source (reddit, news, hackernews)
+        min_articles: Articles needed in each window for a significance
+            score (default: 3)
+        sort: significance (default), delta or volume
+        limit: Maximum number of keywords (default: 10)
+    """
+    try:
+        window = request.args.get("window", default=7, type=int)
+        compare = request.args.get("compare", default=window, type=int)
+        end_date = request.args.get("end_date") or datetime.now().strftime("%Y-%m-%d")
+        source = request.args.get("source")
+        min_articles = request.args.get("min_articles", default=3, type=int)
+        sort = request.args.get("sort", "significance")
+        limit = request.args.get("limit", default=10, type=int)
+
+        if window < 1 or compare < 1 or min_articles < 2 or limit < 1:
+            return jsonify({
+                "success": False,
+                "error": "Require window >= 1, compare >= 1, min_articles >= 2 and limit >= 1"
+            }), 400
+
+        from analytics.movers import compute_movers, window_bounds
+        current, previous = window_bounds(end_date, window, compare)
+        db = get_db()
+
+        def compute():
+            rows = db.get_window_totals(current, previous, sources=[source] if source else None)
+            return compute_movers(rows, min_articles=min_articles, sort=sort)
+
+        key = ("movers", current, previous, source, min_articles, sort)
+        movers = current_app.extensions["analytics_cache"].get_or_compute(key, db.get_data_generation(), compute)
+
+        return jsonify({
+            "success": True,
+            "current": {"start_date": current[0], "end_date": current[1]},
+            "previous": {"start_date": previous[0], "end_date": previous[1]},
+            "count": min(len(movers), limit),
+            "data": movers[:limit]
+        })
+
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
+    except Exception as e:
+        print(f"Error in get_movers: {e}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+@api.route("/api/batch", methods=["GET"])
+def get_batch():
+    """Sentiment series of many keywords in one request.
+
+    All keywords share the date range and sources and are answered by one
+    grouped query over the daily rollups (plus one windowed query for
+    `articles`). The result is cached until the stored data changes.
+
+    Query parameters:
+        keywords: Comma-separated keywords (required, at most 50)
+        sources: Comma-separated sources (default: all)
+        start_date: Start date (YYYY-MM-DD, default: 30 days ago)
+        end_date: End date (YYYY-MM-DD, default: today)
+        articles: Latest articles returned per keyword (default: 0, at most 100)
+    """
+    try:
+        from analytics.batch import MAX_ARTICLES, MAX_KEYWORDS, build_batch, parse_list
+
+        keywords = parse_list(request.args.get("keywords"))
+        sources = parse_list(request.args.get("sources"))
+        end_date = request.args.get("end_date") or datetime.now().strftime("%Y-%m-%d")
+        start_date = request.args.get("start_date") or (
+            datetime.strptime(end_date, "%Y-%m-%d") - timedelta(days=30)
+        ).strftime("%Y-%m-%d")
+        articles = request.args.get("articles", default=0, type=int)
+
+        if not 1 <= len(keywords) <= MAX_KEYWORDS or not 0 <= articles <= MAX_ARTICLES:
+            return jsonify({
+                "success": False,
+                "error": f"Require 1 to {MAX_KEYWORDS} keywords and 0 <= articles <= {MAX_ARTICLES}"
+            }), 400
+        datetime.strptime(start_date, "%Y-%m-%d")
+
+        db = get_db()
+
+        def compute():
+            daily = db.get_daily_aggregates(keywords=keywords, sources=sources or None,
+                                            start_date=start_date, end_date=end_date)
+            columns = rows = None
+            if articles:
+                columns, rows = db.get_latest_rows_per_keyword(keywords, sources=sources or None, start_date=start_date,
+                                                               end_date=end_date, limit=articles)
+            return build_batch(keywords, daily, columns, rows)
+
+        key = ("batch", tuple(keywords), tuple(sorted(sources)), start_date, end_date, articles)
+        data = current_app.extensions["analytics_cache"].get_or_compute(key, db.get_data_generation(), compute)
+
+        return jsonify({
+            "success": True,
+            "start_date": start_date,
+            "end_date": end_date,
+            "sources": sources,
+            "count": len(data),
+            "data": data
+        })
+
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
+    except Exception as e:
+        print(f"Error in get_batch: {e}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+@api.route("/api/discover", methods=["GET"])
+def discover_terms():
+    """Terms from fetched titles that are rising faster than their baseline.
+
+    The ETL counts every new title's words and word pairs in fixed-size
+    sketches per time window (etl/discovery.py); this ranks the latest
+    window's frequent terms by their growth over the earlier windows.
+
+    Query parameters:
+        limit: Maximum number of terms (default: 20)
+        min_count: Titles a term must appear in (default: DISCOVERY_MIN_COUNT)
+        include_tracked: Also list terms that are tracked keywords (default: false)
+    """
+    try:
+        limit = request.args.get("limit", default=20, type=int)
+        min_count = request.args.get("min_count", default=Config.DISCOVERY_MIN_COUNT, type=int)
+        include_tracked = request.args.get("include_tracked", "false").lower() == "true"
+
+        if not 1 <= limit <= 200 or min_count < 1:
+            return jsonify({
+                "success": False,
+                "error": "Require 1 <= limit <= 200 and min_count >= 1"
+            }), 400
+
+        from etl.discovery import TrendDiscovery
+        from etl.keyword_matcher import parse_aliases
+        db = get_db()
+        tracked = set(Config.KEYWORDS) | set(db.get_keywords())
+        for aliases in parse_aliases(Config.KEYWORD_ALIASES).values():
+            tracked.update(aliases)
+
+        result = TrendDiscovery.from_config(db, Config).rising(
+            limit=limit, min_count=min_count, tracked=tracked, include_tracked=include_tracked
+        )
+
+        return jsonify({
+            "success": True,
+            "window": result["window"],
+            "baseline": result["baseline"],
+            "count": len(result["terms"]),
+            "data": result["terms"]
+        })
+
     except Exception as e:
-        print(f"Error in get_trends: {e}")
+        print(f"Error in discover_terms: {e}")
         return jsonify({
             "success": False,
             "error": str(e)
         }), 500
 
 
-@app.route("/api/trigger-etl", methods=["POST"])
+@api.route("/api/stream", methods=["GET"])
+def stream_events():
+    """Server-Sent Events stream of new articles and changed aggregates.
+    
+    Events:
+        ready: First event of a new connection; its id is the resume point
+        articles: Newly linked articles (same fields as /api/trends input)
+        aggregates: Updated keyword/day rows in the /api/trends format
+        refresh: Data changed in a way deltas cannot express; refetch
+    
+    Reconnecting clients send Last-Event-ID (EventSource does this
+    automatically) and receive only what they missed.
+    """
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({
+            "success": False,
+            "error": "Last-Event-ID must be an integer"
+        }), 400
+    
+    feed = get_change_feed()
+    stream = current_app.extensions["event_bus"].subscribe(
+        last_event_id=last_event_id,
+        feed=feed,
+        heartbeat=Config.STREAM_HEARTBEAT
+    )
+    return Response(stream, mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        # Stop nginx from buffering the stream
+        "X-Accel-Buffering": "no"
+    })
+
+
+@api.route("/api/trigger-etl", methods=["POST"])
 def trigger_etl():
     """Manually trigger the ETL pipeline to fetch and save data.
     
@@ -222,13 +753,21 @@ def trigger_etl():
         
         print("🚀 Triggering ETL pipeline...")
         
+        # Imported here so read-only workers never load the ETL/Gemini stack
+        from etl.data_fetcher import fetch_all_trends_data, usage_tracker
+        
         # Fetch data from external APIs and save to database
         trends_data = fetch_all_trends_data(keywords)
         
+        column_store = get_column_store()
+        if column_store:
+            column_store.sync()
+        
         return jsonify({
             "success": True,
             "message": f"ETL completed. Processed {len(trends_data)} articles.",
-            "count": len(trends_data)
+            "count": len(trends_data),
+            "usage": usage_tracker.totals()
         })
     
     except Exception as e:
@@ -239,7 +778,57 @@ def trigger_etl():
         }), 500
 
 
-@app.errorhandler(500)
+@api.route("/api/etl/runs", methods=["GET"])
+def get_etl_runs():
+    """Recent ETL runs with their time split (sleep, network, llm, sqlite,
+    other), throughput and counters, newest first.
+    
+    Query parameters:
+        limit: Maximum number of runs (default: 20, max: 200)
+        pipeline: Only runs of this entry point ("etl", "fetch")
+    """
+    try:
+        limit = min(max(request.args.get("limit", type=int) or 20, 1), 200)
+        runs = get_db().get_etl_runs(limit=limit, pipeline=request.args.get("pipeline"))
+        return jsonify({
+            "success": True,
+            "count": len(runs),
+            "data": runs
+        })
+    
+    except Exception as e:
+        print(f"Error in get_etl_runs: {e}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+@api.route("/api/etl/runs/<run_id>", methods=["GET"])
+def get_etl_run(run_id: str):
+    """Full trace of one ETL run, including per-stage and per-keyword timings."""
+    try:
+        run = get_db().get_etl_run(run_id)
+        if not run:
+            return jsonify({
+                "success": False,
+                "error": "Run not found"
+            }), 404
+        
+        return jsonify({
+            "success": True,
+            "data": run
+        })
+    
+    except Exception as e:
+        print(f"Error in get_etl_run: {e}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+@api.app_errorhandler(500)
 def internal_error(error):
     """Handle 500 errors."""
     return jsonify({
@@ -248,7 +837,32 @@ def internal_error(error):
     }), 500
 
 
+_default_app: Optional[Flask] = None
+
+
+def __getattr__(name: str):
+    """Build the default `app` (for `flask run` and `from app import app`) on first access.
+
+    Importing the module for create_app alone (serve.py, gunicorn's
+    "app:create_app(prewarm=True)") then builds no second app and loads no
+    second column store.
+    """
+    global _default_app
+    if name == "app":
+        if _default_app is None:
+            _default_app = create_app()
+        return _default_app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 if __name__ == "__main__":
+    app = create_app()
+    if Config.SCHEDULER_ENABLED:
+        from etl.scheduler import RefreshScheduler
+        scheduler = RefreshScheduler()
+        scheduler.seed_from_database(app.extensions["db"])
+        scheduler.start()
+
     app.run(
         host=Config.FLASK_HOST,
         port=5001,
@@ -0,0 +1,158 @@
+"""Measure per-row CPU time and memory of the record load and read paths.
+
+Three comparisons on synthetic rows, each reported per row:
+
+- records: building a batch of records from transformed dicts, as the
+  former dataclass, as the slotted SentimentRecord, and as the tuple rows
+  of SentimentBatch (time and bytes allocated, via tracemalloc);
+- load: DataLoader.load_record per row (one transaction each, as
+  load_batch used to do) against load_batch (vectorized validation and
+  one executemany transaction per keyword), each into a fresh database;
+- read: sqlite3.Row -> dict against plain tuples from the cursor.
+
+    python -m benchmarks.bench_records --rows 5000
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from database.db import Database
+from etl.load import DataLoader
+from models.sentiment import SentimentBatch, SentimentRecord
+
+KEYWORDS = ["AI", "Python", "Rust", "Next.js", "Kubernetes", "WebAssembly"]
+SOURCES = ["news", "reddit", "hackernews"]
+
+
+@dataclass
+class DataclassRecord:
+    """SentimentRecord as it was before it was slotted."""
+
+    keyword: str
+    source: str
+    title: str
+    content: str
+    url: str
+    sentiment_score: float
+    summary: str
+    created_at: Optional[datetime] = None
+    id: Optional[int] = None
+    model: Optional[str] = None
+    prompt_version: Optional[str] = None
+
+
+def make_records(rows: int, seed: int = 7) -> List[Dict[str, Any]]:
+    """`rows` transformed record dicts with random keywords and scores."""
+    rng = random.Random(seed)
+    words = "model release performance benchmark framework startup security cloud".split()
+    return [{
+        "keyword": rng.choice(KEYWORDS),
+        "source": rng.choice(SOURCES),
+        "title": " ".join(rng.choice(words) for _ in range(8)).capitalize(),
+        "content": " ".join(rng.choice(words) for _ in range(60)),
+        "url": f"https://example.com/{i}",
+        "sentiment_score": round(rng.uniform(-1, 1), 3),
+        "summary": " ".join(rng.choice(words) for _ in range(25)),
+        "model": "gemini-2.0-flash",
+        "prompt_version": "sentiment-v1",
+    } for i in range(rows)]
+
+
+def measure(fn: Callable[[], Any]) -> Tuple[float, int]:
+    """Seconds taken by fn() and bytes still allocated by its result."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return seconds, size
+
+
+def record_cases(records: List[Dict[str, Any]]) -> List[Tuple[str, Callable[[], Any]]]:
+    """(name, builder) pairs turning `records` into each representation."""
+    fields = ("keyword", "source", "title", "content", "url", "sentiment_score", "summary", "model",
+              "prompt_version")
+
+    def objects(cls):
+        return lambda: [cls(**{name: record.get(name) for name in fields}) for record in records]
+
+    return [
+        ("dataclass (before)", objects(DataclassRecord)),
+        ("slotted SentimentRecord", objects(SentimentRecord)),
+        ("SentimentBatch tuples", lambda: SentimentBatch.from_dicts(records).rows),
+    ]
+
+
+def fresh_db(temp_dir: str, name: str) -> Database:
+    """Empty database with the schema in `temp_dir`."""
+    db = Database(db_path=os.path.join(temp_dir, f"{name}.db"))
+    db.create_tables()
+    return db
+
+
+def main():
+    """Print per-row time and memory for each case."""
+    parser = argparse.ArgumentParser(description="Benchmark record building, loading and reading")
+    parser.add_argument("--rows", type=int, default=5000, help="Records per case")
+    args = parser.parse_args()
+
+    records = make_records(args.rows)
+    temp_dir = tempfile.mkdtemp()
+    try:
+        print(f"{args.rows} rows")
+        print(f"{'case':<36} {'us/row':>9} {'bytes/row':>10}")
+
+        for name, fn in record_cases(records):
+            seconds, size = measure(fn)
+            print(f"{'records: ' + name:<36} {seconds * 1e6 / args.rows:>9.2f} {size / args.rows:>10.0f}")
+
+        row_loader = DataLoader(db=fresh_db(temp_dir, "rows"))
+        start = time.perf_counter()
+        for record in records:
+            row_loader.load_record(record)
+        seconds = time.perf_counter() - start
+        print(f"{'load: per record (before)':<36} {seconds * 1e6 / args.rows:>9.2f} {'-':>10}")
+
+        batch_db = fresh_db(temp_dir, "batch")
+        start = time.perf_counter()
+        stats = DataLoader(db=batch_db).load_batch(records)
+        seconds = time.perf_counter() - start
+        assert stats["loaded"] == args.rows, stats
+        print(f"{'load: load_batch':<36} {seconds * 1e6 / args.rows:>9.2f} {'-':>10}")
+
+        query = "SELECT * FROM sentiments ORDER BY created_at DESC"
+
+        def as_dicts():
+            conn = sqlite3.connect(batch_db.db_path)
+            conn.row_factory = sqlite3.Row
+            try:
+                return [dict(row) for row in conn.execute(query).fetchall()]
+            finally:
+                conn.close()
+
+        def as_tuples():
+            conn = sqlite3.connect(batch_db.db_path)
+            try:
+                return conn.execute(query).fetchall()
+            finally:
+                conn.close()
+
+        for name, fn in (("sqlite3.Row -> dict (before)", as_dicts), ("tuples", as_tuples)):
+            seconds, size = measure(fn)
+            print(f"{'read: ' + name:<36} {seconds * 1e6 / args.rows:>9.2f} {size / args.rows:>10.0f}")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Measure JSON encoding time and bytes on the wire for dashboard payloads.
+
+Builds a throwaway database with synthetic articles, then times the
+/api/sentiments read path (query + encode) the old way (sqlite3.Row ->
+dict -> json.dumps, as Flask's default provider does) against the Rows
+path with the configured serializer, and reports the response size
+uncompressed, gzip'd and (if installed) brotli'd.
+
+    python -m benchmarks.bench_serialization --rows 20000
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from typing import Tuple
+
+from api.compression import available_encodings, compress_body
+from api.serialization import SERIALIZER, Rows, dumps
+from database.db import Database
+
+KEYWORDS = ["AI", "Python", "Rust", "Next.js", "Kubernetes", "WebAssembly"]
+SOURCES = ["news", "reddit", "hackernews"]
+
+
+def populate(db: Database, rows: int, seed: int = 7):
+    """Insert `rows` synthetic articles linked to random keywords."""
+    rng = random.Random(seed)
+    words = "model release performance benchmark framework startup security cloud".split()
+    with db.get_connection() as conn:
+        for i in range(rows):
+            title = " ".join(rng.choice(words) for _ in range(8)).capitalize()
+            cursor = conn.execute(
+                "INSERT INTO articles (source, title, content, url, sentiment_score, summary) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (rng.choice(SOURCES), title, " ".join(rng.choice(words) for _ in range(60)),
+                 f"https://example.com/{i}", round(rng.uniform(-1, 1), 3),
+                 " ".join(rng.choice(words) for _ in range(25)))
+            )
+            conn.execute(
+                "INSERT INTO article_keywords (article_id, keyword, created_at) "
+                "SELECT id, ?, created_at FROM articles WHERE id = ?",
+                (rng.choice(KEYWORDS), cursor.lastrowid)
+            )
+
+
+def best_of(fn, runs: int) -> Tuple[float, bytes]:
+    """Fastest of `runs` calls, in seconds, and the last result."""
+    best, result = float("inf"), None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    """Print timing and size for each encoding strategy."""
+    parser = argparse.ArgumentParser(description="Benchmark API serialization and compression")
+    parser.add_argument("--rows", type=int, default=20000, help="Articles in the payload")
+    parser.add_argument("--runs", type=int, default=5, help="Samples per case (best is reported)")
+    args = parser.parse_args()
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        db = Database(db_path=os.path.join(temp_dir, "bench.db"))
+        db.create_tables()
+        populate(db, args.rows)
+
+        def baseline():
+            data = db.get_sentiments()
+            payload = {"success": True, "count": len(data), "data": data}
+            return json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+        def rows(shape):
+            def run():
+                columns, tuples = db.get_sentiment_rows()
+                payload = {"success": True, "count": len(tuples), "data": Rows(columns, tuples, shape)}
+                return dumps(payload)
+            return run
+
+        cases = [
+            ("dict + json (before)", baseline),
+            (f"Rows records + {SERIALIZER}", rows("records")),
+            (f"Rows table + {SERIALIZER}", rows("table")),
+        ]
+
+        print(f"{args.rows} rows, serializer={SERIALIZER}")
+        header = f"{'case':<28} {'ms':>8} {'raw KB':>9}"
+        for encoding in available_encodings():
+            header += f" {encoding + ' KB':>9} {encoding + ' ms':>8}"
+        print(header)
+        for name, fn in cases:
+            seconds, body = best_of(fn, args.runs)
+            line = f"{name:<28} {seconds * 1000:>8.1f} {len(body) / 1024:>9.1f}"
+            for encoding in available_encodings():
+                compress_seconds, compressed = best_of(lambda: compress_body(body, encoding, 6), args.runs)
+                line += f" {len(compressed) / 1024:>9.1f} {compress_seconds * 1000:>8.1f}"
+            print(line)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Measure API cold-start time.
+
+Each sample runs in a fresh interpreter, so it includes every import the
+worker pays for. The "eager ETL" case imports the ETL/Gemini stack the way
+app.py used to at module import time, for comparison.
+
+    python -m benchmarks.bench_startup --runs 10
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = {
+    "create_app": "from app import create_app; create_app()",
+    "create_app(prewarm)": "from app import create_app; create_app(prewarm=True)",
+    "eager ETL import": "import google.generativeai, etl.data_fetcher; from app import create_app; create_app()",
+}
+
+TIMER = """
+import time
+start = time.perf_counter()
+{code}
+print(time.perf_counter() - start)
+"""
+
+
+def time_case(code: str, runs: int) -> list:
+    """Run `code` in `runs` fresh interpreters and return the timings (s)."""
+    timings = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", TIMER.format(code=code)],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+def main():
+    """Print median and p90 startup time for each case."""
+    parser = argparse.ArgumentParser(description="Benchmark API cold start")
+    parser.add_argument("--runs", type=int, default=5, help="Samples per case")
+    args = parser.parse_args()
+
+    print(f"{'case':<22} {'median ms':>10} {'p90 ms':>10}")
+    for name, code in CASES.items():
+        try:
+            timings = sorted(time_case(code, args.runs))
+        except subprocess.CalledProcessError as e:
+            print(f"{name:<22} failed: {e.stderr.strip().splitlines()[-1] if e.stderr else e}")
+            continue
+        p90 = timings[min(len(timings) - 1, int(len(timings) * 0.9))]
+        print(f"{name:<22} {statistics.median(timings) * 1000:>10.1f} {p90 * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
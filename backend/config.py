@@ -12,6 +12,7 @@ class Config:
     
     # API Keys
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
+    GEMINI_MODEL: str = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
     REDDIT_CLIENT_ID: str = os.getenv("REDDIT_CLIENT_ID", "")
     REDDIT_CLIENT_SECRET: str = os.getenv("REDDIT_CLIENT_SECRET", "")
     REDDIT_USER_AGENT: str = os.getenv("REDDIT_USER_AGENT", "TrendSense/1.0")
@@ -31,9 +32,104 @@ class Config:
         for keyword in os.getenv("KEYWORDS", "Next.js,TypeScript,AI,React,Python").split(",")
     ]
     
+    # Other spellings per keyword: "Keyword:Alias|Alias,Keyword:Alias"
+    KEYWORD_ALIASES: str = os.getenv(
+        "KEYWORD_ALIASES", "Next.js:NextJS|Next js,React:ReactJS|React.js,AI:Artificial Intelligence"
+    )
+    
     # ETL Settings
+    # Pack keywords into OR-queries per source and tag results locally
+    COMBINED_QUERIES: bool = os.getenv("COMBINED_QUERIES", "True").lower() == "true"
     REDDIT_LIMIT: int = int(os.getenv("REDDIT_LIMIT", "10"))
     NEWS_LIMIT: int = int(os.getenv("NEWS_LIMIT", "10"))
+    REDDIT_SUBREDDITS: List[str] = [
+        name.strip()
+        for name in os.getenv("REDDIT_SUBREDDITS", "programming,webdev,learnprogramming,technology").split(",")
+        if name.strip()
+    ]
+    # Subreddits followed by `python -m etl.main --stream` (default: REDDIT_SUBREDDITS)
+    REDDIT_STREAM_SUBREDDITS: List[str] = [
+        name.strip() for name in os.getenv("REDDIT_STREAM_SUBREDDITS", "").split(",") if name.strip()
+    ]
+    REDDIT_STREAM_BATCH_SIZE: int = int(os.getenv("REDDIT_STREAM_BATCH_SIZE", "10"))
+    REDDIT_STREAM_FLUSH_INTERVAL: int = int(os.getenv("REDDIT_STREAM_FLUSH_INTERVAL", "60"))
+    
+    # Source resilience (etl/resilience.py): run deadline for fetching (0: none),
+    # per-request timeout, circuit breakers and hedged duplicate requests
+    ETL_RUN_DEADLINE: float = float(os.getenv("ETL_RUN_DEADLINE", "600"))
+    SOURCE_TIMEOUT: float = float(os.getenv("SOURCE_TIMEOUT", "10"))
+    CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "3"))
+    CIRCUIT_RESET_TIMEOUT: float = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "300"))
+    HEDGED_SOURCES: List[str] = [
+        name.strip() for name in os.getenv("HEDGED_SOURCES", "hackernews").split(",") if name.strip()
+    ]
+    HEDGE_DELAY: float = float(os.getenv("HEDGE_DELAY", "2"))
+    
+    # Shared HTTP client (etl/http_client.py): keep-alive connections per host and an
+    # on-disk response cache; TTLS lists seconds a response stays fresh per host
+    HTTP_POOL_SIZE: int = int(os.getenv("HTTP_POOL_SIZE", "10"))
+    HTTP_CACHE_DIR: str = os.getenv(
+        "HTTP_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "http_cache")
+    )
+    HTTP_CACHE_TTLS: str = os.getenv("HTTP_CACHE_TTLS", "hn.algolia.com=300,newsapi.org=900")
+    HTTP_CACHE_MAX_ENTRIES: int = int(os.getenv("HTTP_CACHE_MAX_ENTRIES", "1000"))
+    
+    # LLM prompts: token budget for article text, optional per-call usage log (JSON lines)
+    LLM_PROMPT_MAX_TOKENS: int = int(os.getenv("LLM_PROMPT_MAX_TOKENS", "300"))
+    LLM_USAGE_LOG: str = os.getenv("LLM_USAGE_LOG", "")
+    # Schema-constrained JSON replies (needs a model that supports response_schema)
+    LLM_STRUCTURED_OUTPUT: bool = os.getenv("LLM_STRUCTURED_OUTPUT", "True").lower() == "true"
+    
+    # Re-scoring backfill (etl/backfill.py)
+    BACKFILL_CHUNK_SIZE: int = int(os.getenv("BACKFILL_CHUNK_SIZE", "50"))
+    BACKFILL_CONCURRENCY: int = int(os.getenv("BACKFILL_CONCURRENCY", "4"))
+    BACKFILL_REQUEST_INTERVAL: float = float(os.getenv("BACKFILL_REQUEST_INTERVAL", "0.5"))
+    
+    # Sharded ETL workers (etl/workers.py)
+    ETL_WORKERS: int = int(os.getenv("ETL_WORKERS", "4"))
+    ETL_LEASE_TTL: float = float(os.getenv("ETL_LEASE_TTL", "120"))
+    ETL_MAX_ATTEMPTS: int = int(os.getenv("ETL_MAX_ATTEMPTS", "3"))
+    
+    # Refresh Scheduler (intervals in seconds)
+    SCHEDULER_ENABLED: bool = os.getenv("SCHEDULER_ENABLED", "False").lower() == "true"
+    SCHEDULER_MIN_INTERVAL: int = int(os.getenv("SCHEDULER_MIN_INTERVAL", "900"))
+    SCHEDULER_MAX_INTERVAL: int = int(os.getenv("SCHEDULER_MAX_INTERVAL", "21600"))
+    SCHEDULER_HOURLY_BUDGET: int = int(os.getenv("SCHEDULER_HOURLY_BUDGET", "20"))
+    SCHEDULER_TARGET_ITEMS: float = float(os.getenv("SCHEDULER_TARGET_ITEMS", "3"))
+    SCHEDULER_JITTER: float = float(os.getenv("SCHEDULER_JITTER", "0.1"))
+    
+    # In-memory columnar cache for dashboard queries
+    COLUMNAR_CACHE: bool = os.getenv("COLUMNAR_CACHE", "False").lower() == "true"
+    COLUMNAR_SNAPSHOT_PATH: str = os.getenv("COLUMNAR_SNAPSHOT_PATH", "")
+    
+    # Retention (article text older than the hot window is compressed)
+    RETENTION_HOT_DAYS: int = int(os.getenv("RETENTION_HOT_DAYS", "30"))
+    RETENTION_BATCH_SIZE: int = int(os.getenv("RETENTION_BATCH_SIZE", "500"))
+    RETENTION_VACUUM_PAGES: int = int(os.getenv("RETENTION_VACUUM_PAGES", "1000"))
+    RETENTION_CODEC: str = os.getenv("RETENTION_CODEC", "")
+    RETENTION_INTERVAL: int = int(os.getenv("RETENTION_INTERVAL", "86400"))
+    
+    # Response compression (bodies below the threshold are sent uncompressed)
+    RESPONSE_COMPRESSION_MIN_SIZE: int = int(os.getenv("RESPONSE_COMPRESSION_MIN_SIZE", "1024"))
+    RESPONSE_COMPRESSION_LEVEL: int = int(os.getenv("RESPONSE_COMPRESSION_LEVEL", "6"))
+    
+    # Server-Sent Events stream (/api/stream)
+    STREAM_POLL_INTERVAL: float = float(os.getenv("STREAM_POLL_INTERVAL", "2"))
+    STREAM_HEARTBEAT: float = float(os.getenv("STREAM_HEARTBEAT", "15"))
+    STREAM_BUFFER_SIZE: int = int(os.getenv("STREAM_BUFFER_SIZE", "256"))
+    
+    # Precomputed /api/dashboard snapshot
+    DASHBOARD_TRENDS_LIMIT: int = int(os.getenv("DASHBOARD_TRENDS_LIMIT", "100"))
+    DASHBOARD_COMPRESSION_LEVEL: int = int(os.getenv("DASHBOARD_COMPRESSION_LEVEL", "9"))
+    
+    # Trending term discovery over fetched titles (etl/discovery.py)
+    DISCOVERY_WINDOW_HOURS: int = int(os.getenv("DISCOVERY_WINDOW_HOURS", "24"))
+    DISCOVERY_BASELINE_WINDOWS: int = int(os.getenv("DISCOVERY_BASELINE_WINDOWS", "7"))
+    DISCOVERY_CAPACITY: int = int(os.getenv("DISCOVERY_CAPACITY", "500"))
+    DISCOVERY_SKETCH_WIDTH: int = int(os.getenv("DISCOVERY_SKETCH_WIDTH", "2048"))
+    DISCOVERY_SKETCH_DEPTH: int = int(os.getenv("DISCOVERY_SKETCH_DEPTH", "4"))
+    DISCOVERY_MAX_NGRAM: int = int(os.getenv("DISCOVERY_MAX_NGRAM", "2"))
+    DISCOVERY_MIN_COUNT: int = int(os.getenv("DISCOVERY_MIN_COUNT", "3"))
     
     @classmethod
     def validate(cls) -> bool:
@@ -0,0 +1,32 @@
+"""Compression codecs for archived article text."""
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency; zlib is always available
+    zstandard = None
+
+AVAILABLE_CODECS = ["zlib"] + (["zstd"] if zstandard else [])
+DEFAULT_CODEC = "zstd" if zstandard else "zlib"
+
+
+def compress(data: bytes, codec: str = DEFAULT_CODEC) -> bytes:
+    """Compress `data` with the named codec."""
+    if codec == "zstd":
+        if not zstandard:
+            raise ValueError("zstd codec requires the 'zstandard' package")
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    if codec == "zlib":
+        return zlib.compress(data, 9)
+    raise ValueError(f"Unknown codec: {codec}")
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    """Decompress `data` produced by compress() with the same codec."""
+    if codec == "zstd":
+        if not zstandard:
+            raise ValueError("zstd codec requires the 'zstandard' package")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "zlib":
+        return zlib.decompress(data)
+    raise ValueError(f"Unknown codec: {codec}")
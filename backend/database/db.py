@@ -1,10 +1,77 @@
 """Database connection and utility functions."""
+import base64
+import json
+import re
 import sqlite3
 import os
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Set, Tuple
 from contextlib import contextmanager
 from datetime import datetime
 from config import Config
+from database.codecs import compress, decompress
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schema.sql")
+FTS_SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fts.sql")
+
+# Column weights for BM25 ranking: title, summary, content
+SEARCH_WEIGHTS = "bm25(10.0, 5.0, 1.0)"
+# Words per search snippet, as passed to FTS5's snippet()
+SNIPPET_TOKENS = 16
+
+
+def build_match_query(text: str) -> str:
+    """Turn free text into a safe FTS5 query.
+
+    Every term is quoted so punctuation such as "Next.js" or "C++" cannot
+    break the query syntax; terms are ANDed. A trailing '*' keeps prefix search.
+    """
+    terms = []
+    for term in text.split():
+        prefix = term.endswith("*")
+        term = term.rstrip("*").replace('"', '""')
+        if term:
+            terms.append(f'"{term}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+def make_snippet(text: str, query: str, tokens: int = SNIPPET_TOKENS) -> str:
+    """Excerpt of `text` around the first query term, marked up like snippet().
+
+    Used for archived articles, whose content no longer lives in `articles`
+    where FTS5 reads it from. Words starting with a query term are marked.
+    """
+    terms = [term.strip('*"').lower() for term in query.split()]
+    terms = [term for term in terms if term]
+    words = text.split()
+
+    def matches(word: str) -> bool:
+        word = re.sub(r"^\W+|\W+$", "", word).lower()
+        return bool(word) and any(word.startswith(term) for term in terms)
+
+    first = next((i for i, word in enumerate(words) if matches(word)), 0)
+    start = max(0, min(first - tokens // 4, len(words) - tokens))
+    excerpt = [f"<mark>{word}</mark>" if matches(word) else word for word in words[start:start + tokens]]
+    return ("…" if start > 0 else "") + " ".join(excerpt) + ("…" if start + tokens < len(words) else "")
+
+
+def encode_search_cursor(rank: float, article_id: int) -> str:
+    """Encode a keyset pagination position as an opaque string."""
+    raw = f"{rank!r}:{article_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_search_cursor(cursor: str) -> Tuple[float, int]:
+    """Decode a cursor produced by encode_search_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        rank, article_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split(":")
+        return float(rank), int(article_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
 
 class Database:
     """Database connection manager."""
@@ -26,6 +93,7 @@ class Database:
         """Get a database connection context manager."""
         conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON")
         try:
             yield conn
             conn.commit()
@@ -35,32 +103,106 @@ class Database:
         finally:
             conn.close()
 
+    def connect_autocommit(self) -> sqlite3.Connection:
+        """Plain autocommit connection for statements that cannot run in a
+        transaction (VACUUM, incremental_vacuum). Caller must close it."""
+        return sqlite3.connect(self.db_path, isolation_level=None)
+
     def create_tables(self):
-        """Create the necessary tables if they don't exist."""
-        query = """
-        CREATE TABLE IF NOT EXISTS sentiments (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            keyword TEXT NOT NULL,
-            source TEXT NOT NULL,
-            title TEXT,
-            content TEXT,
-            url TEXT UNIQUE,
-            sentiment_score REAL,
-            summary TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
+        """Create the necessary tables if they don't exist.
+
+        Databases created before the article/keyword split are migrated in place.
         """
         try:
+            with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
+                schema = f.read()
             with self.get_connection() as conn:
-                conn.execute(query)
+                # Only takes effect on a new, empty database file; lets the
+                # retention job return freed pages with incremental_vacuum
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                has_rollup = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'keyword_daily_stats'"
+                ).fetchone()
+                conn.executescript(schema)
+                self._migrate_legacy_sentiments(conn, schema)
+                self._add_missing_columns(conn)
+                self._create_search_index(conn)
+                if not has_rollup:
+                    self._rebuild_rollups(conn)
             print(f"✅ Tablolar başarıyla oluşturuldu/kontrol edildi: {self.db_path}")
         except Exception as e:
             print(f"❌ Tablo oluşturma hatası: {e}")
 
+    def _migrate_legacy_sentiments(self, conn: sqlite3.Connection, schema: str):
+        """Move rows from the old single-table `sentiments` layout into
+        `articles` + `article_keywords` and replace the table with the view."""
+        row = conn.execute(
+            "SELECT type FROM sqlite_master WHERE name = 'sentiments'"
+        ).fetchone()
+        if not row or row[0] != "table":
+            return
+
+        print("🔄 Eski 'sentiments' tablosu yeni şemaya taşınıyor...")
+        conn.executescript("""
+        BEGIN;
+        ALTER TABLE sentiments RENAME TO sentiments_legacy;
+        INSERT OR IGNORE INTO articles (id, url, source, title, content, sentiment_score, summary, created_at)
+            SELECT id, url, source, title, content, COALESCE(sentiment_score, 0.0), summary,
+                   COALESCE(created_at, CURRENT_TIMESTAMP)
+            FROM sentiments_legacy;
+        INSERT OR IGNORE INTO article_keywords (article_id, keyword, created_at)
+            SELECT a.id, l.keyword, a.created_at
+            FROM sentiments_legacy l
+            JOIN articles a ON a.id = l.id;
+        DROP TABLE sentiments_legacy;
+        COMMIT;
+        """)
+        conn.executescript(schema)
+
+    def _add_missing_columns(self, conn: sqlite3.Connection):
+        """Add columns introduced after a database was created."""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(articles)").fetchall()}
+        for column in ("model", "prompt_version"):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE articles ADD COLUMN {column} TEXT")
+
+    def _rebuild_rollups(self, conn: sqlite3.Connection):
+        """Recompute keyword_daily_stats from the raw articles."""
+        conn.execute("DELETE FROM keyword_daily_stats")
+        conn.execute("""
+        INSERT INTO keyword_daily_stats (keyword, day, source, articles, sentiment_sum, sentiment_sq_sum)
+        SELECT ak.keyword, DATE(ak.created_at), a.source, COUNT(*),
+               SUM(a.sentiment_score), SUM(a.sentiment_score * a.sentiment_score)
+        FROM article_keywords ak
+        JOIN articles a ON a.id = ak.article_id
+        WHERE COALESCE(a.prompt_version, '') NOT LIKE '%-unscored'
+        GROUP BY ak.keyword, DATE(ak.created_at), a.source
+        """)
+        conn.execute("UPDATE data_generation SET generation = generation + 1 WHERE id = 1")
+
+    def rebuild_rollups(self):
+        """Recompute the daily rollup table from scratch."""
+        with self.get_connection() as conn:
+            self._rebuild_rollups(conn)
+
+    def _create_search_index(self, conn: sqlite3.Connection):
+        """Create the FTS5 index and its sync triggers, backfilling existing articles."""
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'articles_fts'"
+        ).fetchone()
+        try:
+            with open(FTS_SCHEMA_PATH, "r", encoding="utf-8") as f:
+                conn.executescript(f.read())
+        except sqlite3.OperationalError as e:
+            print(f"⚠️  Tam metin arama devre dışı (FTS5 yok): {e}")
+            return
+        if not exists:
+            conn.execute("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')")
+
     # --- YENİ EKLENEN AKILLI KONTROL FONKSİYONU ---
     def check_if_url_exists(self, url: str) -> bool:
         """Check if a URL already exists in the database to avoid re-analysis."""
-        query = "SELECT 1 FROM sentiments WHERE url = ?"
+        query = "SELECT 1 FROM articles WHERE url = ?"
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
@@ -71,57 +213,201 @@ class Database:
             return False
     # ----------------------------------------------
 
-    def insert_sentiment(self, keyword: str, source: str, title: str, content: str, url: str, sentiment_score: float, summary: str) -> bool:
-        """Insert a sentiment record."""
+    def get_existing_urls(self, urls: List[str]) -> Set[str]:
+        """Return the subset of `urls` that are already stored."""
+        urls = [url for url in set(urls) if url]
+        if not urls:
+            return set()
+        found = set()
+        try:
+            with self.get_connection() as conn:
+                # Chunk to stay under SQLite's bound-parameter limit
+                for i in range(0, len(urls), 500):
+                    chunk = urls[i:i + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows = conn.execute(
+                        f"SELECT url FROM articles WHERE url IN ({placeholders})", chunk
+                    ).fetchall()
+                    found.update(row[0] for row in rows)
+        except Exception as e:
+            print(f"Error checking URLs: {e}")
+        return found
+
+    def link_keyword(self, url: str, keyword: str) -> bool:
+        """Attach an already stored article to another keyword without re-scoring it.
+
+        Returns:
+            True if a new article/keyword link was created
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO article_keywords (article_id, keyword, created_at) "
+                    "SELECT id, ?, created_at FROM articles WHERE url = ?",
+                    (keyword, url)
+                )
+                return cursor.rowcount == 1
+        except Exception as e:
+            print(f"❌ Anahtar kelime bağlama hatası: {e}")
+            return False
+
+    def insert_sentiment(self, keyword: str, source: str, title: str, content: str, url: str, sentiment_score: float, summary: str,
+                         model: Optional[str] = None, prompt_version: Optional[str] = None) -> bool:
+        """Insert a sentiment record.
+
+        The article is stored once per URL; inserting the same URL for another
+        keyword only adds the keyword link. `model` and `prompt_version` record
+        what produced the score (None if it was not scored by a model).
+
+        Returns:
+            True if a new article/keyword pair was stored, False if duplicate
+        """
         try:
             with self.get_connection() as conn:
-                conn.execute(
-                    "INSERT INTO sentiments (keyword, source, title, content, url, sentiment_score, summary) VALUES (?, ?, ?, ?, ?, ?, ?)",
-                    (keyword, source, title, content, url, sentiment_score, summary)
+                cursor = conn.execute(
+                    "INSERT INTO articles (source, title, content, url, sentiment_score, summary, model, prompt_version) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(url) DO NOTHING",
+                    (source, title, content, url, sentiment_score, summary, model, prompt_version)
+                )
+                if cursor.rowcount == 1:
+                    article_id = cursor.lastrowid
+                else:
+                    article_id = conn.execute("SELECT id FROM articles WHERE url = ?", (url,)).fetchone()[0]
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO article_keywords (article_id, keyword, created_at) "
+                    "SELECT id, ?, created_at FROM articles WHERE id = ?",
+                    (keyword, article_id)
                 )
-                return True
+                return cursor.rowcount == 1
         except sqlite3.IntegrityError:
             return False
         except Exception as e:
             print(f"❌ Veri ekleme hatası: {e}")
             return False
 
-    def get_sentiments(self, keyword=None, source=None, start_date=None, end_date=None, limit=None) -> List[Dict[str, Any]]:
-        """Query sentiments with filters."""
-        query = "SELECT * FROM sentiments WHERE 1=1"
+    def insert_sentiments(self, rows: List[tuple]) -> int:
+        """Insert many sentiment rows in one transaction with executemany.
+
+        Args:
+            rows: Tuples of (keyword, source, title, content, url,
+                sentiment_score, summary, model, prompt_version), the order of
+                insert_sentiment's arguments
+
+        Returns:
+            Number of new article/keyword pairs stored; the rest were duplicates
+
+        Raises:
+            sqlite3.Error: Nothing of the batch was stored
+        """
+        with self.get_connection() as conn:
+            conn.executemany(
+                "INSERT INTO articles (source, title, content, url, sentiment_score, summary, model, prompt_version) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(url) DO NOTHING",
+                (row[1:] for row in rows)
+            )
+            cursor = conn.executemany(
+                "INSERT OR IGNORE INTO article_keywords (article_id, keyword, created_at) "
+                "SELECT id, ?, created_at FROM articles WHERE url = ?",
+                ((row[0], row[4]) for row in rows)
+            )
+            return cursor.rowcount
+
+    @staticmethod
+    def _sentiment_filters(keyword=None, source=None, start_date=None, end_date=None) -> Tuple[str, List[Any]]:
+        """WHERE clause shared by the sentiments queries."""
+        where = " WHERE 1=1"
         params = []
         if keyword:
-            query += " AND keyword = ?"; params.append(keyword)
+            where += " AND keyword = ?"; params.append(keyword)
         if source:
-            query += " AND source = ?"; params.append(source)
+            where += " AND source = ?"; params.append(source)
+        # Plain range comparisons (not DATE(created_at)) keep the date filters index-driven
         if start_date:
-            query += " AND DATE(created_at) >= ?"; params.append(start_date)
+            where += " AND created_at >= ?"; params.append(start_date)
         if end_date:
-            query += " AND DATE(created_at) <= ?"; params.append(end_date)
-        query += " ORDER BY created_at DESC"
+            where += " AND created_at < date(?, '+1 day')"; params.append(end_date)
+        return where, params
+
+    def get_sentiments(self, keyword=None, source=None, start_date=None, end_date=None, limit=None) -> List[Dict[str, Any]]:
+        """Query sentiments with filters."""
+        columns, rows = self.get_sentiment_rows(keyword, source, start_date, end_date, limit)
+        return [dict(zip(columns, row)) for row in rows]
+
+    def get_sentiment_rows(self, keyword=None, source=None, start_date=None, end_date=None,
+                           limit=None) -> Tuple[List[str], List[tuple]]:
+        """Same query as get_sentiments, returned as column names and plain tuples.
+
+        Skips sqlite3.Row and dict construction for callers that serialize
+        the rows directly.
+        """
+        where, params = self._sentiment_filters(keyword, source, start_date, end_date)
+        query = "SELECT * FROM sentiments" + where + " ORDER BY created_at DESC"
         if limit:
             query += " LIMIT ?"; params.append(limit)
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
+                cursor.row_factory = None
                 cursor.execute(query, params)
-                return [dict(row) for row in cursor.fetchall()]
-        except Exception: return []
+                rows = cursor.fetchall()
+                return [column[0] for column in cursor.description], rows
+        except Exception: return [], []
+
+    def count_sentiments(self, keyword=None, source=None, start_date=None, end_date=None) -> int:
+        """Count sentiments matching the same filters as get_sentiments."""
+        where, params = self._sentiment_filters(keyword, source, start_date, end_date)
+        try:
+            with self.get_connection() as conn:
+                return conn.execute("SELECT COUNT(*) FROM sentiments" + where, params).fetchone()[0]
+        except Exception: return 0
 
     def get_recent_sentiments(self, limit: int = 100) -> List[Dict[str, Any]]:
         """Get recent sentiment records."""
+        columns, rows = self.get_recent_sentiment_rows(limit)
+        return [dict(zip(columns, row)) for row in rows]
+
+    def get_recent_sentiment_rows(self, limit: int = 100) -> Tuple[List[str], List[tuple]]:
+        """Same query as get_recent_sentiments, returned as column names and plain tuples."""
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute("SELECT id, keyword, source, title, content, url, sentiment_score as sentiment, summary, created_at FROM sentiments ORDER BY created_at DESC LIMIT ?", (limit,))
-                return [dict(row) for row in cursor.fetchall()]
-        except Exception: return []
+                cursor.row_factory = None
+                # Text columns are left out on purpose: trends only need the
+                # keyword, date and score, and content keeps pages out of cache
+                cursor.execute("SELECT id, keyword, source, title, url, sentiment_score as sentiment, created_at FROM sentiments ORDER BY created_at DESC LIMIT ?", (limit,))
+                rows = cursor.fetchall()
+                return [column[0] for column in cursor.description], rows
+        except Exception: return [], []
+
+    def get_article(self, article_id: int) -> Optional[Dict[str, Any]]:
+        """Get a single article with its keywords.
+        
+        Content and summary of archived articles are decompressed transparently.
+        """
+        with self.get_connection() as conn:
+            row = conn.execute("SELECT * FROM articles WHERE id = ?", (article_id,)).fetchone()
+            if not row:
+                return None
+            article = dict(row)
+            article["keywords"] = [r[0] for r in conn.execute(
+                "SELECT keyword FROM article_keywords WHERE article_id = ? ORDER BY keyword", (article_id,)
+            ).fetchall()]
+            archived = conn.execute(
+                "SELECT codec, payload FROM article_archive WHERE article_id = ?", (article_id,)
+            ).fetchone()
+        
+        article["archived"] = archived is not None
+        if archived:
+            text = json.loads(decompress(archived["payload"], archived["codec"]).decode("utf-8"))
+            article["content"] = text.get("content")
+            article["summary"] = text.get("summary")
+        return article
 
     def get_keywords(self) -> List[str]:
         """Get unique keywords."""
         try:
             with self.get_connection() as conn:
-                return [row[0] for row in conn.execute("SELECT DISTINCT keyword FROM sentiments ORDER BY keyword").fetchall()]
+                return [row[0] for row in conn.execute("SELECT DISTINCT keyword FROM article_keywords ORDER BY keyword").fetchall()]
         except: return []
 
     def get_advanced_stats(self) -> Dict[str, Any]:
@@ -129,12 +415,520 @@ class Database:
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                total = cursor.execute("SELECT COUNT(*) FROM sentiments").fetchone()[0] or 0
-                avg = cursor.execute("SELECT AVG(sentiment_score) FROM sentiments").fetchone()[0]
+                total = cursor.execute("SELECT COUNT(*) FROM articles").fetchone()[0] or 0
+                avg = cursor.execute("SELECT AVG(sentiment_score) FROM articles").fetchone()[0]
                 avg_sentiment = round(avg, 2) if avg else 0.0
                 
                 top = [{"keyword": r[0], "avg_sentiment": round(r[1], 2)} for r in cursor.execute("SELECT keyword, AVG(sentiment_score) as a FROM sentiments GROUP BY keyword ORDER BY a DESC LIMIT 3").fetchall()]
                 bottom = [{"keyword": r[0], "avg_sentiment": round(r[1], 2)} for r in cursor.execute("SELECT keyword, AVG(sentiment_score) as a FROM sentiments GROUP BY keyword ORDER BY a ASC LIMIT 3").fetchall()]
                 
                 return {"total_articles": total, "average_sentiment": avg_sentiment, "top_keywords": top, "bottom_keywords": bottom}
-        except Exception: return {"total_articles": 0, "average_sentiment": 0.0, "top_keywords": [], "bottom_keywords": []}
\ No newline at end of file
+        except Exception: return {"total_articles": 0, "average_sentiment": 0.0, "top_keywords": [], "bottom_keywords": []}
+
+    def get_arrival_counts(self, hours: int = 24) -> List[Dict[str, Any]]:
+        """Count articles stored per keyword and source within the last `hours`."""
+        query = """
+        SELECT keyword, source, COUNT(*) AS items
+        FROM sentiments
+        WHERE created_at >= datetime('now', ?)
+        GROUP BY keyword, source
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, (f"-{int(hours)} hours",))
+                return [dict(row) for row in cursor.fetchall()]
+        except Exception: return []
+
+    def search(self, query: str, keyword: Optional[str] = None, start_date: Optional[str] = None,
+               end_date: Optional[str] = None, limit: int = 20,
+               after: Optional[Tuple[float, int]] = None) -> Dict[str, Any]:
+        """Full-text search over article title, summary and content.
+        
+        Results are ordered by BM25 relevance (best first) and paginated by
+        keyset on (rank, id), so deep pages cost the same as the first one.
+        
+        Args:
+            query: Free-text search terms
+            keyword: Only articles linked to this keyword
+            start_date: Start date (YYYY-MM-DD)
+            end_date: End date (YYYY-MM-DD), inclusive
+            limit: Page size
+            after: (rank, id) of the last result of the previous page
+            
+        Returns:
+            Dictionary with `results` and `next_cursor` (None on the last page)
+        """
+        match = build_match_query(query)
+        if not match:
+            return {"results": [], "next_cursor": None}
+        
+        sql = f"""
+        SELECT a.id, a.source, a.title, a.url, a.sentiment_score, a.created_at,
+               snippet(articles_fts, -1, '<mark>', '</mark>', '…', {SNIPPET_TOKENS}) AS snippet,
+               a.summary, rank
+        FROM articles_fts
+        JOIN articles a ON a.id = articles_fts.rowid
+        WHERE articles_fts MATCH ? AND rank MATCH '{SEARCH_WEIGHTS}'
+        """
+        params: List[Any] = [match]
+        if keyword:
+            sql += " AND EXISTS (SELECT 1 FROM article_keywords ak WHERE ak.article_id = a.id AND ak.keyword = ?)"
+            params.append(keyword)
+        if start_date:
+            sql += " AND a.created_at >= ?"; params.append(start_date)
+        if end_date:
+            sql += " AND a.created_at < date(?, '+1 day')"; params.append(end_date)
+        if after:
+            sql += " AND (rank > ? OR (rank = ? AND a.id > ?))"
+            params.extend([after[0], after[0], after[1]])
+        sql += " ORDER BY rank, a.id LIMIT ?"
+        # Fetch one extra row to know whether another page exists
+        params.append(limit + 1)
+        
+        with self.get_connection() as conn:
+            rows = [dict(row) for row in conn.execute(sql, params).fetchall()]
+            
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = encode_search_cursor(rows[-1]["rank"], rows[-1]["id"])
+            
+            keywords_by_id: Dict[int, List[str]] = {}
+            ids = [row["id"] for row in rows]
+            if ids:
+                placeholders = ",".join("?" * len(ids))
+                for article_id, kw in conn.execute(
+                    f"SELECT article_id, keyword FROM article_keywords WHERE article_id IN ({placeholders})", ids
+                ).fetchall():
+                    keywords_by_id.setdefault(article_id, []).append(kw)
+            
+            # snippet() reads the text from `articles`, where archived articles
+            # no longer keep it; excerpt their archived text instead
+            archived_ids = [row["id"] for row in rows if not row["snippet"]]
+            archived: Dict[int, Dict[str, Any]] = {}
+            if archived_ids:
+                placeholders = ",".join("?" * len(archived_ids))
+                for article_id, codec, payload in conn.execute(
+                    f"SELECT article_id, codec, payload FROM article_archive WHERE article_id IN ({placeholders})",
+                    archived_ids
+                ).fetchall():
+                    archived[article_id] = json.loads(decompress(payload, codec).decode("utf-8"))
+        
+        for row in rows:
+            summary = row.pop("summary")
+            if not row["snippet"]:
+                text = archived.get(row["id"], {})
+                row["snippet"] = make_snippet(text.get("content") or text.get("summary") or summary
+                                              or row["title"] or "", query)
+            row["keywords"] = sorted(keywords_by_id.get(row["id"], []))
+            row["rank"] = round(row["rank"], 4)
+        
+        return {"results": rows, "next_cursor": next_cursor}
+
+    def get_data_generation(self) -> int:
+        """Counter that changes whenever stored sentiments or aggregates change."""
+        try:
+            with self.get_connection() as conn:
+                row = conn.execute("SELECT generation FROM data_generation WHERE id = 1").fetchone()
+                return row[0] if row else 0
+        except Exception: return 0
+
+    def get_latest_rows_per_keyword(self, keywords: List[str], sources: Optional[List[str]] = None,
+                                    start_date: Optional[str] = None, end_date: Optional[str] = None,
+                                    limit: int = 10) -> Tuple[List[str], List[tuple]]:
+        """The `limit` newest sentiments of each keyword, from one windowed query.
+
+        Args:
+            keywords: Keywords to read
+            sources: Only these sources (all if omitted)
+            start_date: Start date (YYYY-MM-DD)
+            end_date: End date (YYYY-MM-DD), inclusive
+            limit: Rows per keyword
+
+        Returns:
+            Column names and plain tuples (no content), ordered by keyword
+            and newest first
+        """
+        where = f" WHERE keyword IN ({','.join('?' * len(keywords))})"
+        params: List[Any] = list(keywords)
+        if sources:
+            where += f" AND source IN ({','.join('?' * len(sources))})"; params.extend(sources)
+        if start_date:
+            where += " AND created_at >= ?"; params.append(start_date)
+        if end_date:
+            where += " AND created_at < date(?, '+1 day')"; params.append(end_date)
+        query = f"""
+        SELECT id, keyword, source, title, url, sentiment_score, summary, created_at FROM (
+            SELECT id, keyword, source, title, url, sentiment_score, summary, created_at,
+                   ROW_NUMBER() OVER (PARTITION BY keyword ORDER BY created_at DESC, id DESC) AS position
+            FROM sentiments{where}
+        ) WHERE position <= ? ORDER BY keyword, position
+        """
+        params.append(limit)
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(query, params)
+            return [column[0] for column in cursor.description], cursor.fetchall()
+
+    def get_daily_aggregates(self, keywords: Optional[List[str]] = None, sources: Optional[List[str]] = None,
+                             start_date: Optional[str] = None, end_date: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Per keyword and day totals from the rollup table.
+        
+        Args:
+            keywords: Only these keywords (all if omitted)
+            sources: Only these sources (all if omitted)
+            start_date: Start date (YYYY-MM-DD)
+            end_date: End date (YYYY-MM-DD), inclusive
+            
+        Returns:
+            Rows with keyword, day, articles, sentiment_sum, sentiment_sq_sum
+        """
+        query = """
+        SELECT keyword, day, SUM(articles) AS articles,
+               SUM(sentiment_sum) AS sentiment_sum, SUM(sentiment_sq_sum) AS sentiment_sq_sum
+        FROM keyword_daily_stats WHERE 1=1
+        """
+        params: List[Any] = []
+        if keywords:
+            query += f" AND keyword IN ({','.join('?' * len(keywords))})"; params.extend(keywords)
+        if sources:
+            query += f" AND source IN ({','.join('?' * len(sources))})"; params.extend(sources)
+        if start_date:
+            query += " AND day >= ?"; params.append(start_date)
+        if end_date:
+            query += " AND day <= ?"; params.append(end_date)
+        query += " GROUP BY keyword, day ORDER BY keyword, day"
+        with self.get_connection() as conn:
+            return [dict(row) for row in conn.execute(query, params).fetchall()]
+
+    def get_latest_link_id(self) -> int:
+        """Highest article_keywords rowid; change feeds start after it."""
+        with self.get_connection() as conn:
+            return conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM article_keywords").fetchone()[0]
+
+    def count_links_between(self, after_id: int, up_to: int, limit: int) -> int:
+        """Links with after_id < rowid <= up_to, counting no further than `limit`."""
+        with self.get_connection() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM (SELECT 1 FROM article_keywords WHERE rowid > ? AND rowid <= ? LIMIT ?)",
+                (after_id, up_to, limit)
+            ).fetchone()[0]
+
+    def get_links_since(self, after_id: int, limit: int = 500) -> List[Dict[str, Any]]:
+        """Keyword links added after `after_id`, oldest first, with their article.
+        
+        Returns:
+            Rows with link_id, id, keyword, source, title, url, sentiment, created_at
+        """
+        with self.get_connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT ak.rowid AS link_id, a.id, ak.keyword, a.source, a.title, a.url,
+                       a.sentiment_score AS sentiment, ak.created_at
+                FROM article_keywords ak
+                JOIN articles a ON a.id = ak.article_id
+                WHERE ak.rowid > ?
+                ORDER BY ak.rowid
+                LIMIT ?
+                """,
+                (after_id, limit)
+            ).fetchall()
+            return [dict(row) for row in rows]
+
+    def get_keyword_day_totals(self, pairs: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """Rollup totals (all sources) for specific (keyword, day) pairs."""
+        if not pairs:
+            return []
+        values = ",".join("(?, ?)" for _ in pairs)
+        params = [value for pair in pairs for value in pair]
+        with self.get_connection() as conn:
+            rows = conn.execute(
+                f"""
+                WITH wanted(keyword, day) AS (VALUES {values})
+                SELECT s.keyword, s.day, SUM(s.articles) AS articles, SUM(s.sentiment_sum) AS sentiment_sum
+                FROM keyword_daily_stats s
+                JOIN wanted w ON w.keyword = s.keyword AND w.day = s.day
+                GROUP BY s.keyword, s.day
+                ORDER BY s.day, s.keyword
+                """,
+                params
+            ).fetchall()
+            return [dict(row) for row in rows]
+
+    def get_dashboard_snapshot(self) -> Optional[Dict[str, Any]]:
+        """Stored dashboard snapshot (generation, etag, gzip body, raw_size), if any."""
+        with self.get_connection() as conn:
+            row = conn.execute(
+                "SELECT generation, etag, body, raw_size FROM dashboard_snapshot WHERE id = 1"
+            ).fetchone()
+            return dict(row) if row else None
+
+    def save_dashboard_snapshot(self, generation: int, etag: str, body: bytes, raw_size: int) -> bool:
+        """Store a dashboard snapshot unless a newer generation is already stored.
+        
+        Returns:
+            True if the snapshot was written
+        """
+        with self.get_connection() as conn:
+            cursor = conn.execute(
+                """
+                INSERT INTO dashboard_snapshot (id, generation, etag, body, raw_size, created_at)
+                VALUES (1, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(id) DO UPDATE SET
+                    generation = excluded.generation, etag = excluded.etag, body = excluded.body,
+                    raw_size = excluded.raw_size, created_at = excluded.created_at
+                WHERE excluded.generation >= dashboard_snapshot.generation
+                """,
+                (generation, etag, sqlite3.Binary(body), raw_size)
+            )
+            return cursor.rowcount > 0
+
+    def save_etl_run(self, trace: Dict[str, Any]):
+        """Store (or replace) the trace of an ETL run (RunTrace.to_dict())."""
+        with self.get_connection() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO etl_runs
+                    (run_id, pipeline, started_at, finished_at, status, duration, items, trace)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (trace["run_id"], trace["pipeline"], trace["started_at"], trace["finished_at"],
+                 trace["status"], trace["duration"], trace["items"], json.dumps(trace))
+            )
+
+    def get_etl_runs(self, limit: int = 20, pipeline: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Most recent ETL runs, newest first, with their time split and counters."""
+        query = "SELECT trace FROM etl_runs"
+        params: List[Any] = []
+        if pipeline:
+            query += " WHERE pipeline = ?"; params.append(pipeline)
+        query += " ORDER BY started_at DESC, rowid DESC LIMIT ?"; params.append(limit)
+        with self.get_connection() as conn:
+            runs = [json.loads(row[0]) for row in conn.execute(query, params).fetchall()]
+        # Per-stage and per-keyword detail only in get_etl_run
+        return [{k: v for k, v in run.items() if k not in ("stages", "per_keyword")} for run in runs]
+
+    def get_etl_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Full trace of one ETL run."""
+        with self.get_connection() as conn:
+            row = conn.execute("SELECT trace FROM etl_runs WHERE run_id = ?", (run_id,)).fetchone()
+            return json.loads(row[0]) if row else None
+
+    def get_window_totals(self, current: Tuple[str, str], previous: Tuple[str, str],
+                          sources: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Per keyword totals of two date windows from the rollup table.
+        
+        Reads only the rollup rows of the two windows (by the day index),
+        never the articles.
+        
+        Args:
+            current: (start, end) of the current window, inclusive
+            previous: (start, end) of the window it is compared with
+            sources: Only these sources (all if omitted)
+            
+        Returns:
+            Rows with keyword and, prefixed cur_/prev_, articles, sentiment_sum
+            and sentiment_sq_sum
+        """
+        columns = []
+        params: List[Any] = []
+        for prefix, (start, end) in (("cur", current), ("prev", previous)):
+            for column in ("articles", "sentiment_sum", "sentiment_sq_sum"):
+                columns.append(f"SUM(CASE WHEN day BETWEEN ? AND ? THEN {column} ELSE 0 END) AS {prefix}_{column}")
+                params.extend([start, end])
+        query = f"""
+        SELECT keyword, {', '.join(columns)}
+        FROM keyword_daily_stats
+        WHERE day BETWEEN ? AND ?
+        """
+        # One range over both windows, so the day index bounds the scan
+        params.extend([min(current[0], previous[0]), max(current[1], previous[1])])
+        if sources:
+            query += f" AND source IN ({','.join('?' * len(sources))})"; params.extend(sources)
+        query += " GROUP BY keyword ORDER BY keyword"
+        with self.get_connection() as conn:
+            return [dict(row) for row in conn.execute(query, params).fetchall()]
+
+    def get_discovery_windows(self, start: Optional[str] = None, limit: int = 8) -> List[Dict[str, Any]]:
+        """Stored discovery windows, newest first.
+        
+        Args:
+            start: Only windows starting at or before this one
+            limit: Maximum windows returned
+        """
+        query = "SELECT window_start, version, titles, width, depth, counters, top_terms FROM discovery_windows"
+        params: List[Any] = []
+        if start:
+            query += " WHERE window_start <= ?"; params.append(start)
+        query += " ORDER BY window_start DESC LIMIT ?"; params.append(limit)
+        with self.get_connection() as conn:
+            return [dict(row) for row in conn.execute(query, params).fetchall()]
+
+    def save_discovery_window(self, window_start: str, version: int, titles: int, width: int, depth: int,
+                              counters: bytes, top_terms: str) -> bool:
+        """Store a discovery window if it is still at `version` (0: not stored yet).
+        
+        Returns:
+            True if the window was written, False if another writer got there first
+        """
+        with self.get_connection() as conn:
+            if version == 0:
+                cursor = conn.execute(
+                    """
+                    INSERT OR IGNORE INTO discovery_windows
+                        (window_start, version, titles, width, depth, counters, top_terms)
+                    VALUES (?, 1, ?, ?, ?, ?, ?)
+                    """,
+                    (window_start, titles, width, depth, sqlite3.Binary(counters), top_terms)
+                )
+            else:
+                cursor = conn.execute(
+                    """
+                    UPDATE discovery_windows
+                    SET version = version + 1, titles = ?, counters = ?, top_terms = ?,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE window_start = ? AND version = ?
+                    """,
+                    (titles, sqlite3.Binary(counters), top_terms, window_start, version)
+                )
+            return cursor.rowcount > 0
+
+    def prune_discovery_windows(self, keep: int) -> int:
+        """Delete all but the `keep` newest discovery windows."""
+        with self.get_connection() as conn:
+            cursor = conn.execute(
+                """
+                DELETE FROM discovery_windows WHERE window_start NOT IN (
+                    SELECT window_start FROM discovery_windows ORDER BY window_start DESC LIMIT ?
+                )
+                """,
+                (keep,)
+            )
+            return cursor.rowcount
+
+    @staticmethod
+    def _stale_filter(model: str, prompt_version: str, after_id: int, family: Optional[str],
+                      include_unversioned: bool) -> Tuple[str, List[Any]]:
+        """WHERE clause shared by the stale article queries."""
+        where = "a.id > ? AND (a.model IS NOT ? OR a.prompt_version IS NOT ?)"
+        params: List[Any] = [after_id, model, prompt_version]
+        if family is not None:
+            # Rows scored by another prompt are that prompt's backfill's business
+            where += " AND (substr(a.prompt_version, 1, ?) = ? OR (a.prompt_version IS NULL AND ?))"
+            params.extend([len(family) + 1, family + "-", include_unversioned])
+        return where, params
+
+    def count_stale_articles(self, model: str, prompt_version: str, after_id: int = 0,
+                             family: Optional[str] = None, include_unversioned: bool = True) -> int:
+        """Articles after `after_id` not scored by `model` with `prompt_version`.
+        
+        With `family`, only articles scored by a version of that prompt
+        ("<family>-v<n>") or left unscored by it ("<family>-unscored") and,
+        if `include_unversioned`, articles without a version.
+        """
+        where, params = self._stale_filter(model, prompt_version, after_id, family, include_unversioned)
+        with self.get_connection() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM articles a WHERE {where}", params).fetchone()[0]
+
+    def get_stale_articles(self, model: str, prompt_version: str, after_id: int = 0, limit: int = 50,
+                           family: Optional[str] = None, include_unversioned: bool = True) -> List[Dict[str, Any]]:
+        """Next chunk of articles to re-score, by id after `after_id`.
+        
+        Keyset paging on the primary key, so each chunk costs the same no
+        matter how far the backfill has got. Archived text is decompressed.
+        `family` and `include_unversioned` filter as in count_stale_articles.
+        
+        Returns:
+            Rows with id, title, content, summary, archived and keyword (the
+            first keyword the article was linked to, which the prompt is about)
+        """
+        where, params = self._stale_filter(model, prompt_version, after_id, family, include_unversioned)
+        with self.get_connection() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT a.id, a.title, a.content, a.summary, c.codec, c.payload,
+                       (SELECT keyword FROM article_keywords WHERE article_id = a.id ORDER BY rowid LIMIT 1) AS keyword
+                FROM articles a
+                LEFT JOIN article_archive c ON c.article_id = a.id
+                WHERE {where}
+                ORDER BY a.id
+                LIMIT ?
+                """,
+                params + [limit]
+            ).fetchall()
+
+        articles = []
+        for row in rows:
+            article = {key: row[key] for key in ("id", "title", "content", "summary", "keyword")}
+            article["archived"] = row["payload"] is not None
+            if article["archived"]:
+                text = json.loads(decompress(row["payload"], row["codec"]).decode("utf-8"))
+                article["content"] = text.get("content")
+                article["summary"] = text.get("summary")
+            articles.append(article)
+        return articles
+
+    def get_backfill_checkpoint(self, target: str) -> Dict[str, Any]:
+        """Progress of the backfill towards `target` (zeros if not started)."""
+        with self.get_connection() as conn:
+            row = conn.execute(
+                "SELECT last_id, scored, failed, updated_at FROM backfill_checkpoints WHERE target = ?", (target,)
+            ).fetchone()
+            return dict(row) if row else {"last_id": 0, "scored": 0, "failed": 0, "updated_at": None}
+
+    def reset_backfill_checkpoint(self, target: str):
+        """Start the backfill towards `target` over from the first article."""
+        with self.get_connection() as conn:
+            conn.execute("DELETE FROM backfill_checkpoints WHERE target = ?", (target,))
+
+    def save_backfill_chunk(self, target: str, last_id: int, updates: List[Dict[str, Any]], failed: int = 0) -> int:
+        """Store re-scored articles and advance the checkpoint in one transaction.
+        
+        The rollup trigger on sentiment_score adjusts the affected daily
+        aggregates in the same transaction. New summaries of archived
+        articles are written into their compressed payload.
+        
+        Args:
+            target: Checkpoint name
+            last_id: Highest article id of the chunk
+            updates: Dicts with id, sentiment_score, summary, model and prompt_version
+            failed: Articles of the chunk that could not be scored
+            
+        Returns:
+            Number of articles updated
+        """
+        with self.get_connection() as conn:
+            updated = 0
+            for update in updates:
+                archived = conn.execute(
+                    "SELECT codec, payload FROM article_archive WHERE article_id = ?", (update["id"],)
+                ).fetchone()
+                if archived:
+                    text = json.loads(decompress(archived["payload"], archived["codec"]).decode("utf-8"))
+                    text["summary"] = update["summary"]
+                    payload = compress(json.dumps(text, ensure_ascii=False).encode("utf-8"), archived["codec"])
+                    conn.execute("UPDATE article_archive SET payload = ? WHERE article_id = ?",
+                                 (payload, update["id"]))
+                cursor = conn.execute(
+                    """
+                    UPDATE articles SET sentiment_score = ?, model = ?, prompt_version = ?,
+                           summary = CASE WHEN ? THEN summary ELSE ? END
+                    WHERE id = ?
+                    """,
+                    (update["sentiment_score"], update["model"], update["prompt_version"],
+                     archived is not None, update["summary"], update["id"])
+                )
+                updated += cursor.rowcount
+            conn.execute(
+                """
+                INSERT INTO backfill_checkpoints (target, last_id, scored, failed, updated_at)
+                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(target) DO UPDATE SET
+                    last_id = MAX(last_id, excluded.last_id), scored = scored + excluded.scored,
+                    failed = failed + excluded.failed, updated_at = excluded.updated_at
+                """,
+                (target, last_id, updated, failed)
+            )
+            return updated
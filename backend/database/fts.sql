@@ -0,0 +1,34 @@
+-- Full-text index over article text (requires SQLite built with FTS5)
+
+-- External-content table: text lives in `articles`, only the index is stored here
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title,
+    summary,
+    content,
+    content='articles',
+    content_rowid='id',
+    tokenize='porter unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS articles_fts_ai AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts(rowid, title, summary, content)
+    VALUES (new.id, new.title, new.summary, new.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS articles_fts_ad AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, title, summary, content)
+    VALUES ('delete', old.id, old.title, old.summary, old.content);
+END;
+
+-- Archiving (database/retention.py) moves summary and content out of `articles`;
+-- the index keeps the archived text so body search still finds the row.
+-- Recreated on every start so databases with the older trigger pick this up.
+DROP TRIGGER IF EXISTS articles_fts_au;
+CREATE TRIGGER articles_fts_au AFTER UPDATE OF title, summary, content ON articles
+WHEN NOT (new.content IS NULL AND new.summary IS NULL AND new.title IS old.title)
+BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, title, summary, content)
+    VALUES ('delete', old.id, old.title, old.summary, old.content);
+    INSERT INTO articles_fts(rowid, title, summary, content)
+    VALUES (new.id, new.title, new.summary, new.content);
+END;
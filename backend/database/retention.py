@@ -0,0 +1,161 @@
+"""Retention tiers: move old article text into compressed cold storage.
+
+Articles younger than the hot window keep their content and summary inline.
+Older ones have both fields compressed into ``article_archive`` and NULLed
+in ``articles``, so the rows the dashboard reads stay small and the hot
+pages stay in the page cache. Titles, scores and keyword links never move,
+so trends, rollups and title search are unaffected.
+
+Run periodically with ``python -m database.retention`` from the ``backend``
+directory, or let the refresh scheduler run it.
+"""
+import argparse
+import json
+from typing import Dict
+
+from config import Config
+from database.codecs import DEFAULT_CODEC, compress
+from database.db import Database
+
+
+class RetentionManager:
+    """Archive cold article text and reclaim the freed pages."""
+
+    def __init__(self, db: Database = None, hot_days: int = None, batch_size: int = None,
+                 vacuum_pages: int = None, codec: str = None):
+        """Initialize the retention manager.
+
+        Args:
+            db: Database instance. Creates new one if not provided.
+            hot_days: Articles newer than this many days keep inline text.
+            batch_size: Articles archived per transaction.
+            vacuum_pages: Free pages returned per incremental vacuum.
+            codec: Compression codec ("zlib" or "zstd").
+        """
+        self.db = db or Database()
+        self.hot_days = Config.RETENTION_HOT_DAYS if hot_days is None else hot_days
+        self.batch_size = batch_size or Config.RETENTION_BATCH_SIZE
+        self.vacuum_pages = Config.RETENTION_VACUUM_PAGES if vacuum_pages is None else vacuum_pages
+        self.codec = codec or Config.RETENTION_CODEC or DEFAULT_CODEC
+
+    def archive_batch(self) -> int:
+        """Archive up to `batch_size` cold articles in one short transaction.
+
+        Returns:
+            Number of articles archived
+        """
+        with self.db.get_connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT a.id, a.content, a.summary
+                FROM articles a
+                WHERE a.created_at < datetime('now', ?)
+                  AND (a.content IS NOT NULL OR a.summary IS NOT NULL)
+                  AND NOT EXISTS (SELECT 1 FROM article_archive c WHERE c.article_id = a.id)
+                ORDER BY a.created_at
+                LIMIT ?
+                """,
+                (f"-{int(self.hot_days)} days", self.batch_size)
+            ).fetchall()
+            if not rows:
+                return 0
+
+            archive_rows = []
+            for row in rows:
+                payload = json.dumps(
+                    {"content": row["content"], "summary": row["summary"]},
+                    ensure_ascii=False
+                ).encode("utf-8")
+                archive_rows.append((row["id"], self.codec, compress(payload, self.codec)))
+
+            conn.executemany(
+                "INSERT INTO article_archive (article_id, codec, payload) VALUES (?, ?, ?)",
+                archive_rows
+            )
+            conn.executemany(
+                "UPDATE articles SET content = NULL, summary = NULL WHERE id = ?",
+                [(row["id"],) for row in rows]
+            )
+            return len(rows)
+
+    def archive(self) -> int:
+        """Archive every article outside the hot window, batch by batch.
+
+        Returns:
+            Total number of articles archived
+        """
+        total = 0
+        while True:
+            archived = self.archive_batch()
+            total += archived
+            if archived < self.batch_size:
+                return total
+
+    def vacuum(self, full: bool = False) -> Dict[str, int]:
+        """Return free pages to the file system.
+
+        Incremental vacuum needs ``auto_vacuum = INCREMENTAL``, which new
+        databases get from create_tables. Older files need one full VACUUM
+        (``full=True``) to switch modes; that rewrites the whole file.
+
+        Returns:
+            Free page count before and after
+        """
+        with self.db.get_connection() as conn:
+            before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+
+        if full:
+            # VACUUM cannot run inside a transaction; use a plain connection
+            conn = self.db.connect_autocommit()
+            try:
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute("VACUUM")
+            finally:
+                conn.close()
+        elif mode == 2:
+            conn = self.db.connect_autocommit()
+            try:
+                conn.execute(f"PRAGMA incremental_vacuum({int(self.vacuum_pages)})").fetchall()
+            finally:
+                conn.close()
+        else:
+            print("ℹ️  auto_vacuum is not INCREMENTAL; run with --full-vacuum once to enable it")
+
+        with self.db.get_connection() as conn:
+            after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return {"free_pages_before": before, "free_pages_after": after}
+
+    def run(self) -> Dict[str, int]:
+        """Archive cold rows, then run an incremental vacuum."""
+        archived = self.archive()
+        stats = self.vacuum()
+        stats["archived"] = archived
+        return stats
+
+
+def main():
+    """Entry point for the retention job."""
+    parser = argparse.ArgumentParser(description="Archive old article text and vacuum the database")
+    parser.add_argument(
+        "--hot-days",
+        type=int,
+        help="Keep inline text for articles newer than this many days"
+    )
+    parser.add_argument(
+        "--full-vacuum",
+        action="store_true",
+        help="Rewrite the file once to enable incremental vacuum"
+    )
+
+    args = parser.parse_args()
+
+    manager = RetentionManager(hot_days=args.hot_days)
+    archived = manager.archive()
+    stats = manager.vacuum(full=args.full_vacuum)
+    print(f"Archived: {archived} articles")
+    print(f"Free pages: {stats['free_pages_before']} -> {stats['free_pages_after']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,216 @@
 -- Database schema for Tech Trend Sentiment Analyst
 
-CREATE TABLE IF NOT EXISTS sentiments (
+-- One row per article (unique URL); scored exactly once
+CREATE TABLE IF NOT EXISTS articles (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
-    keyword TEXT NOT NULL,
+    url TEXT UNIQUE,
     source TEXT NOT NULL,
     title TEXT,
     content TEXT,
-    url TEXT UNIQUE,
     sentiment_score REAL NOT NULL,
     summary TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    -- What produced the score (NULL: unknown, scored before versioning).
+    -- "<prompt>-unscored": the prompt failed, sentiment_score is a placeholder
+    -- kept out of the rollups until the backfill scores the article.
+    model TEXT,
+    prompt_version TEXT
+);
+
+-- Keywords an article matched. created_at is copied from the article so
+-- keyword + date range filters are answered from a single index.
+CREATE TABLE IF NOT EXISTS article_keywords (
+    article_id INTEGER NOT NULL REFERENCES articles(id) ON DELETE CASCADE,
+    keyword TEXT NOT NULL,
+    created_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (article_id, keyword)
+);
+
+-- Cold tier: compressed content/summary of articles past the hot window.
+-- The matching articles row keeps its metadata with content/summary NULLed.
+CREATE TABLE IF NOT EXISTS article_archive (
+    article_id INTEGER PRIMARY KEY REFERENCES articles(id) ON DELETE CASCADE,
+    codec TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_articles_source ON articles(source);
+CREATE INDEX IF NOT EXISTS idx_articles_created_at ON articles(created_at);
+CREATE INDEX IF NOT EXISTS idx_article_keywords_keyword_date ON article_keywords(keyword, created_at);
+CREATE INDEX IF NOT EXISTS idx_article_keywords_created_at ON article_keywords(created_at);
+
+-- Legacy one-row-per-(article, keyword) shape used by the read queries
+CREATE VIEW IF NOT EXISTS sentiments AS
+SELECT
+    a.id,
+    ak.keyword,
+    a.source,
+    a.title,
+    a.content,
+    a.url,
+    a.sentiment_score,
+    a.summary,
+    ak.created_at
+FROM article_keywords ak
+JOIN articles a ON a.id = ak.article_id;
+
+-- Daily rollup per keyword and source, maintained by the triggers below so
+-- trend/analytics queries never scan raw articles. Unscored articles
+-- (prompt_version "<prompt>-unscored") are left out until they are scored.
+-- The triggers are recreated on every start so older databases pick up changes.
+CREATE TABLE IF NOT EXISTS keyword_daily_stats (
+    keyword TEXT NOT NULL,
+    day TEXT NOT NULL,
+    source TEXT NOT NULL,
+    articles INTEGER NOT NULL DEFAULT 0,
+    sentiment_sum REAL NOT NULL DEFAULT 0,
+    sentiment_sq_sum REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (keyword, day, source)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_keyword_daily_stats_day ON keyword_daily_stats(day);
+
+-- Single-row counter bumped whenever aggregates change; caches key on it
+CREATE TABLE IF NOT EXISTS data_generation (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    generation INTEGER NOT NULL
+);
+
+INSERT OR IGNORE INTO data_generation (id, generation) VALUES (1, 0);
+
+DROP TRIGGER IF EXISTS article_keywords_rollup_ai;
+CREATE TRIGGER article_keywords_rollup_ai AFTER INSERT ON article_keywords BEGIN
+    INSERT INTO keyword_daily_stats (keyword, day, source, articles, sentiment_sum, sentiment_sq_sum)
+    SELECT new.keyword, DATE(new.created_at), a.source, 1, a.sentiment_score, a.sentiment_score * a.sentiment_score
+    FROM articles a
+    WHERE a.id = new.article_id AND COALESCE(a.prompt_version, '') NOT LIKE '%-unscored'
+    ON CONFLICT(keyword, day, source) DO UPDATE SET
+        articles = articles + excluded.articles,
+        sentiment_sum = sentiment_sum + excluded.sentiment_sum,
+        sentiment_sq_sum = sentiment_sq_sum + excluded.sentiment_sq_sum;
+    UPDATE data_generation SET generation = generation + 1 WHERE id = 1;
+END;
+
+DROP TRIGGER IF EXISTS article_keywords_rollup_ad;
+CREATE TRIGGER article_keywords_rollup_ad AFTER DELETE ON article_keywords BEGIN
+    UPDATE keyword_daily_stats SET
+        articles = articles - 1,
+        sentiment_sum = sentiment_sum - (SELECT sentiment_score FROM articles WHERE id = old.article_id),
+        sentiment_sq_sum = sentiment_sq_sum - (SELECT sentiment_score * sentiment_score FROM articles WHERE id = old.article_id)
+    WHERE keyword = old.keyword
+      AND day = DATE(old.created_at)
+      AND source = (SELECT source FROM articles WHERE id = old.article_id)
+      AND (SELECT COALESCE(prompt_version, '') FROM articles WHERE id = old.article_id) NOT LIKE '%-unscored';
+    DELETE FROM keyword_daily_stats WHERE articles <= 0 AND keyword = old.keyword AND day = DATE(old.created_at);
+    UPDATE data_generation SET generation = generation + 1 WHERE id = 1;
+END;
+
+-- Unlink keywords before the article row disappears so the rollup trigger
+-- above can still read its score and source
+CREATE TRIGGER IF NOT EXISTS articles_unlink_bd BEFORE DELETE ON articles BEGIN
+    DELETE FROM article_keywords WHERE article_id = old.id;
+END;
+
+-- Swap the old score for the new one; an article that was unscored is
+-- added, one that becomes unscored is removed
+DROP TRIGGER IF EXISTS articles_rollup_au;
+CREATE TRIGGER articles_rollup_au AFTER UPDATE OF sentiment_score, prompt_version ON articles
+WHEN old.sentiment_score IS NOT new.sentiment_score
+  OR (COALESCE(old.prompt_version, '') LIKE '%-unscored') IS NOT (COALESCE(new.prompt_version, '') LIKE '%-unscored')
+BEGIN
+    UPDATE keyword_daily_stats SET
+        articles = articles - 1,
+        sentiment_sum = sentiment_sum - old.sentiment_score,
+        sentiment_sq_sum = sentiment_sq_sum - old.sentiment_score * old.sentiment_score
+    WHERE COALESCE(old.prompt_version, '') NOT LIKE '%-unscored'
+      AND source = old.source
+      AND (keyword, day) IN (
+          SELECT keyword, DATE(created_at) FROM article_keywords WHERE article_id = new.id
+      );
+    INSERT INTO keyword_daily_stats (keyword, day, source, articles, sentiment_sum, sentiment_sq_sum)
+    SELECT keyword, DATE(created_at), new.source, 1, new.sentiment_score, new.sentiment_score * new.sentiment_score
+    FROM article_keywords
+    WHERE article_id = new.id AND COALESCE(new.prompt_version, '') NOT LIKE '%-unscored'
+    ON CONFLICT(keyword, day, source) DO UPDATE SET
+        articles = articles + excluded.articles,
+        sentiment_sum = sentiment_sum + excluded.sentiment_sum,
+        sentiment_sq_sum = sentiment_sq_sum + excluded.sentiment_sq_sum;
+    DELETE FROM keyword_daily_stats
+    WHERE articles <= 0
+      AND source = old.source
+      AND (keyword, day) IN (
+          SELECT keyword, DATE(created_at) FROM article_keywords WHERE article_id = new.id
+      );
+    UPDATE data_generation SET generation = generation + 1 WHERE id = 1;
+END;
+
+-- Work items of a sharded ETL run (etl/workers.py). A worker owns an item
+-- while its lease has not expired; expired leases are claimed again.
+CREATE TABLE IF NOT EXISTS etl_leases (
+    run_id TEXT NOT NULL,
+    item TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',  -- pending, leased, done, failed
+    owner TEXT,
+    token TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    extracted INTEGER NOT NULL DEFAULT 0,
+    loaded INTEGER NOT NULL DEFAULT 0,
+    linked INTEGER NOT NULL DEFAULT 0,
+    errors INTEGER NOT NULL DEFAULT 0,
+    started_at REAL,
+    finished_at REAL,
+    error TEXT,
+    PRIMARY KEY (run_id, item)
+);
+
+-- Latest /api/dashboard payload, serialized and gzip-compressed once per
+-- data generation so API workers in any process can serve it as-is
+CREATE TABLE IF NOT EXISTS dashboard_snapshot (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    generation INTEGER NOT NULL,
+    etag TEXT NOT NULL,
+    body BLOB NOT NULL,
+    raw_size INTEGER NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
-CREATE INDEX IF NOT EXISTS idx_keyword_date ON sentiments(keyword, created_at);
-CREATE INDEX IF NOT EXISTS idx_source ON sentiments(source);
-CREATE INDEX IF NOT EXISTS idx_created_at ON sentiments(created_at);
+-- Structured trace of each ETL run (etl/tracing.py); the full report is
+-- kept as JSON, the columns are for listing and filtering
+CREATE TABLE IF NOT EXISTS etl_runs (
+    run_id TEXT PRIMARY KEY,
+    pipeline TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT,
+    status TEXT NOT NULL,
+    duration REAL NOT NULL DEFAULT 0,
+    items INTEGER NOT NULL DEFAULT 0,
+    trace TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_etl_runs_started_at ON etl_runs(started_at);
 
+-- Term counts of fetched titles per time window (etl/discovery.py): the
+-- window's top terms as JSON and a Count-Min sketch of all terms. `version`
+-- lets concurrent writers detect that a window changed under them.
+CREATE TABLE IF NOT EXISTS discovery_windows (
+    window_start TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    titles INTEGER NOT NULL DEFAULT 0,
+    width INTEGER NOT NULL,
+    depth INTEGER NOT NULL,
+    counters BLOB NOT NULL,
+    top_terms TEXT NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Progress of a re-scoring backfill (etl/backfill.py) per target
+-- model/prompt version: articles up to last_id have been handled
+CREATE TABLE IF NOT EXISTS backfill_checkpoints (
+    target TEXT PRIMARY KEY,
+    last_id INTEGER NOT NULL DEFAULT 0,
+    scored INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
@@ -1,2 +1,12 @@
-"""ETL package for data extraction, transformation, and loading."""
+"""ETL package for data extraction, transformation, and loading.
 
+The API and the analytics code import these modules as ``etl.<module>``
+(with ``backend/`` on ``sys.path``), while the pipeline entry points import
+them as ``backend.etl.<module>``. Python treats the two names as separate
+modules, so module-level state is not shared between them: the circuit
+breakers and source metrics in ``resilience``, the response cache in
+``http_client`` and the active trace in ``tracing`` each exist once per
+name. Code that needs to see that state must import the module under the
+same name as the code that set it up. Modules imported under both names
+keep to the standard library (and requests) so either import works.
+"""
@@ -0,0 +1,282 @@
+"""Re-score stored articles with the current model and prompt version.
+
+Every article records the model and prompt version that produced its
+score. After changing GEMINI_MODEL or bumping a prompt version in
+etl/prompts.py, the backfill walks the articles of that prompt scored
+otherwise in id order. Articles are scored by one of two prompts: full
+articles (ETL pipeline, SENTIMENT_PROMPT_VERSION) and headlines
+(data_fetcher, SCORE_PROMPT_VERSION). Each prompt's backfill only touches
+its own articles and uses the matching scorer. Headlines the fetcher could
+not score are stored as "score-unscored" (out of the rollups until scored),
+so only the headline backfill picks them up. Articles without a version
+(scored before versioning) go to the article backfill.
+
+- stale articles are read in keyset-paged chunks (``id > last_id``), so a
+  chunk costs the same at the end of the table as at the start;
+- a chunk is scored by a small thread pool, with calls spaced out to stay
+  under the API's rate limit;
+- the new scores and the checkpoint are written together in one short
+  transaction per chunk. The database is switched to WAL so API readers are
+  never blocked, and the rollup trigger adjusts the affected daily
+  aggregates in the same transaction.
+
+An interrupted backfill continues after the last stored chunk. Articles
+that failed to score are skipped by that pass; ``--restart`` begins a new
+pass from the first stale article.
+
+Run from the ``backend`` directory:
+
+    python -m etl.backfill --dry-run
+    python -m etl.backfill --concurrency 4 --chunk-size 50
+    python -m etl.backfill --prompt-version score-v1
+"""
+import argparse
+import contextvars
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.api.dashboard import refresh_snapshot
+from backend.config import Config
+from backend.database.db import Database
+from backend.etl import tracing
+from backend.etl.prompts import (SCORE_PROMPT_VERSION, SENTIMENT_PROMPT_VERSION, build_score_prompt,
+                                 generate_structured, prompt_family)
+
+
+class RateLimiter:
+    """Spaces call starts at least `interval` seconds apart across threads."""
+
+    def __init__(self, interval: float, clock=time.monotonic):
+        self.interval = interval
+        self.clock = clock
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = self.clock()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            tracing.sleep(start - now)
+
+
+class Backfill:
+    """Chunked, resumable re-scoring of stale articles."""
+
+    def __init__(self, db: Database = None, scorer: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]] = None,
+                 model: str = None, prompt_version: str = None, chunk_size: int = None,
+                 concurrency: int = None, interval: float = None, include_unversioned: bool = None):
+        """Initialize the backfill.
+
+        Args:
+            db: Database instance. Creates new one if not provided.
+            scorer: Scores one article (id, keyword, title, content) and returns
+                sentiment_score and summary, or None on failure. Defaults to
+                SentimentTransformer.analyze_sentiment, or to headline scoring
+                for the SCORE_PROMPT_VERSION prompt.
+            model: Target model. Defaults to Config.GEMINI_MODEL.
+            prompt_version: Target prompt version. Defaults to SENTIMENT_PROMPT_VERSION.
+                Only articles scored by another version of the same prompt
+                are re-scored.
+            chunk_size: Articles read, scored and written together.
+            concurrency: Articles scored at the same time.
+            interval: Minimum seconds between the starts of two model calls.
+            include_unversioned: Also re-score articles without a prompt version
+                (scored before versioning). Defaults to True except for the
+                headline prompt, whose unscored articles are marked as such.
+        """
+        self.db = db or Database()
+        self.model = model or Config.GEMINI_MODEL
+        self.prompt_version = prompt_version or SENTIMENT_PROMPT_VERSION
+        self.target = f"{self.model}/{self.prompt_version}"
+        self.family = prompt_family(self.prompt_version)
+        self.headlines = self.family == prompt_family(SCORE_PROMPT_VERSION)
+        self.include_unversioned = not self.headlines if include_unversioned is None else include_unversioned
+        self.chunk_size = chunk_size or Config.BACKFILL_CHUNK_SIZE
+        self.concurrency = concurrency or Config.BACKFILL_CONCURRENCY
+        self.limiter = RateLimiter(Config.BACKFILL_REQUEST_INTERVAL if interval is None else interval)
+        self._scorer = scorer
+
+    @property
+    def scorer(self) -> Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        if self._scorer is None:
+            from backend.etl.transform import SentimentTransformer
+            transformer = SentimentTransformer()
+            if not transformer.model:
+                raise RuntimeError("GEMINI_API_KEY is required to re-score articles")
+            if self.headlines:
+                self._scorer = lambda article: generate_structured(
+                    transformer.model, build_score_prompt(article["keyword"], article["title"] or ""),
+                    transformer.usage, require_summary=False, structured=Config.LLM_STRUCTURED_OUTPUT,
+                    label="headline"
+                )
+            else:
+                self._scorer = lambda article: transformer.analyze_sentiment(
+                    keyword=article["keyword"] or "", title=article["title"] or "", content=article["content"] or ""
+                )
+        return self._scorer
+
+    def _stale_filter(self) -> Dict[str, Any]:
+        return {"family": self.family, "include_unversioned": self.include_unversioned}
+
+    def status(self) -> Dict[str, Any]:
+        """Checkpoint of the current target and the stale articles left after it."""
+        checkpoint = self.db.get_backfill_checkpoint(self.target)
+        checkpoint["target"] = self.target
+        checkpoint["remaining"] = self.db.count_stale_articles(self.model, self.prompt_version, checkpoint["last_id"],
+                                                               **self._stale_filter())
+        return checkpoint
+
+    def _score(self, article: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        self.limiter.wait()
+        with tracing.keyword(article["keyword"]):
+            try:
+                result = self.scorer(article)
+            except Exception as e:
+                print(f"Could not re-score article {article['id']}: {e}")
+                tracing.count("errors")
+                return None
+        if not result:
+            return None
+        return {
+            "id": article["id"],
+            "sentiment_score": result["sentiment_score"],
+            "summary": result.get("summary") or article["summary"],
+            "model": self.model,
+            "prompt_version": self.prompt_version,
+        }
+
+    def run_chunk(self, executor: ThreadPoolExecutor, after_id: int) -> Optional[Dict[str, int]]:
+        """Score and store the next chunk after `after_id`.
+
+        Returns:
+            Dict with last_id, scored and failed, or None when nothing is left
+        """
+        with tracing.span("sqlite"):
+            articles = self.db.get_stale_articles(self.model, self.prompt_version, after_id, self.chunk_size,
+                                                  **self._stale_filter())
+        if not articles:
+            return None
+
+        # Worker threads see the active trace through a copy of this context
+        futures = [executor.submit(contextvars.copy_context().run, self._score, article) for article in articles]
+        updates = [update for update in (future.result() for future in futures) if update]
+
+        last_id = articles[-1]["id"]
+        failed = len(articles) - len(updates)
+        with tracing.span("sqlite"):
+            scored = self.db.save_backfill_chunk(self.target, last_id, updates, failed=failed)
+        tracing.count("items", scored)
+        return {"last_id": last_id, "scored": scored, "failed": failed}
+
+    def run(self, limit: int = None, restart: bool = False, verbose: bool = True) -> Dict[str, Any]:
+        """Re-score stale articles chunk by chunk until none (or `limit`) are left.
+
+        Args:
+            limit: Stop after about this many articles
+            restart: Ignore the stored checkpoint and start from the first article
+            verbose: Print progress per chunk
+
+        Returns:
+            Totals of this run: scored, failed, last_id and run_id
+        """
+        self.db.create_tables()
+        with self.db.get_connection() as conn:
+            # Readers keep going while chunks commit; persistent per file
+            conn.execute("PRAGMA journal_mode = WAL")
+        if restart:
+            self.db.reset_backfill_checkpoint(self.target)
+
+        last_id = self.db.get_backfill_checkpoint(self.target)["last_id"]
+        totals = {"scored": 0, "failed": 0, "last_id": last_id}
+        trace = tracing.RunTrace("backfill")
+        try:
+            with trace, ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                while limit is None or totals["scored"] + totals["failed"] < limit:
+                    with trace.stage("chunk"):
+                        chunk = self.run_chunk(executor, totals["last_id"])
+                    if chunk is None:
+                        break
+                    totals["last_id"] = chunk["last_id"]
+                    totals["scored"] += chunk["scored"]
+                    totals["failed"] += chunk["failed"]
+                    if verbose:
+                        print(f"Re-scored {totals['scored']} articles ({totals['failed']} failed), "
+                              f"up to id {totals['last_id']}")
+                trace.count("failed", totals["failed"])
+        finally:
+            trace.save(self.db)
+
+        totals["run_id"] = trace.run_id
+        if totals["scored"]:
+            # Serialize the dashboard once now rather than on its next request
+            refresh_snapshot(self.db)
+        return totals
+
+
+def main():
+    """Entry point for the re-scoring backfill."""
+    parser = argparse.ArgumentParser(description="Re-score articles scored by another model or prompt version")
+    parser.add_argument(
+        "--prompt-version",
+        choices=[SENTIMENT_PROMPT_VERSION, SCORE_PROMPT_VERSION],
+        default=SENTIMENT_PROMPT_VERSION,
+        help="Prompt whose articles are re-scored (default: full-article prompt)"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        help="Articles read, scored and written per transaction"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        help="Articles scored at the same time"
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        help="Stop after about this many articles"
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Start from the first stale article instead of the checkpoint"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only print how many articles would be re-scored"
+    )
+
+    args = parser.parse_args()
+
+    db = Database()
+    db.create_tables()
+    backfill = Backfill(db, prompt_version=args.prompt_version, chunk_size=args.chunk_size,
+                        concurrency=args.concurrency)
+    if args.restart:
+        db.reset_backfill_checkpoint(backfill.target)
+
+    status = backfill.status()
+    print(f"Target {status['target']}: {status['remaining']} articles to re-score "
+          f"(checkpoint at id {status['last_id']}, {status['scored']} done, {status['failed']} failed)")
+    if args.dry_run:
+        return
+
+    totals = backfill.run(limit=args.limit)
+    print(f"Done: {totals['scored']} re-scored, {totals['failed']} failed (run {totals['run_id']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,132 +1,266 @@
 """Helper functions to fetch REAL data and analyze with Gemini AI."""
 import os
-import requests
 import time
-import re
 import random
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
-import google.generativeai as genai
 from config import Config
 from database.db import Database
+from api.dashboard import refresh_snapshot
+from api.events import publish_changes
+from etl import http_client, resilience, tracing
+from etl.discovery import TrendDiscovery, record_titles
+from etl.keyword_matcher import KeywordMatcher, pack_queries, parse_aliases, tag_items
+from etl.prompts import (SCORE_PROMPT_VERSION, UsageTracker, build_score_prompt, generate_structured,
+                         unscored_version)
+
+HN_SEARCH_URL = "https://hn.algolia.com/api/v1/search"
+NEWS_SEARCH_URL = "https://newsapi.org/v2/everything"
+# Longest query each source accepts
+HN_MAX_QUERY_LENGTH = 512
+NEWS_MAX_QUERY_LENGTH = 500
+# Items per keyword and source
+PER_KEYWORD = 3
+
+# Token and latency accounting of the current/last fetch_all_trends_data run
+usage_tracker = UsageTracker(log_path=Config.LLM_USAGE_LOG or None)
 
 # --- GEMINI AYARLARI ---
-if Config.GEMINI_API_KEY:
-    genai.configure(api_key=Config.GEMINI_API_KEY)
-    gemini_model = genai.GenerativeModel('gemini-2.0-flash')
-else:
-    gemini_model = None
+# SDK importu yavaş; model ilk analizde oluşturulur
+_gemini_model = None
+
+if not Config.GEMINI_API_KEY:
     print("Warning: GEMINI_API_KEY bulunamadı!")
 
-def analyze_sentiment(text: str) -> float:
-    """REAL Gemini AI Analysis."""
-    if not text or not text.strip(): return 0.0
-    if not gemini_model: return 0.0
+def get_gemini_model():
+    """Configure the Gemini SDK on first use and return the shared model."""
+    global _gemini_model
+    if _gemini_model is None and Config.GEMINI_API_KEY:
+        import google.generativeai as genai
+        genai.configure(api_key=Config.GEMINI_API_KEY)
+        _gemini_model = genai.GenerativeModel(Config.GEMINI_MODEL)
+    return _gemini_model
+
+def analyze_sentiment(text: str, keyword: str = None) -> Optional[float]:
+    """REAL Gemini AI Analysis. None if the model could not score the text."""
+    if not text or not text.strip(): return None
+    gemini_model = get_gemini_model()
+    if not gemini_model: return None
 
-    # Prompt
-    prompt = f"""Analyze the sentiment of this tech news headline: '{text}'. 
-    Return ONLY a float number between -1.0 (negative) and 1.0 (positive). No explanation."""
+    # Prompt (paylaşılan kısa başlık + başlık metni)
+    prompt = build_score_prompt(keyword, text)
     
     # Retry Logic (429 Hataları için)
     for attempt in range(3): # Deneme sayısını 3'e çıkardık
         try:
-            response = gemini_model.generate_content(prompt)
-            # Sayıyı ayıkla (regex ile)
-            match = re.search(r'-?\d+\.?\d*', response.text)
-            if match:
-                score = float(match.group())
-                return max(-1.0, min(1.0, score)) # Sınırla
-            return 0.0
+            # Şemaya uygun JSON iste; bozuk cevap bir kez onarılır
+            with tracing.span("llm"):
+                result = generate_structured(
+                    gemini_model, prompt, usage_tracker, require_summary=False,
+                    structured=Config.LLM_STRUCTURED_OUTPUT, label="headline"
+                )
+            return result["sentiment_score"] if result else None
         except Exception as e:
             if "429" in str(e) or "Quota" in str(e) or "429" in str(e):
                 wait_time = 60 # 60 Saniye bekle (Google Free Tier çok hassas)
                 print(f"⚠️  Kota Sınırı (429). {wait_time} saniye bekleniyor... (Deneme {attempt+1}/3)")
-                time.sleep(wait_time)
+                tracing.count("retries")
+                tracing.sleep(wait_time)
             else:
                 print(f"AI Hatası: {e}")
-                return 0.0
+                tracing.count("errors")
+                return None
     
-    print("   ❌ Analiz başarısız (Varsayılan 0.0 atandı)")
-    return 0.0
+    print("   ❌ Analiz başarısız (puansız kaydedilecek, istatistiklere katılmaz; backfill puanlayacak)")
+    return None
 
-def fetch_all_trends_data(keywords: List[str] = None) -> List[Dict[str, Any]]:
-    """Fetch real data, check DB cache, analyze new ones."""
-    keywords = keywords or Config.KEYWORDS
-    
-    db = Database()
-    db.create_tables()
+def _get_json(url: str, params: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+    """GET a JSON API; error statuses raise so they count against the source's breaker."""
+    response = http_client.get(url, params=params, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+def _fetch_json(source: str, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """A fresh cached reply, or one fetched under `source`'s breaker and the run deadline."""
+    cached = http_client.lookup(url, params)
+    if cached is not None:
+        return cached.json()
+    with tracing.span("network"):
+        return resilience.call(source, _get_json, url, params, timeout=Config.SOURCE_TIMEOUT)
+
+def fetch_hn(keywords: List[str], matcher: KeywordMatcher, limit: int = PER_KEYWORD) -> List[Dict[str, Any]]:
+    """Hacker News stories for `keywords`, at most `limit` per keyword.
     
-    # İşlenen tüm verileri toplamak için liste
-    total_processed = []
+    Several keywords are searched together: Algolia has no OR operator, so
+    the terms go in one query marked as optional words and the hits are
+    tagged locally with the keywords they mention.
+    """
+    returned = []
+    for query, covered in pack_queries(keywords, HN_MAX_QUERY_LENGTH, separator=" ", quote=False):
+        params = {'query': query, 'tags': 'story', 'hitsPerPage': limit * len(covered)}
+        if len(covered) > 1:
+            params['optionalWords'] = query
+            # Optional words match looser than the keywords; always tag locally
+            covered = []
+        try:
+            hn_resp = _fetch_json("hackernews", HN_SEARCH_URL, params)
+        except resilience.SourceUnavailable as e:
+            print(f"HN atlandı: {e}")
+            tracing.count("skipped")
+            break
+        except Exception as e:
+            print(f"HN Hatası: {e}")
+            tracing.count("errors")
+            continue
+        for item in hn_resp.get('hits', []):
+            returned.append((covered, {
+                'title': item.get('title') or '',
+                'url': item.get('url') or f"https://news.ycombinator.com/item?id={item.get('objectID')}",
+                'source': 'hackernews'
+            }))
+    return [dict(item, keyword=keyword) for keyword, item in tag_items(returned, matcher, ('title', 'url'), limit)]
+
+def fetch_news(keywords: List[str], matcher: KeywordMatcher, limit: int = PER_KEYWORD) -> List[Dict[str, Any]]:
+    """NewsAPI articles for `keywords` (ORed into as few queries as fit), at most `limit` per keyword."""
+    api_key = os.getenv("NEWS_API_KEY")
+    if not api_key:
+        return []
+    returned = []
+    for query, covered in pack_queries(keywords, NEWS_MAX_QUERY_LENGTH):
+        params = {'q': query, 'apiKey': api_key, 'pageSize': min(limit * len(covered), 100), 'language': 'en'}
+        try:
+            news_resp = _fetch_json("news", NEWS_SEARCH_URL, params)
+        except resilience.SourceUnavailable as e:
+            print(f"NewsAPI atlandı: {e}")
+            tracing.count("skipped")
+            break
+        except Exception as e:
+            print(f"NewsAPI Hatası: {e}")
+            tracing.count("errors")
+            continue
+        for item in news_resp.get('articles', []):
+            returned.append((covered, {
+                'title': item.get('title') or '',
+                'description': item.get('description') or '',
+                'url': item.get('url', ''),
+                'source': 'news'
+            }))
+    tagged = tag_items(returned, matcher, ('title', 'description'), limit)
+    return [{'title': item['title'], 'url': item['url'], 'source': item['source'], 'keyword': keyword} for keyword, item in tagged]
+
+def store_keyword_articles(db: Database, keyword: str, by_keyword: Dict[str, List[Dict[str, Any]]],
+                           matcher: KeywordMatcher) -> List[Dict[str, Any]]:
+    """Fetch (unless already fetched), score and store one keyword's articles."""
+    processed = []
+    print(f"\n--- İşleniyor: {keyword} ---")
     
-    print(f"🔍 Trendler taranıyor: {', '.join(keywords)}")
+    # 1. Kaynaklardan Veriyi Çek
+    if by_keyword is not None:
+        raw_articles = by_keyword[keyword]
+    else:
+        raw_articles = fetch_hn([keyword], matcher) + fetch_news([keyword], matcher)
 
-    for keyword in keywords:
-        print(f"\n--- İşleniyor: {keyword} ---")
+    # 2. Veritabanı Kontrolü ve Analiz
+    new_count = 0
+    new_articles = []
+    for article in raw_articles:
+        # EĞER URL ZATEN VARSA -> TEKRAR ANALİZ ETME, SADECE ANAHTAR KELİMEYE BAĞLA
+        with tracing.span("sqlite"):
+            exists = db.check_if_url_exists(article['url'])
+            linked = exists and db.link_keyword(article['url'], article['keyword'])
+        if exists:
+            if linked:
+                print(f"   🔗 Bağlandı: {article['title'][:30]}...")
+                new_count += 1
+                processed.append(article)
+            else:
+                print(f"   ⏭️  Atlandı: {article['title'][:30]}...")
+            continue
         
-        # 1. Kaynaklardan Veriyi Çek
-        raw_articles = []
+        # YOKSA -> GEMINI'YE SOR
+        new_articles.append(article)
+        print(f"   🧠 AI Analiz Ediyor: {article['title'][:40]}...")
+        sentiment = analyze_sentiment(article['title'], keyword=article['keyword'])
+        # Unscored titles keep a 0.0 placeholder marked "score-unscored": it stays out
+        # of the rollups and `etl.backfill --prompt-version score-v1` scores it
+        scored = sentiment is not None
         
-        # Hacker News
-        try:
-            # timeout süresini artırdık
-            hn_resp = requests.get(f"https://hn.algolia.com/api/v1/search?query={keyword}&tags=story", timeout=10).json()
-            for item in hn_resp.get('hits', [])[:3]: 
-                raw_articles.append({
-                    'title': item.get('title', ''),
-                    'url': item.get('url', f"https://news.ycombinator.com/item?id={item.get('objectID')}"),
-                    'source': 'hackernews',
-                    'keyword': keyword
-                })
-        except Exception as e: print(f"HN Hatası: {e}")
-
-        # News API
-        api_key = os.getenv("NEWS_API_KEY")
-        if api_key:
-            try:
-                news_resp = requests.get("https://newsapi.org/v2/everything", params={'q': keyword, 'apiKey': api_key, 'pageSize': 3, 'language': 'en'}, timeout=10).json()
-                for item in news_resp.get('articles', [])[:3]:
-                    raw_articles.append({
-                        'title': item.get('title', ''),
-                        'url': item.get('url', ''),
-                        'source': 'news',
-                        'keyword': keyword
-                    })
-            except Exception as e: print(f"NewsAPI Hatası: {e}")
-
-        # 2. Veritabanı Kontrolü ve Analiz
-        new_count = 0
-        for article in raw_articles:
-            # EĞER URL ZATEN VARSA -> ATLAMA
-            if db.check_if_url_exists(article['url']):
-                print(f"   ⏭️  Atlandı: {article['title'][:30]}...")
-                continue
-            
-            # YOKSA -> GEMINI'YE SOR
-            print(f"   🧠 AI Analiz Ediyor: {article['title'][:40]}...")
-            sentiment = analyze_sentiment(article['title'])
-            
-            # Kaydet
+        # Kaydet
+        with tracing.span("sqlite"):
             success = db.insert_sentiment(
                 keyword=article['keyword'],
                 source=article['source'],
                 title=article['title'],
                 content='',
                 url=article['url'],
-                sentiment_score=sentiment,
-                summary=article['title']
+                sentiment_score=sentiment if scored else 0.0,
+                summary=article['title'],
+                model=Config.GEMINI_MODEL if scored else None,
+                prompt_version=SCORE_PROMPT_VERSION if scored else unscored_version(SCORE_PROMPT_VERSION)
             )
-            
-            if success:
-                new_count += 1
-                total_processed.append(article)
-            
-            # 🔥 HIZ FRENI: Her başarılı API isteğinden sonra 10 saniye bekle
-            # Bu, "Requests Per Minute" (RPM) limitini aşmamızı engeller.
-            print("   ⏳ API soğutma (10sn)...")
-            time.sleep(10) 
-            
-        print(f"   ✅ {new_count} yeni makale kaydedildi.")
+        
+        if success:
+            new_count += 1
+            processed.append(article)
+        
+        # 🔥 HIZ FRENI: Her başarılı API isteğinden sonra 10 saniye bekle
+        # Bu, "Requests Per Minute" (RPM) limitini aşmamızı engeller.
+        print("   ⏳ API soğutma (10sn)...")
+        tracing.sleep(10)
+        
+    print(f"   ✅ {new_count} yeni makale kaydedildi.")
+    tracing.count("items", new_count)
+    
+    # Count the terms of new titles for /api/discover
+    record_titles(TrendDiscovery.from_config(db, Config), new_articles)
+    
+    # Push this keyword's new articles to open /api/stream clients
+    if new_count:
+        publish_changes()
+    return processed
+
+def fetch_all_trends_data(keywords: List[str] = None) -> List[Dict[str, Any]]:
+    """Fetch real data, check DB cache, analyze new ones."""
+    keywords = keywords or Config.KEYWORDS
+    
+    db = Database()
+    db.create_tables()
+    usage_tracker.reset()
+    
+    # İşlenen tüm verileri toplamak için liste
+    total_processed = []
+    
+    print(f"🔍 Trendler taranıyor: {', '.join(keywords)}")
+
+    resilience.configure(Config)
+    http_client.configure(Config)
+    trace = tracing.RunTrace("fetch", keywords)
+    try:
+        # Fetching stops at the run deadline; articles already fetched are still processed
+        with trace, resilience.deadline(Config.ETL_RUN_DEADLINE):
+            matcher = KeywordMatcher(keywords, parse_aliases(Config.KEYWORD_ALIASES))
+            by_keyword = None
+            if Config.COMBINED_QUERIES:
+                # A few packed queries per source cover every keyword
+                with trace.stage("extract"):
+                    by_keyword = {keyword: [] for keyword in keywords}
+                    for article in fetch_hn(keywords, matcher) + fetch_news(keywords, matcher):
+                        by_keyword[article['keyword']].append(article)
+
+            for keyword in keywords:
+                with trace.stage("process"), tracing.keyword(keyword):
+                    total_processed.extend(store_keyword_articles(db, keyword, by_keyword, matcher))
+
+            trace.count("llm_calls", usage_tracker.totals()["calls"])
+    finally:
+        trace.save(db)
+
+    print(f"📊 {usage_tracker.summary()}")
+    print(f"⏱️  {trace.summary()}")
+    print(resilience.sources.summary())
+    
+    # Serialize the dashboard once now rather than on its next request
+    refresh_snapshot(db)
 
     # init_db.py'nin hata vermemesi için dolu liste döndür
     # Eğer hiç yeni veri yoksa bile, işlem yapıldığını belirtmek için True gibi davranacak bir liste dönüyoruz.
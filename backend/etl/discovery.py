@@ -0,0 +1,301 @@
+"""Discovery of trending terms that are not tracked keywords yet.
+
+Every newly fetched title is split into words and word n-grams ("rust",
+"server components"), and each term is counted once per title. Counts are
+kept per time window in two fixed-size sketches, so memory does not grow
+with the number of titles processed:
+
+- Space-Saving keeps the `capacity` most frequent terms of the window with
+  an upper bound on each count's overestimate. These are the candidates.
+- A Count-Min sketch (conservative update) estimates the count of any term,
+  including ones that never made a window's top list. Old windows are only
+  read through it, as the baseline a candidate's current count is compared
+  against.
+
+Windows are stored in the ``discovery_windows`` table and updated with a
+version check, so concurrent ETL processes merge their counts instead of
+overwriting each other. rising() ranks the terms of the latest window by
+how far their share of titles exceeds the baseline windows' share.
+"""
+import hashlib
+import heapq
+import json
+import re
+import time
+from array import array
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+# Words ending in "+", "#" or containing "." / "-" are kept whole (c++, c#, next.js, gpt-4o)
+TOKEN_PATTERN = re.compile(r"\w[\w+#.\-]*[\w+#]|\w")
+
+STOPWORDS = frozenset("""
+a about after all also an and any are as at be been before being but by can could did do
+does doing don for from get gets getting had has have how i if in into is it its just
+like make more most my new news no not now of on one or our out over own really s show
+so some than that the their them then there these they this to too up us use using vs
+was way we what when where which who why will with without would you your
+""".split())
+
+# Attempts to merge into a window another process updated in between
+SAVE_ATTEMPTS = 5
+
+
+def window_start(timestamp: float, window_hours: int) -> str:
+    """Start of the window containing `timestamp`, as UTC "YYYY-MM-DDTHH:MM"."""
+    size = window_hours * 3600
+    start = int(timestamp // size) * size
+    return datetime.fromtimestamp(start, timezone.utc).strftime("%Y-%m-%dT%H:%M")
+
+
+def terms(title: str, max_ngram: int = 2) -> Set[str]:
+    """Distinct words and n-grams of a title worth counting.
+
+    Stopwords and numbers are dropped as words and may not start or end an
+    n-gram ("state of the art" is skipped, "rust in production" is kept).
+    """
+    tokens = TOKEN_PATTERN.findall((title or "").lower())
+    found = set()
+    for i, token in enumerate(tokens):
+        if token in STOPWORDS or token.isdigit() or len(token) < 2:
+            continue
+        found.add(token)
+        for n in range(2, max_ngram + 1):
+            if i + n > len(tokens):
+                break
+            last = tokens[i + n - 1]
+            if last not in STOPWORDS and not last.isdigit():
+                found.add(" ".join(tokens[i:i + n]))
+    return found
+
+
+class CountMinSketch:
+    """Approximate counts in `width` x `depth` counters; never underestimates."""
+
+    def __init__(self, width: int, depth: int, counters: Optional[bytes] = None):
+        self.width = width
+        self.depth = depth
+        self.counters = array("I")
+        if counters:
+            self.counters.frombytes(counters)
+        else:
+            self.counters.extend([0] * (width * depth))
+
+    def _cells(self, term: str) -> List[int]:
+        digest = hashlib.blake2b(term.encode("utf-8"), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return [row * self.width + (h1 + row * h2) % self.width for row in range(self.depth)]
+
+    def add(self, term: str, n: int = 1):
+        """Count `term` n more times, raising only the counters that are lowest."""
+        cells = self._cells(term)
+        target = min(self.counters[cell] for cell in cells) + n
+        for cell in cells:
+            if self.counters[cell] < target:
+                self.counters[cell] = target
+
+    def estimate(self, term: str) -> int:
+        return min(self.counters[cell] for cell in self._cells(term))
+
+    def to_bytes(self) -> bytes:
+        return self.counters.tobytes()
+
+
+class SpaceSaving:
+    """The `capacity` most frequent terms with (count, overestimate) each.
+
+    A new term takes the place of the least frequent one and inherits its
+    count as possible error. The minimum is found with a heap holding stale
+    entries for terms that have since grown; those are skipped lazily and
+    the heap is rebuilt once it grows past a few times the capacity.
+    """
+
+    def __init__(self, capacity: int, counts: Optional[Dict[str, List[int]]] = None):
+        self.capacity = capacity
+        self.counts: Dict[str, List[int]] = {term: list(entry) for term, entry in (counts or {}).items()}
+        self._rebuild_heap()
+
+    def _rebuild_heap(self):
+        self._heap = [(entry[0], term) for term, entry in self.counts.items()]
+        heapq.heapify(self._heap)
+
+    def add(self, term: str, n: int = 1):
+        entry = self.counts.get(term)
+        if entry is not None:
+            entry[0] += n
+            heapq.heappush(self._heap, (entry[0], term))
+            if len(self._heap) > 4 * self.capacity:
+                self._rebuild_heap()
+            return
+        if len(self.counts) < self.capacity:
+            self.counts[term] = [n, 0]
+            heapq.heappush(self._heap, (n, term))
+            return
+        # Drop heap entries whose term has grown or was evicted
+        while True:
+            count, victim = self._heap[0]
+            current = self.counts.get(victim)
+            if current is not None and current[0] == count:
+                break
+            heapq.heappop(self._heap)
+        del self.counts[victim]
+        self.counts[term] = [count + n, count]
+        heapq.heapreplace(self._heap, (count + n, term))
+
+
+class Window:
+    """Counts of one time window."""
+
+    def __init__(self, start: str, capacity: int, width: int, depth: int, row: Optional[Dict[str, Any]] = None):
+        self.start = start
+        self.version = row["version"] if row else 0
+        self.titles = row["titles"] if row else 0
+        self.top = SpaceSaving(capacity, json.loads(row["top_terms"]) if row else None)
+        self.sketch = CountMinSketch(row["width"] if row else width, row["depth"] if row else depth,
+                                     row["counters"] if row else None)
+
+    def add_title(self, title_terms: Iterable[str]):
+        self.titles += 1
+        for term in title_terms:
+            self.top.add(term)
+            self.sketch.add(term)
+
+    def estimate(self, term: str) -> int:
+        """Upper bound on the titles mentioning `term`; the tighter of both sketches."""
+        estimate = self.sketch.estimate(term)
+        entry = self.top.counts.get(term)
+        return min(entry[0], estimate) if entry else estimate
+
+
+class TrendDiscovery:
+    """Records fetched titles and reports terms that are rising."""
+
+    def __init__(self, db, window_hours: int = 24, baseline_windows: int = 7, capacity: int = 500,
+                 width: int = 2048, depth: int = 4, max_ngram: int = 2, clock=time.time):
+        """Initialize discovery over the windows stored in `db`.
+
+        Args:
+            db: Database with the discovery_windows table
+            window_hours: Length of a window
+            baseline_windows: Earlier windows compared against (and kept)
+            capacity: Top terms tracked per window
+            width: Count-Min counters per row
+            depth: Count-Min rows (independent hashes)
+            max_ngram: Longest word n-gram counted
+            clock: Current time in seconds (injectable for tests)
+        """
+        self.db = db
+        self.window_hours = window_hours
+        self.baseline_windows = baseline_windows
+        self.capacity = capacity
+        self.width = width
+        self.depth = depth
+        self.max_ngram = max_ngram
+        self.clock = clock
+
+    @classmethod
+    def from_config(cls, db, config) -> "TrendDiscovery":
+        """Discovery with the DISCOVERY_* settings of a Config class."""
+        return cls(db, window_hours=config.DISCOVERY_WINDOW_HOURS, baseline_windows=config.DISCOVERY_BASELINE_WINDOWS,
+                   capacity=config.DISCOVERY_CAPACITY, width=config.DISCOVERY_SKETCH_WIDTH,
+                   depth=config.DISCOVERY_SKETCH_DEPTH, max_ngram=config.DISCOVERY_MAX_NGRAM)
+
+    def _load(self, start: str) -> Window:
+        rows = self.db.get_discovery_windows(start=start, limit=1)
+        row = rows[0] if rows and rows[0]["window_start"] == start else None
+        return Window(start, self.capacity, self.width, self.depth, row)
+
+    def observe(self, titles: Iterable[str]) -> int:
+        """Count the terms of `titles` in the current window.
+
+        The window is re-read and the titles replayed if another process
+        saved it in between.
+
+        Returns:
+            Number of titles counted (0 if the window could not be saved)
+        """
+        titles = [title for title in titles if title]
+        if not titles:
+            return 0
+        start = window_start(self.clock(), self.window_hours)
+        title_terms = [terms(title, self.max_ngram) for title in titles]
+        for _ in range(SAVE_ATTEMPTS):
+            window = self._load(start)
+            for found in title_terms:
+                window.add_title(found)
+            if self.db.save_discovery_window(start, window.version, window.titles, window.sketch.width,
+                                             window.sketch.depth, window.sketch.to_bytes(),
+                                             json.dumps(window.top.counts)):
+                self.db.prune_discovery_windows(keep=self.baseline_windows + 1)
+                return len(titles)
+        print(f"Discovery window {start} kept changing; {len(titles)} titles not counted")
+        return 0
+
+    def rising(self, limit: int = 20, min_count: int = 3, tracked: Iterable[str] = (),
+               include_tracked: bool = False) -> Dict[str, Any]:
+        """Terms of the latest window ranked by growth over the baseline.
+
+        A term's score is its count in the latest window divided by the
+        count expected from its share of titles in the baseline windows
+        (both plus one, so terms new to the baseline are not infinite). Only
+        the guaranteed part of a Space-Saving count (count - error) is used.
+
+        Args:
+            limit: Maximum terms returned
+            min_count: Titles a term must be guaranteed to appear in
+            tracked: Keywords (and aliases) already tracked
+            include_tracked: Also list terms that are tracked keywords
+
+        Returns:
+            Dictionary with the window, baseline and rising terms
+        """
+        rows = self.db.get_discovery_windows(limit=self.baseline_windows + 1)
+        if not rows:
+            return {"window": None, "baseline": None, "terms": []}
+        current = Window(rows[0]["window_start"], self.capacity, self.width, self.depth, rows[0])
+        baseline = [Window(row["window_start"], self.capacity, self.width, self.depth, row) for row in rows[1:]]
+        baseline_titles = sum(window.titles for window in baseline)
+        tracked = {keyword.lower() for keyword in tracked}
+
+        results = []
+        for term, (count, error) in current.top.counts.items():
+            guaranteed = count - error
+            is_tracked = term in tracked
+            if guaranteed < min_count or (is_tracked and not include_tracked):
+                continue
+            previous = sum(window.estimate(term) for window in baseline)
+            expected = previous / baseline_titles * current.titles if baseline_titles else 0.0
+            results.append({
+                "term": term,
+                "count": guaranteed,
+                "error": error,
+                "share": round(guaranteed / current.titles, 4),
+                "baseline_share": round(previous / baseline_titles, 4) if baseline_titles else None,
+                "score": round((guaranteed + 1) / (expected + 1), 4),
+                "tracked": is_tracked,
+            })
+        results.sort(key=lambda item: (-item["score"], -item["count"], item["term"]))
+
+        return {
+            "window": {"start": current.start, "hours": self.window_hours, "titles": current.titles},
+            "baseline": {"windows": len(baseline), "titles": baseline_titles},
+            "terms": results[:limit],
+        }
+
+
+def record_titles(discovery: TrendDiscovery, records: Iterable[Dict[str, Any]]) -> int:
+    """Observe the titles of new articles, once per URL. Failures are reported, not raised."""
+    seen = set()
+    titles = []
+    for record in records:
+        url = record.get("url")
+        if url in seen:
+            continue
+        seen.add(url)
+        titles.append(record.get("title"))
+    try:
+        return discovery.observe(titles)
+    except Exception as e:
+        print(f"Could not record titles for discovery: {e}")
+        return 0
+
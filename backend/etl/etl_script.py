@@ -5,6 +5,12 @@ from dotenv import load_dotenv
 # 1. Load environment variables (API Keys)
 load_dotenv() 
 
+# Seconds to wait for a response; without it a stalled API hangs the script
+TIMEOUT = 10
+
+# One session keeps connections alive across the requests to each API
+session = requests.Session()
+
 # ---------------------------------------------------------
 # Source 1: Hacker News (No Key Needed)
 # ---------------------------------------------------------
@@ -12,7 +18,7 @@ def fetch_hacker_news(keyword):
     print(f"\n🔎 Fetching Hacker News data for: {keyword}...")
     
     url = f"https://hn.algolia.com/api/v1/search?query={keyword}&tags=story"
-    response = requests.get(url)
+    response = session.get(url, timeout=TIMEOUT)
     
     if response.status_code == 200:
         data = response.json()
@@ -45,7 +51,7 @@ def fetch_news_api(keyword):
         'pageSize': 3  # Limit to 3 for testing
     }
     
-    response = requests.get(url, params=params)
+    response = session.get(url, params=params, timeout=TIMEOUT)
     
     if response.status_code == 200:
         data = response.json()
@@ -1,8 +1,7 @@
 """Data extraction from external APIs."""
 import praw
 import requests
-import time
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional
 from datetime import datetime
 import os
 import sys
@@ -13,6 +12,25 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 from backend.config import Config
+from backend.etl import http_client, resilience, tracing
+from backend.etl.keyword_matcher import KeywordMatcher, pack_queries, parse_aliases, tag_items
+
+# Longest search query each API accepts
+REDDIT_MAX_QUERY_LENGTH = 512
+NEWS_MAX_QUERY_LENGTH = 500
+
+# NewsAPI returns at most this many articles per request
+NEWS_MAX_PAGE_SIZE = 100
+
+
+def match_keywords(text: str, keywords: List[str], matcher: KeywordMatcher = None) -> List[str]:
+    """Keywords mentioned in `text`, in the order given."""
+    return (matcher or KeywordMatcher(keywords)).match(text)
+
+
+def build_or_queries(keywords: List[str], max_length: int = REDDIT_MAX_QUERY_LENGTH) -> List[str]:
+    """Pack keywords into as few `a OR "b c"` queries as fit the length limit."""
+    return [query for query, _ in pack_queries(keywords, max_length)]
 
 
 class DataExtractor:
@@ -21,6 +39,9 @@ class DataExtractor:
     def __init__(self):
         """Initialize extractor with API credentials."""
         self.reddit = None
+        self.aliases = parse_aliases(Config.KEYWORD_ALIASES)
+        resilience.configure(Config)
+        http_client.configure(Config)
         self._init_reddit()
     
     def _init_reddit(self):
@@ -29,9 +50,30 @@ class DataExtractor:
             self.reddit = praw.Reddit(
                 client_id=Config.REDDIT_CLIENT_ID,
                 client_secret=Config.REDDIT_CLIENT_SECRET,
-                user_agent=Config.REDDIT_USER_AGENT
+                user_agent=Config.REDDIT_USER_AGENT,
+                timeout=Config.SOURCE_TIMEOUT
             )
     
+    def _matcher(self, keywords: List[str]) -> KeywordMatcher:
+        """Matcher for `keywords` and their configured aliases."""
+        return KeywordMatcher(keywords, self.aliases)
+    
+    def _multireddit(self, subreddits: List[str] = None):
+        """All configured subreddits combined ("programming+webdev+...")."""
+        return self.reddit.subreddit("+".join(subreddits or Config.REDDIT_SUBREDDITS))
+    
+    @staticmethod
+    def _post_record(post, keyword: str) -> Dict[str, Any]:
+        """Pipeline record for a Reddit submission."""
+        return {
+            "title": post.title,
+            "content": post.selftext[:1000] if post.selftext else post.title,  # Limit content length
+            "source": "reddit",
+            "url": f"https://reddit.com{post.permalink}",
+            "timestamp": datetime.fromtimestamp(post.created_utc).isoformat(),
+            "keyword": keyword
+        }
+    
     def extract_reddit(self, keyword: str, limit: int = None) -> List[Dict[str, Any]]:
         """Extract posts from Reddit based on keyword.
         
@@ -42,48 +84,142 @@ class DataExtractor:
         Returns:
             List of post data dictionaries
         """
-        if not self.reddit:
+        return self.extract_reddit_multi([keyword], limit=limit)
+    
+    def extract_reddit_multi(self, keywords: List[str], limit: int = None,
+                             subreddits: List[str] = None) -> List[Dict[str, Any]]:
+        """Extract posts for several keywords with one combined search.
+        
+        All subreddits are searched together as a multireddit with the
+        keywords ORed into one query, instead of one search per subreddit
+        and keyword. Each post is then tagged locally with every keyword it
+        mentions; a post about two keywords yields one record per keyword.
+        
+        Args:
+            keywords: Technology keywords to search for
+            limit: Maximum number of posts per keyword
+            subreddits: Subreddits to search. Defaults to Config.REDDIT_SUBREDDITS.
+            
+        Returns:
+            List of post data dictionaries
+        """
+        if not self.reddit or not keywords:
             return []
         
         limit = limit or Config.REDDIT_LIMIT
+        matcher = self._matcher(keywords)
+        counts = {keyword: 0 for keyword in keywords}
+        seen = set()
         results = []
         
         try:
-            # Search in relevant subreddits
-            subreddits = ["programming", "webdev", "learnprogramming", "technology"]
-            
-            for subreddit_name in subreddits:
-                try:
-                    subreddit = self.reddit.subreddit(subreddit_name)
-                    posts = subreddit.search(keyword, limit=limit, sort="hot", time_filter="week")
+            multireddit = self._multireddit(subreddits)
+            for query, _ in pack_queries(keywords, REDDIT_MAX_QUERY_LENGTH):
+                # Over-fetch: the shared listing is split across keywords
+                posts = multireddit.search(query, limit=limit * len(keywords), sort="hot", time_filter="week")
+                
+                # The listing is fetched lazily while iterating
+                with tracing.span("network"):
+                    posts = resilience.call("reddit", list, posts)
+                
+                for post in posts:
+                    # Posts can come back from more than one query chunk
+                    if post.id in seen:
+                        continue
+                    seen.add(post.id)
+                    for keyword in matcher.match(f"{post.title}\n{post.selftext}"):
+                        if counts[keyword] < limit:
+                            counts[keyword] += 1
+                            results.append(self._post_record(post, keyword))
                     
-                    for post in posts:
-                        if keyword.lower() in post.title.lower() or keyword.lower() in post.selftext.lower():
-                            results.append({
-                                "title": post.title,
-                                "content": post.selftext[:1000] if post.selftext else post.title,  # Limit content length
-                                "source": "reddit",
-                                "url": f"https://reddit.com{post.permalink}",
-                                "timestamp": datetime.fromtimestamp(post.created_utc).isoformat(),
-                                "keyword": keyword
-                            })
-                            
-                            if len(results) >= limit:
-                                break
-                    
-                    if len(results) >= limit:
+                    if all(count >= limit for count in counts.values()):
                         break
-                    
-                    # Rate limiting
-                    time.sleep(1)
-                except Exception as e:
-                    print(f"Error extracting from r/{subreddit_name}: {e}")
-                    continue
+                
+                if all(count >= limit for count in counts.values()):
+                    break
         
+        except resilience.SourceUnavailable as e:
+            print(f"Skipping Reddit: {e}")
+            tracing.count("skipped")
         except Exception as e:
             print(f"Error in Reddit extraction: {e}")
+            tracing.count("errors")
+        
+        return results
+    
+    def stream_reddit(self, keywords: List[str], subreddits: List[str] = None,
+                      pause_after: int = 0) -> Iterator[Optional[Dict[str, Any]]]:
+        """Follow new submissions continuously and yield matching records.
+        
+        Uses one multireddit submission stream for all subreddits. Posts are
+        tagged locally the same way as extract_reddit_multi.
+        
+        Args:
+            keywords: Keywords to match
+            subreddits: Subreddits to follow. Defaults to
+                Config.REDDIT_STREAM_SUBREDDITS, then Config.REDDIT_SUBREDDITS.
+            pause_after: Yield None after this many empty polls, so callers can
+                flush partial batches while the stream is quiet
+            
+        Yields:
+            Post records, or None when the stream is idle
+        """
+        if not self.reddit:
+            return
         
-        return results[:limit]
+        matcher = self._matcher(keywords)
+        multireddit = self._multireddit(subreddits or Config.REDDIT_STREAM_SUBREDDITS)
+        stream = multireddit.stream.submissions(skip_existing=True, pause_after=pause_after)
+        
+        for post in stream:
+            if post is None:
+                yield None
+                continue
+            for keyword in matcher.match(f"{post.title}\n{post.selftext}"):
+                yield self._post_record(post, keyword)
+    
+    @staticmethod
+    def _news_record(article: Dict[str, Any], keyword: str) -> Dict[str, Any]:
+        """Pipeline record for a NewsAPI article."""
+        return {
+            "title": article.get("title", ""),
+            "content": article.get("content", "")[:1000] if article.get("content") else article.get("description", "")[:1000],
+            "source": "news",
+            "url": article.get("url", ""),
+            "timestamp": article.get("publishedAt", datetime.now().isoformat()),
+            "keyword": keyword
+        }
+    
+    def _search_news(self, query: str, page_size: int) -> List[Dict[str, Any]]:
+        """Articles with a title and content returned by one NewsAPI search."""
+        url = "https://newsapi.org/v2/everything"
+        params = {
+            "q": query,
+            "apiKey": Config.NEWS_API_KEY,
+            "sortBy": "publishedAt",
+            "language": "en",
+            "pageSize": page_size
+        }
+        
+        def get(timeout: float):
+            response = http_client.get(url, params=params, timeout=timeout)
+            # Error statuses count against the source's circuit breaker
+            response.raise_for_status()
+            return response
+        
+        # A fresh cached reply costs no request and stays out of the source's latencies
+        response = http_client.lookup(url, params)
+        if response is None:
+            with tracing.span("network"):
+                response = resilience.call("news", get, timeout=Config.SOURCE_TIMEOUT)
+        
+        data = response.json()
+        if data.get("status") != "ok":
+            return []
+        return [
+            article for article in data.get("articles", [])[:page_size]
+            if article.get("title") and article.get("content")
+        ]
     
     def extract_news(self, keyword: str, limit: int = None) -> List[Dict[str, Any]]:
         """Extract articles from News API based on keyword.
@@ -102,42 +238,68 @@ class DataExtractor:
         results = []
         
         try:
-            url = "https://newsapi.org/v2/everything"
-            params = {
-                "q": keyword,
-                "apiKey": Config.NEWS_API_KEY,
-                "sortBy": "publishedAt",
-                "language": "en",
-                "pageSize": limit
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if data.get("status") == "ok":
-                for article in data.get("articles", [])[:limit]:
-                    if article.get("title") and article.get("content"):
-                        results.append({
-                            "title": article.get("title", ""),
-                            "content": article.get("content", "")[:1000] if article.get("content") else article.get("description", "")[:1000],
-                            "source": "news",
-                            "url": article.get("url", ""),
-                            "timestamp": article.get("publishedAt", datetime.now().isoformat()),
-                            "keyword": keyword
-                        })
+            for article in self._search_news(keyword, limit):
+                results.append(self._news_record(article, keyword))
         
+        except resilience.SourceUnavailable as e:
+            print(f"Skipping News API: {e}")
+            tracing.count("skipped")
         except requests.exceptions.RequestException as e:
             print(f"Error in News API extraction: {e}")
+            tracing.count("errors")
         except Exception as e:
             print(f"Unexpected error in News extraction: {e}")
+            tracing.count("errors")
         
         return results
     
+    def extract_news_multi(self, keywords: List[str], limit: int = None) -> List[Dict[str, Any]]:
+        """Extract articles for several keywords with packed OR-queries.
+        
+        Keywords are ORed into as few searches as the NewsAPI query length
+        allows. Articles of a combined search are tagged
+        locally with every tracked keyword they mention, so an article about
+        two keywords is fetched once and yields one record per keyword.
+        
+        Args:
+            keywords: Technology keywords to search for
+            limit: Maximum number of articles per keyword
+            
+        Returns:
+            List of article data dictionaries
+        """
+        if not Config.NEWS_API_KEY or not keywords:
+            return []
+        
+        limit = limit or Config.NEWS_LIMIT
+        returned = []
+        
+        for query, covered in pack_queries(keywords, NEWS_MAX_QUERY_LENGTH):
+            try:
+                # Over-fetch: the shared page is split across keywords
+                page_size = min(limit * len(covered), NEWS_MAX_PAGE_SIZE)
+                returned.extend((covered, article) for article in self._search_news(query, page_size))
+            except resilience.SourceUnavailable as e:
+                # Every later query would be skipped the same way
+                print(f"Skipping News API: {e}")
+                tracing.count("skipped")
+                break
+            except requests.exceptions.RequestException as e:
+                print(f"Error in News API extraction: {e}")
+                tracing.count("errors")
+            except Exception as e:
+                print(f"Unexpected error in News extraction: {e}")
+                tracing.count("errors")
+        
+        tagged = tag_items(returned, self._matcher(keywords), ("title", "description", "content"), limit)
+        return [self._news_record(article, keyword) for keyword, article in tagged]
+    
     def extract_all(self, keywords: List[str] = None) -> List[Dict[str, Any]]:
         """Extract data for all keywords from all sources.
         
+        With Config.COMBINED_QUERIES each source is searched with packed
+        multi-keyword queries; otherwise news is fetched per keyword.
+        
         Args:
             keywords: List of keywords to extract. Defaults to Config.KEYWORDS.
             
@@ -145,21 +307,28 @@ class DataExtractor:
             List of all extracted data
         """
         keywords = keywords or Config.KEYWORDS
-        all_data = []
+        
+        # One combined Reddit search for every keyword
+        print(f"Extracting Reddit data for keywords: {', '.join(keywords)}")
+        all_data = self.extract_reddit_multi(keywords)
+        
+        if Config.COMBINED_QUERIES:
+            print(f"Extracting news for keywords: {', '.join(keywords)}")
+            all_data.extend(self.extract_news_multi(keywords))
+            return all_data
         
         for keyword in keywords:
-            print(f"Extracting data for keyword: {keyword}")
-            
-            # Extract from Reddit
-            reddit_data = self.extract_reddit(keyword)
-            all_data.extend(reddit_data)
+            left = resilience.remaining()
+            if left is not None and left <= 0:
+                print("Run deadline passed; skipping the remaining keywords")
+                break
+            print(f"Extracting news for keyword: {keyword}")
             
             # Extract from News
             news_data = self.extract_news(keyword)
             all_data.extend(news_data)
             
             # Rate limiting between keywords
-            time.sleep(2)
+            tracing.sleep(2)
         
         return all_data
-
@@ -0,0 +1,249 @@
+"""Shared HTTP client: pooled connections and an on-disk response cache.
+
+Every source request goes through one ``requests.Session`` per process,
+whose adapter keeps a pool of keep-alive connections per host, so repeated
+calls to the same API skip the TCP and TLS handshakes.
+
+Successful GET responses are cached on disk, keyed by URL and parameters:
+
+- Within the TTL of the URL's host the cached body is returned without a
+  request (lookup()).
+- After that, a response that came with an ETag or Last-Modified header is
+  revalidated with If-None-Match / If-Modified-Since. A 304 reply
+  refreshes the cached copy instead of downloading the body again.
+- Hosts without a TTL are not cached.
+
+    response = http_client.lookup(url, params)
+    if response is None:
+        response = resilience.call("news", http_client.get, url, params=params, timeout=10)
+
+Cache files are written atomically. When there are more than
+`max_entries` files, the oldest are removed.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+# Response headers kept with a cached body
+STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+# Cache writes between two checks of the cache size
+PRUNE_EVERY = 50
+
+
+def parse_ttls(spec: str) -> Dict[str, float]:
+    """Parse "hn.algolia.com=300,newsapi.org=900" into {host: seconds}."""
+    ttls = {}
+    for entry in spec.split(","):
+        host, _, seconds = entry.partition("=")
+        if host.strip() and seconds.strip():
+            ttls[host.strip().lower()] = float(seconds)
+    return ttls
+
+
+def _cached_response(url: str, entry: Dict[str, Any], body: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response.headers = CaseInsensitiveDict(entry.get("headers") or {})
+    response._content = body
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers) or "utf-8"
+    response.from_cache = True
+    return response
+
+
+class HttpClient:
+    """Pooled session with TTL and conditional-request caching."""
+
+    def __init__(self, cache_dir: Optional[str] = None, ttls: Optional[Dict[str, float]] = None,
+                 pool_size: int = 10, max_entries: int = 1000, clock=time.time):
+        """Initialize the client.
+
+        Args:
+            cache_dir: Directory for cached responses; None disables caching
+            ttls: Seconds a response stays fresh, per host (subdomains included)
+            pool_size: Keep-alive connections per host
+            max_entries: Cached responses kept before the oldest are removed
+            clock: Current time in seconds (injectable for tests)
+        """
+        self.cache_dir = cache_dir
+        self.ttls = dict(ttls or {})
+        self.pool_size = pool_size
+        self.max_entries = max_entries
+        self.clock = clock
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "bytes_saved": 0}
+        self._session: Optional[requests.Session] = None
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        """The shared session, created on first use."""
+        with self._lock:
+            if self._session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._session = session
+            return self._session
+
+    def ttl(self, url: str) -> float:
+        """Freshness lifetime of responses from `url`'s host (0: not cached)."""
+        host = (urlsplit(url).hostname or "").lower()
+        for pattern, seconds in self.ttls.items():
+            if host == pattern or host.endswith("." + pattern):
+                return seconds
+        return 0.0
+
+    def _paths(self, url: str, params: Optional[Dict[str, Any]]):
+        # Parameters may hold API keys; only their hash reaches the disk
+        key = hashlib.sha256(json.dumps([url, sorted((params or {}).items())], default=str).encode()).hexdigest()
+        base = os.path.join(self.cache_dir, key[:2], key)
+        return base + ".json", base + ".body"
+
+    def _read(self, url: str, params: Optional[Dict[str, Any]]):
+        if not self.cache_dir or not self.ttl(url):
+            return None, None
+        meta_path, body_path = self._paths(url, params)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None, None
+        return entry, body
+
+    def _write_atomic(self, path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def _store(self, url: str, params: Optional[Dict[str, Any]], entry: Dict[str, Any], body: Optional[bytes]):
+        meta_path, body_path = self._paths(url, params)
+        try:
+            # Body first: a metadata file always has its body
+            if body is not None:
+                self._write_atomic(body_path, body)
+            self._write_atomic(meta_path, json.dumps(entry).encode("utf-8"))
+        except OSError as e:
+            print(f"Could not cache response of {url}: {e}")
+            return
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % PRUNE_EVERY == 0
+        if prune:
+            self.prune()
+
+    def lookup(self, url: str, params: Optional[Dict[str, Any]] = None) -> Optional[requests.Response]:
+        """The cached response if it is still fresh, without any request."""
+        entry, body = self._read(url, params)
+        if entry is None or self.clock() - entry["stored_at"] >= self.ttl(url):
+            return None
+        with self._lock:
+            self.stats["hits"] += 1
+            self.stats["bytes_saved"] += len(body)
+        return _cached_response(url, entry, body)
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None,
+            headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """GET through the pool, answered from or revalidated against the cache.
+
+        Error responses are returned as they are and never cached.
+        """
+        cached = self.lookup(url, params)
+        if cached is not None:
+            return cached
+
+        entry, body = self._read(url, params)
+        request_headers = dict(headers or {})
+        if entry is not None:
+            stored = CaseInsensitiveDict(entry.get("headers") or {})
+            if stored.get("ETag"):
+                request_headers["If-None-Match"] = stored["ETag"]
+            if stored.get("Last-Modified"):
+                request_headers["If-Modified-Since"] = stored["Last-Modified"]
+
+        response = self.session.get(url, params=params, timeout=timeout, headers=request_headers or None)
+
+        if response.status_code == 304 and entry is not None:
+            entry["stored_at"] = self.clock()
+            self._store(url, params, entry, None)
+            with self._lock:
+                self.stats["revalidated"] += 1
+                self.stats["bytes_saved"] += len(body)
+            return _cached_response(url, entry, body)
+
+        with self._lock:
+            self.stats["misses"] += 1
+        if response.status_code == 200 and self.cache_dir and self.ttl(url):
+            stored_headers = {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+            self._store(url, params, {"stored_at": self.clock(), "headers": stored_headers}, response.content)
+        return response
+
+    def prune(self) -> int:
+        """Remove the oldest cached responses beyond `max_entries`."""
+        if not self.cache_dir or not os.path.isdir(self.cache_dir):
+            return 0
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    try:
+                        entries.append((os.path.getmtime(path), path))
+                    except OSError:
+                        continue
+        entries.sort()
+        removed = 0
+        for _, path in entries[:max(len(entries) - self.max_entries, 0)]:
+            for stale in (path, path[:-len(".json")] + ".body"):
+                try:
+                    os.unlink(stale)
+                except OSError:
+                    pass
+            removed += 1
+        return removed
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.stats)
+
+
+# Shared by all extractors of this process; see configure()
+client = HttpClient()
+
+
+def configure(config):
+    """Apply the HTTP_* settings of a Config class to `client`."""
+    client.cache_dir = config.HTTP_CACHE_DIR or None
+    client.ttls = parse_ttls(config.HTTP_CACHE_TTLS)
+    client.pool_size = config.HTTP_POOL_SIZE
+    client.max_entries = config.HTTP_CACHE_MAX_ENTRIES
+
+
+def lookup(url: str, params: Optional[Dict[str, Any]] = None) -> Optional[requests.Response]:
+    """HttpClient.lookup() on the shared `client`."""
+    return client.lookup(url, params)
+
+
+def get(url: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None,
+        headers: Optional[Dict[str, str]] = None) -> requests.Response:
+    """HttpClient.get() on the shared `client`."""
+    return client.get(url, params=params, timeout=timeout, headers=headers)
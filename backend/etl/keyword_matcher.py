@@ -0,0 +1,191 @@
+"""Multi-keyword source queries and local keyword tagging.
+
+Instead of one search per keyword and source, keywords are packed into as
+few OR-queries as each API's query length allows (pack_queries). Every
+returned item is then tagged locally with all tracked keywords it
+mentions, using one Aho-Corasick automaton over the keywords and their
+aliases ("NextJS" and "Next js" count as "Next.js"), so scanning an item
+costs one pass over its text regardless of how many keywords are tracked.
+
+Matches are case-insensitive and must stand as whole words: "AI" does not
+match inside "said", while keywords that start or end in punctuation
+("C++", ".NET") still match.
+"""
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def parse_aliases(spec: str) -> Dict[str, List[str]]:
+    """Parse "Next.js:NextJS|Next js,React:ReactJS" into {keyword: [aliases]}."""
+    aliases: Dict[str, List[str]] = {}
+    for entry in spec.split(","):
+        keyword, _, names = entry.partition(":")
+        keyword = keyword.strip()
+        names = [name.strip() for name in names.split("|") if name.strip()]
+        if keyword and names:
+            aliases.setdefault(keyword, []).extend(names)
+    return aliases
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton tagging text with the keywords it mentions."""
+
+    def __init__(self, keywords: List[str], aliases: Optional[Dict[str, List[str]]] = None):
+        """Build the automaton.
+
+        Args:
+            keywords: Tracked keywords; match() reports them in this order
+            aliases: Other spellings per keyword. Aliases of keywords that are
+                not tracked are ignored.
+        """
+        self.keywords = list(keywords)
+        aliases = aliases or {}
+        # Per state: transitions, failure link, (pattern length, keyword index) outputs
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, int]]] = [[]]
+
+        for index, keyword in enumerate(self.keywords):
+            for term in [keyword] + list(aliases.get(keyword, [])):
+                self._add(term.lower(), index)
+        self._link()
+
+    def _add(self, term: str, index: int):
+        if not term:
+            return
+        state = 0
+        for char in term:
+            following = self._goto[state].get(char)
+            if following is None:
+                following = len(self._goto)
+                self._goto[state][char] = following
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = following
+        self._out[state].append((len(term), index))
+
+    def _link(self):
+        """Compute failure links breadth-first and merge outputs along them."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, following in self._goto[state].items():
+                queue.append(following)
+                if state:
+                    fail = self._fail[state]
+                    while fail and char not in self._goto[fail]:
+                        fail = self._fail[fail]
+                    self._fail[following] = self._goto[fail].get(char, 0)
+                self._out[following] = self._out[following] + self._out[self._fail[following]]
+
+    def match_indices(self, text: str) -> set:
+        """Indices of the keywords mentioned in `text`."""
+        text = (text or "").lower()
+        found = set()
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, index in out[state]:
+                if index in found:
+                    continue
+                start = position - length + 1
+                # Whole words only: no word character on either side
+                if start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if position + 1 < len(text) and _is_word_char(text[position + 1]):
+                    continue
+                found.add(index)
+            if len(found) == len(self.keywords):
+                break
+        return found
+
+    def match(self, text: str) -> List[str]:
+        """Keywords mentioned in `text`, in the order given."""
+        found = self.match_indices(text)
+        return [keyword for index, keyword in enumerate(self.keywords) if index in found]
+
+
+def _quote(term: str) -> str:
+    return f'"{term}"' if re.search(r"[^\w]", term) else term
+
+
+def pack_queries(keywords: List[str], max_length: int, separator: str = " OR ",
+                 quote: bool = True) -> List[Tuple[str, List[str]]]:
+    """Pack keywords into as few queries as fit `max_length`.
+
+    Queries search the keywords themselves; aliases only widen the local
+    tagging, which keeps queries short. A keyword too long to share a query
+    gets one of its own.
+
+    Args:
+        keywords: Keywords to search for
+        max_length: Longest query the API accepts
+        separator: Joins terms (" OR " for boolean syntax, " " for
+            engines that take optional words)
+        quote: Quote terms containing spaces or punctuation
+
+    Returns:
+        List of (query, keywords covered)
+    """
+    queries: List[Tuple[str, List[str]]] = []
+    current, covered = "", []
+    for keyword in keywords:
+        term = _quote(keyword) if quote else keyword
+        candidate = f"{current}{separator}{term}" if current else term
+        if current and len(candidate) > max_length:
+            queries.append((current, covered))
+            candidate, covered = term, []
+        current = candidate
+        covered.append(keyword)
+    if current:
+        queries.append((current, covered))
+    return queries
+
+
+def tag_items(results: Iterable[Tuple[List[str], dict]], matcher: KeywordMatcher,
+              text_fields: Iterable[str], limit: int, key: str = "url") -> List[Tuple[str, dict]]:
+    """Assign items returned by packed queries to the keywords they mention.
+
+    Items of a single-keyword query belong to that keyword, as the search
+    engine matched them; items of a combined query are tagged locally
+    against every tracked keyword. An item returned by several queries is
+    considered once, and an item mentioning several keywords is returned
+    once per keyword.
+
+    Args:
+        results: (keywords the query covered, item) for every returned item
+        matcher: Matcher over all tracked keywords
+        text_fields: Item fields searched for mentions
+        limit: Maximum items per keyword
+        key: Item field identifying duplicates
+
+    Returns:
+        List of (keyword, item)
+    """
+    text_fields = list(text_fields)
+    counts: Dict[str, int] = {}
+    seen = set()
+    tagged = []
+    for covered, item in results:
+        identity = item.get(key)
+        if identity in seen:
+            continue
+        seen.add(identity)
+        if len(covered) == 1:
+            mentioned = covered
+        else:
+            mentioned = matcher.match("\n".join(str(item.get(field) or "") for field in text_fields))
+        for keyword in mentioned:
+            if counts.get(keyword, 0) < limit:
+                counts[keyword] = counts.get(keyword, 0) + 1
+                tagged.append((keyword, item))
+    return tagged
@@ -1,6 +1,7 @@
 """Data loading into SQLite database."""
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 import os
+import sqlite3
 import sys
 
 # Add project root to path
@@ -9,7 +10,8 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 from backend.database.db import Database
-from backend.models.sentiment import SentimentRecord
+from backend.etl import tracing
+from backend.models.sentiment import SentimentBatch, SentimentRecord
 
 
 class DataLoader:
@@ -40,35 +42,61 @@ class DataLoader:
                 content=record.get("content", ""),
                 url=record.get("url", ""),
                 sentiment_score=float(record.get("sentiment_score", 0.0)),
-                summary=record.get("summary", "")
+                summary=record.get("summary", ""),
+                model=record.get("model"),
+                prompt_version=record.get("prompt_version")
             )
             
             if not sentiment_record.validate():
                 print(f"Invalid record: {sentiment_record.title}")
                 return False
             
-            return self.db.insert_sentiment(
-                keyword=sentiment_record.keyword,
-                source=sentiment_record.source,
-                title=sentiment_record.title,
-                content=sentiment_record.content,
-                url=sentiment_record.url,
-                sentiment_score=sentiment_record.sentiment_score,
-                summary=sentiment_record.summary
-            )
+            with tracing.span("sqlite"):
+                return self.db.insert_sentiment(*sentiment_record.to_row())
         
         except Exception as e:
             print(f"Error loading record: {e}")
             return False
     
+    def link_existing(self, records: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+        """Link records whose article is already stored instead of re-scoring them.
+        
+        Args:
+            records: List of extracted record dictionaries
+            
+        Returns:
+            Tuple of (records that still need scoring, number of new keyword links)
+        """
+        with tracing.span("sqlite"):
+            existing = self.db.get_existing_urls([record.get("url") for record in records])
+        pending = []
+        linked = 0
+        
+        for record in records:
+            if record.get("url") in existing:
+                with tracing.keyword(record.get("keyword")), tracing.span("sqlite"):
+                    if self.db.link_keyword(record["url"], record.get("keyword", "")):
+                        linked += 1
+                        tracing.count("items")
+            else:
+                pending.append(record)
+        
+        return pending, linked
+    
     def load_batch(self, records: List[Dict[str, Any]]) -> Dict[str, int]:
         """Load a batch of records into the database.
         
+        The records are validated together and stored with one executemany
+        transaction per keyword. If a keyword's transaction fails, its rows
+        are retried one by one so a single bad row does not drop the rest.
+        
         Args:
             records: List of record dictionaries
             
         Returns:
-            Dictionary with counts: loaded, duplicates, errors
+            Dictionary with counts: loaded, duplicates (article/keyword pairs
+            already stored) and errors (invalid rows and rows that failed to
+            insert)
         """
         stats = {
             "loaded": 0,
@@ -76,16 +104,38 @@ class DataLoader:
             "errors": 0
         }
         
-        for record in records:
-            try:
-                success = self.load_record(record)
-                if success:
-                    stats["loaded"] += 1
-                else:
-                    stats["duplicates"] += 1
-            except Exception as e:
-                print(f"Error in batch load: {e}")
-                stats["errors"] += 1
+        valid, invalid = SentimentBatch.from_dicts(records).split()
+        for row in invalid:
+            print(f"Invalid record: {row[2]}")
+        stats["errors"] += len(invalid)
+        if invalid:
+            tracing.count("errors", len(invalid))
+        
+        by_keyword: Dict[str, List[tuple]] = {}
+        for row in valid:
+            by_keyword.setdefault(row[0], []).append(row)
+        
+        for keyword, rows in by_keyword.items():
+            with tracing.keyword(keyword):
+                failed = 0
+                try:
+                    with tracing.span("sqlite"):
+                        loaded = self.db.insert_sentiments(rows)
+                except sqlite3.Error as e:
+                    print(f"Error in batch load, retrying row by row: {e}")
+                    loaded = 0
+                    for row in rows:
+                        try:
+                            with tracing.span("sqlite"):
+                                loaded += self.db.insert_sentiments([row])
+                        except sqlite3.Error as row_error:
+                            print(f"Error loading record {row[4]}: {row_error}")
+                            failed += 1
+                    if failed:
+                        tracing.count("errors", failed)
+                stats["loaded"] += loaded
+                stats["errors"] += failed
+                stats["duplicates"] += len(rows) - loaded - failed
+                tracing.count("items", loaded)
         
         return stats
-
@@ -1,7 +1,8 @@
 """ETL orchestration script."""
 import argparse
 import sys
-from typing import List
+import time
+from typing import Any, Dict, List
 import os
 import sys
 
@@ -10,10 +11,14 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(_
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
+from backend.api.dashboard import refresh_snapshot
 from backend.config import Config
+from backend.etl import resilience
+from backend.etl.discovery import TrendDiscovery, record_titles
 from backend.etl.extract import DataExtractor
 from backend.etl.transform import SentimentTransformer
 from backend.etl.load import DataLoader
+from backend.etl.tracing import RunTrace
 
 
 def run_etl(keywords: List[str] = None, verbose: bool = True):
@@ -41,38 +46,140 @@ def run_etl(keywords: List[str] = None, verbose: bool = True):
         print(f"\nProcessing keywords: {', '.join(keywords)}")
         print("\n[1/3] Extracting data...")
     
-    # Extract phase
-    extractor = DataExtractor()
-    extracted_data = extractor.extract_all(keywords)
-    
-    if verbose:
-        print(f"Extracted {len(extracted_data)} records")
-        print("\n[2/3] Transforming data with AI...")
-    
-    # Transform phase
+    loader = DataLoader()
     transformer = SentimentTransformer()
-    transformed_data = transformer.transform_batch(extracted_data)
+    trace = RunTrace("etl", keywords)
     
-    if verbose:
-        print(f"Transformed {len(transformed_data)} records")
-        print("\n[3/3] Loading data into database...")
+    try:
+        with trace:
+            # Extract phase; slow or failing sources are cut off at the run deadline
+            with trace.stage("extract"), resilience.deadline(Config.ETL_RUN_DEADLINE):
+                extractor = DataExtractor()
+                extracted_data = extractor.extract_all(keywords)
+            
+            # Articles already in the database only need their keyword link
+            with trace.stage("link"):
+                pending_data, linked = loader.link_existing(extracted_data)
+            
+            # Count the terms of new titles for /api/discover
+            with trace.stage("discover"):
+                record_titles(TrendDiscovery.from_config(loader.db, Config), pending_data)
+            
+            if verbose:
+                print(f"Extracted {len(extracted_data)} records ({linked} linked to stored articles)")
+                print("\n[2/3] Transforming data with AI...")
+            
+            # Transform phase
+            with trace.stage("transform"):
+                transformed_data = transformer.transform_batch(pending_data)
+            
+            if verbose:
+                print(f"Transformed {len(transformed_data)} records")
+                print("\n[3/3] Loading data into database...")
+            
+            # Load phase
+            with trace.stage("load"):
+                stats = loader.load_batch(transformed_data)
+            
+            usage = transformer.usage.totals()
+            trace.count("extracted", len(extracted_data))
+            trace.count("llm_calls", usage["calls"])
+            trace.count("retries", usage["repairs"])
+    finally:
+        trace.save(loader.db)
     
-    # Load phase
-    loader = DataLoader()
-    stats = loader.load_batch(transformed_data)
+    stats["linked"] = linked
+    stats["usage"] = usage
+    stats["run_id"] = trace.run_id
+    
+    # Serialize the dashboard once now rather than on its next request
+    refresh_snapshot(loader.db)
     
     if verbose:
         print("\n" + "=" * 50)
         print("ETL Pipeline Complete!")
         print("=" * 50)
         print(f"Loaded: {stats['loaded']} new records")
+        print(f"Linked: {stats['linked']} existing articles to new keywords")
         print(f"Duplicates: {stats['duplicates']} records")
         print(f"Errors: {stats['errors']} records")
+        print(transformer.usage.summary())
+        print(trace.summary())
+        print(resilience.sources.summary())
         print("=" * 50)
     
     return stats
 
 
+def run_stream(keywords: List[str] = None, subreddits: List[str] = None, batch_size: int = None,
+               flush_interval: float = None, verbose: bool = True) -> Dict[str, int]:
+    """Continuously ingest new Reddit posts until interrupted.
+    
+    Matching posts are collected from the multireddit submission stream and
+    pushed through the same link/transform/load steps as run_etl, in batches
+    of `batch_size` or every `flush_interval` seconds, whichever comes first.
+    
+    Args:
+        keywords: Keywords to match. Defaults to Config.KEYWORDS.
+        subreddits: Subreddits to follow. Defaults to Config.REDDIT_STREAM_SUBREDDITS.
+        batch_size: Posts per batch. Defaults to Config.REDDIT_STREAM_BATCH_SIZE.
+        flush_interval: Maximum seconds a post waits in a partial batch.
+        verbose: Print progress messages.
+        
+    Returns:
+        Totals of loaded, linked, duplicates and errors
+    """
+    keywords = keywords or Config.KEYWORDS
+    batch_size = batch_size or Config.REDDIT_STREAM_BATCH_SIZE
+    flush_interval = flush_interval or Config.REDDIT_STREAM_FLUSH_INTERVAL
+    
+    extractor = DataExtractor()
+    if not extractor.reddit:
+        print("ERROR: Streaming needs REDDIT_CLIENT_ID and REDDIT_CLIENT_SECRET.")
+        sys.exit(1)
+    
+    transformer = SentimentTransformer()
+    loader = DataLoader()
+    discovery = TrendDiscovery.from_config(loader.db, Config)
+    totals = {"loaded": 0, "linked": 0, "duplicates": 0, "errors": 0}
+    batch: List[Dict[str, Any]] = []
+    last_flush = time.monotonic()
+    
+    def flush():
+        pending, linked = loader.link_existing(batch)
+        record_titles(discovery, pending)
+        stats = loader.load_batch(transformer.transform_batch(pending))
+        stats["linked"] = linked
+        if stats["loaded"] or linked:
+            refresh_snapshot(loader.db)
+        for key in totals:
+            totals[key] += stats.get(key, 0)
+        if verbose:
+            print(f"Stored {stats['loaded']} new, linked {linked} of {len(batch)} streamed posts")
+            print(transformer.usage.summary())
+        batch.clear()
+    
+    if verbose:
+        print(f"Streaming Reddit for: {', '.join(keywords)} (Ctrl+C to stop)")
+    
+    try:
+        for record in extractor.stream_reddit(keywords, subreddits=subreddits):
+            if record is not None:
+                batch.append(record)
+            if batch and (len(batch) >= batch_size or time.monotonic() - last_flush >= flush_interval):
+                flush()
+                last_flush = time.monotonic()
+            elif not batch:
+                last_flush = time.monotonic()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if batch:
+            flush()
+    
+    return totals
+
+
 def main():
     """Main entry point for ETL script."""
     parser = argparse.ArgumentParser(description="Run ETL pipeline for sentiment analysis")
@@ -81,6 +188,16 @@ def main():
         type=str,
         help="Comma-separated list of keywords to process"
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Follow new Reddit posts continuously instead of a one-off batch"
+    )
+    parser.add_argument(
+        "--subreddits",
+        type=str,
+        help="Comma-separated subreddits to follow in --stream mode"
+    )
     parser.add_argument(
         "--quiet",
         action="store_true",
@@ -93,6 +210,11 @@ def main():
     if args.keywords:
         keywords = [k.strip() for k in args.keywords.split(",")]
     
+    if args.stream:
+        subreddits = [s.strip() for s in args.subreddits.split(",")] if args.subreddits else None
+        run_stream(keywords=keywords, subreddits=subreddits, verbose=not args.quiet)
+        return
+    
     run_etl(keywords=keywords, verbose=not args.quiet)
 
 
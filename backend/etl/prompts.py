@@ -0,0 +1,387 @@
+"""Prompt construction and LLM usage accounting.
+
+Both sentiment paths (SentimentTransformer and data_fetcher) build their
+prompts here: one compact instruction header, then the article cut down to
+a token budget by keeping the title and as many lead sentences as fit.
+
+Replies are requested as schema-constrained JSON (``response_schema``) and
+validated strictly by parse_sentiment(); generate_structured() gives a
+malformed reply one repair call before giving up.
+
+UsageTracker records prompt/output tokens and latency for every model call
+so a run's cost can be compared across prompt budgets, plus parse failures
+and repairs. Token counts come from the response's ``usage_metadata`` when
+the SDK provides it and are estimated from the text length otherwise.
+"""
+import json
+import math
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+# Rough characters per token for English text; only used for budgeting
+# and when the API does not report usage
+CHARS_PER_TOKEN = 4
+
+HEADER = "Rate the sentiment of this tech text toward \"{keyword}\" from -1.0 (very negative) to 1.0 (very positive)."
+
+JSON_REPLY = 'Reply with JSON only: {"sentiment_score": <float>, "summary": "<1-2 sentences>"}'
+
+SCORE_REPLY = 'Reply with JSON only: {"sentiment_score": <float>}'
+
+# Stored with every score. Bump when a prompt or its reply format changes;
+# etl/backfill.py re-scores articles scored with another version.
+SENTIMENT_PROMPT_VERSION = "sentiment-v1"
+SCORE_PROMPT_VERSION = "score-v1"
+
+
+def prompt_family(version: str) -> str:
+    """Prompt a version belongs to: "score-v2" -> "score"."""
+    return version.rsplit("-", 1)[0]
+
+
+def unscored_version(version: str) -> str:
+    """Version stored for articles the prompt failed to score: "score-v1" -> "score-unscored".
+
+    Their placeholder score stays out of the daily rollups (database/schema.sql)
+    and only that prompt's backfill picks them up.
+    """
+    return f"{prompt_family(version)}-unscored"
+
+
+# Response schemas in the subset of OpenAPI that Gemini accepts
+SENTIMENT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "sentiment_score": {"type": "number"},
+        "summary": {"type": "string"},
+    },
+    "required": ["sentiment_score", "summary"],
+}
+
+SCORE_SCHEMA = {
+    "type": "object",
+    "properties": {"sentiment_score": {"type": "number"}},
+    "required": ["sentiment_score"],
+}
+
+REPAIR_PROMPT = (
+    "Your previous reply could not be used ({error}). Reply again to the request below "
+    "with JSON only, matching: {shape}\n\n{prompt}"
+)
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of `text`."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN if text else 0
+
+
+def truncate_text(title: str, content: str, max_tokens: int) -> str:
+    """Title plus the lead sentences of `content` that fit in `max_tokens`.
+
+    News leads carry most of the sentiment, so whole sentences are kept from
+    the start rather than cutting mid-word at a fixed character count. A
+    first sentence longer than the budget is cut at a word boundary.
+    """
+    budget = max_tokens * CHARS_PER_TOKEN
+    title = _WHITESPACE.sub(" ", title or "").strip()
+    content = _WHITESPACE.sub(" ", content or "").strip()
+
+    # Reddit self posts and our own fallbacks often repeat the title
+    if title and content.startswith(title):
+        content = content[len(title):].lstrip(" .:-")
+
+    text = title[:budget]
+    separator = "\n" if text else ""
+    for sentence in _SENTENCE_END.split(content):
+        if not sentence:
+            continue
+        candidate = f"{text}{separator}{sentence}"
+        if len(candidate) <= budget:
+            text = candidate
+            separator = " "
+            continue
+        if text == title[:budget]:
+            # Not even one sentence fits: keep as many words as possible
+            room = budget - len(text) - 2
+            if room > 20:
+                cut = sentence[:room].rsplit(" ", 1)[0]
+                text = f"{text}{separator}{cut}…"
+        break
+    return text
+
+
+def build_sentiment_prompt(keyword: str, title: str, content: str, max_tokens: int = 300) -> str:
+    """Prompt asking for a score and a short summary as JSON."""
+    text = truncate_text(title, content, max_tokens)
+    return f"{HEADER.format(keyword=keyword)}\n{JSON_REPLY}\n\nText:\n{text}"
+
+
+def build_score_prompt(keyword: str, text: str, max_tokens: int = 100) -> str:
+    """Prompt asking for the score alone (headline scoring)."""
+    header = HEADER.format(keyword=keyword) if keyword else HEADER.replace(' toward "{keyword}"', "")
+    return f"{header}\n{SCORE_REPLY}\n\nText:\n{truncate_text(text, '', max_tokens)}"
+
+
+class ParseError(ValueError):
+    """A model reply that does not match the expected JSON shape."""
+
+
+def _strip_fence(text: str) -> str:
+    """Remove a single surrounding Markdown code fence, if any."""
+    text = text.strip()
+    if text.startswith("```") and text.endswith("```"):
+        text = text[3:-3]
+        if text.startswith("json"):
+            text = text[4:]
+    return text.strip()
+
+
+def parse_sentiment(text: str, require_summary: bool = True) -> Dict[str, Any]:
+    """Strictly validate a sentiment reply.
+
+    The whole reply must be one JSON object (optionally inside a code fence,
+    which only happens without schema-constrained output) with a finite
+    ``sentiment_score`` in [-1, 1] and, if required, a non-empty ``summary``.
+    Nothing is scraped out of free text: "Score for Web3: 0.8" is rejected
+    rather than read as 3.
+
+    Raises:
+        ParseError: If the reply does not match
+    """
+    try:
+        data = json.loads(_strip_fence(text or ""))
+    except json.JSONDecodeError as e:
+        raise ParseError(f"invalid JSON: {e.msg}")
+    if not isinstance(data, dict):
+        raise ParseError("expected a JSON object")
+
+    score = data.get("sentiment_score")
+    if isinstance(score, bool) or not isinstance(score, (int, float)) or not math.isfinite(score):
+        raise ParseError("sentiment_score must be a number")
+    if not -1.0 <= score <= 1.0:
+        raise ParseError("sentiment_score must be between -1.0 and 1.0")
+
+    result = {"sentiment_score": float(score)}
+    if require_summary:
+        summary = data.get("summary")
+        if not isinstance(summary, str) or not summary.strip():
+            raise ParseError("summary must be a non-empty string")
+        result["summary"] = summary.strip()
+    return result
+
+
+def generation_config(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Generation config that constrains the reply to `schema`."""
+    return {"response_mime_type": "application/json", "response_schema": schema, "temperature": 0.0}
+
+
+def _response_text(response: Any) -> str:
+    try:
+        return response.text or ""
+    except Exception:
+        # Blocked or empty candidates raise instead of returning text
+        return ""
+
+
+def generate_structured(model: Any, prompt: str, usage: "UsageTracker", require_summary: bool = True,
+                        structured: bool = True, label: str = None) -> Optional[Dict[str, Any]]:
+    """Ask for a sentiment reply, validate it, and repair it once if needed.
+
+    API errors (quota, network) propagate so callers keep their own retry
+    policy; only malformed replies are handled here.
+
+    Args:
+        model: Gemini GenerativeModel
+        prompt: Prompt from build_sentiment_prompt or build_score_prompt
+        usage: Tracker the calls and parse outcomes are recorded in
+        require_summary: Expect a summary as well as the score
+        structured: Use schema-constrained output
+        label: Tag for the usage records
+
+    Returns:
+        Parsed result, or None if the repair failed too
+    """
+    schema = SENTIMENT_SCHEMA if require_summary else SCORE_SCHEMA
+    kwargs = {"generation_config": generation_config(schema)} if structured else {}
+
+    response = usage.generate(model, prompt, label=label, **kwargs)
+    try:
+        result = parse_sentiment(_response_text(response), require_summary)
+        usage.record_parse(ok=True)
+        return result
+    except ParseError as e:
+        usage.record_parse(ok=False)
+        error = e
+
+    shape = JSON_REPLY if require_summary else SCORE_REPLY
+    repair = REPAIR_PROMPT.format(error=error, shape=shape.split(": ", 1)[1], prompt=prompt)
+    response = usage.generate(model, repair, label=f"{label or 'call'}:repair", **kwargs)
+    try:
+        result = parse_sentiment(_response_text(response), require_summary)
+        usage.record_parse(ok=True, repaired=True)
+        return result
+    except ParseError:
+        usage.record_parse(ok=False, repaired=True)
+        return None
+
+
+def _usage_counts(response: Any) -> Optional[Dict[str, int]]:
+    """Token counts reported by the Gemini SDK, if any."""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return None
+    prompt_tokens = getattr(usage, "prompt_token_count", None)
+    output_tokens = getattr(usage, "candidates_token_count", None)
+    if not isinstance(prompt_tokens, int) or not isinstance(output_tokens, int):
+        return None
+    return {"prompt_tokens": prompt_tokens, "output_tokens": output_tokens}
+
+
+# Calls whose records are kept for latency percentiles; totals cover every call
+RECENT_CALLS = 1000
+CALL_TOTALS = ("calls", "failures", "estimated", "prompt_tokens", "output_tokens", "latency_total")
+
+
+class UsageTracker:
+    """Running token and latency totals plus the records of recent calls.
+
+    Memory stays bounded in long-lived processes (``--stream``, workers)
+    that never reset the tracker.
+    """
+
+    def __init__(self, log_path: str = None):
+        """Initialize the tracker.
+
+        Args:
+            log_path: Optional JSON-lines file every call is appended to
+        """
+        self.log_path = log_path
+        self.records: deque = deque(maxlen=RECENT_CALLS)
+        self.calls = dict.fromkeys(CALL_TOTALS, 0)
+        self.parse = {"failures": 0, "repairs": 0, "repaired": 0, "unrecovered": 0}
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """Forget previous calls, e.g. at the start of a run."""
+        with self._lock:
+            self.records.clear()
+            self.calls = dict.fromkeys(self.calls, 0)
+            self.parse = dict.fromkeys(self.parse, 0)
+
+    def record_parse(self, ok: bool, repaired: bool = False):
+        """Record whether a reply passed validation.
+
+        Args:
+            ok: The reply was valid
+            repaired: The reply answered a repair prompt
+        """
+        with self._lock:
+            if repaired:
+                self.parse["repairs"] += 1
+                self.parse["repaired" if ok else "unrecovered"] += 1
+            elif not ok:
+                self.parse["failures"] += 1
+
+    def record(self, prompt: str, response: Any = None, latency: float = 0.0,
+               ok: bool = True, label: str = None) -> Dict[str, Any]:
+        """Record one model call.
+
+        Args:
+            prompt: Prompt that was sent
+            response: SDK response, used for token counts and output length
+            latency: Seconds the call took
+            ok: Whether the call succeeded
+            label: Free-form tag, e.g. the caller or prompt variant
+        """
+        text = ""
+        if response is not None:
+            try:
+                text = response.text or ""
+            except Exception:
+                text = ""
+        counts = _usage_counts(response)
+        entry = {
+            "time": time.time(),
+            "label": label,
+            "ok": ok,
+            "latency": round(latency, 4),
+            "prompt_chars": len(prompt),
+            "estimated": counts is None,
+            "prompt_tokens": counts["prompt_tokens"] if counts else estimate_tokens(prompt),
+            "output_tokens": counts["output_tokens"] if counts else estimate_tokens(text),
+        }
+        with self._lock:
+            self.records.append(entry)
+            calls = self.calls
+            calls["calls"] += 1
+            calls["failures"] += not ok
+            calls["estimated"] += entry["estimated"]
+            calls["prompt_tokens"] += entry["prompt_tokens"]
+            calls["output_tokens"] += entry["output_tokens"]
+            calls["latency_total"] += entry["latency"]
+            if self.log_path:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry) + "\n")
+        return entry
+
+    def generate(self, model: Any, prompt: str, label: str = None, **kwargs: Any) -> Any:
+        """Call ``model.generate_content(prompt)`` and record it.
+
+        Exceptions are recorded as failed calls and re-raised.
+        """
+        start = time.perf_counter()
+        try:
+            response = model.generate_content(prompt, **kwargs)
+        except Exception:
+            self.record(prompt, latency=time.perf_counter() - start, ok=False, label=label)
+            raise
+        self.record(prompt, response, time.perf_counter() - start, label=label)
+        return response
+
+    def totals(self) -> Dict[str, Any]:
+        """Aggregate usage of every call; latency percentiles cover the recent ones."""
+        with self._lock:
+            latencies = sorted(r["latency"] for r in self.records)
+            calls = dict(self.calls)
+            parse = dict(self.parse)
+        count = calls["calls"]
+        prompt_tokens = calls["prompt_tokens"]
+        output_tokens = calls["output_tokens"]
+        total_latency = calls["latency_total"]
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))] if latencies else 0.0
+
+        return {
+            "calls": count,
+            "failures": calls["failures"],
+            "prompt_tokens": prompt_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": prompt_tokens + output_tokens,
+            "estimated": calls["estimated"] > 0,
+            "avg_prompt_tokens": round(prompt_tokens / count, 1) if count else 0.0,
+            "latency_total": round(total_latency, 3),
+            "latency_p50": percentile(0.5),
+            "latency_p95": percentile(0.95),
+            "tokens_per_second": round((prompt_tokens + output_tokens) / total_latency, 1) if total_latency else 0.0,
+            "parse_failures": parse["failures"],
+            "repairs": parse["repairs"],
+            "repaired": parse["repaired"],
+            # Calls whose reply was thrown away after the repair also failed
+            "wasted_calls": parse["unrecovered"] * 2,
+        }
+
+    def summary(self) -> str:
+        """One-line human readable totals."""
+        t = self.totals()
+        approx = "~" if t["estimated"] else ""
+        return (f"LLM usage: {t['calls']} calls ({t['failures']} failed), "
+                f"{approx}{t['prompt_tokens']} prompt + {approx}{t['output_tokens']} output tokens, "
+                f"p50 {t['latency_p50'] * 1000:.0f} ms, p95 {t['latency_p95'] * 1000:.0f} ms, "
+                f"{t['parse_failures']} bad replies ({t['repaired']} repaired)")
@@ -0,0 +1,314 @@
+"""Deadlines, circuit breakers and hedged requests for source calls.
+
+Extraction calls every source in turn, so one slow or failing source used
+to hold up the whole run. Each call to a source now goes through call():
+
+- A run deadline bounds the time spent fetching. Calls get a timeout no
+  longer than what is left of it, and no call starts once it has passed.
+- A circuit breaker per source opens after consecutive failures. While
+  open, calls to that source are skipped immediately rather than each
+  waiting for its timeout. After a cool-down one trial call is let
+  through, and the breaker closes again if that call succeeds.
+- Optionally, a source's call is hedged. If no reply has arrived by the
+  source's recent p95 latency, the same call is sent again and the first
+  reply wins. Only use this for idempotent GETs against sources without a
+  strict request quota.
+
+Each source keeps metrics: calls, failures, skips, hedges and latency
+percentiles. They are served by /api/metrics and printed after runs.
+
+    with resilience.deadline(300):
+        response = resilience.call("news", requests.get, url, params=params, timeout=10)
+
+Breakers and metrics are per process and persist across runs, so a
+scheduler keeps skipping a dead source between its runs. The deadline
+lives in a context variable, like etl.tracing.
+"""
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+# Latencies kept per source for percentiles and the hedge delay
+LATENCY_WINDOW = 200
+# Replies needed before the hedge delay follows the source's own p95
+MIN_HEDGE_SAMPLES = 10
+
+_deadline: ContextVar[Optional[float]] = ContextVar("etl_deadline", default=None)
+
+
+class SourceUnavailable(Exception):
+    """A call was not made: its source's circuit is open or the run is out of time."""
+
+
+class CircuitOpen(SourceUnavailable):
+    pass
+
+
+class DeadlineExceeded(SourceUnavailable):
+    pass
+
+
+@contextmanager
+def deadline(seconds: Optional[float], clock=time.monotonic) -> Iterator[None]:
+    """Give source calls inside the block `seconds` in total (None or 0: no limit)."""
+    token = _deadline.set(clock() + seconds if seconds else None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining(clock=time.monotonic) -> Optional[float]:
+    """Seconds left before the active deadline, or None without one."""
+    end = _deadline.get()
+    return None if end is None else end - clock()
+
+
+class CircuitBreaker:
+    """Closed -> open after `threshold` consecutive failures -> half-open after `reset_timeout`."""
+
+    def __init__(self, threshold: int = 3, reset_timeout: float = 300.0, clock=time.monotonic):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if self.clock() - self.opened_at >= self.reset_timeout else "open"
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; in half-open state only one at a time."""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            # A failed trial call re-opens the circuit for another cool-down
+            if self._trial or self.failures >= self.threshold:
+                self.opened_at = self.clock()
+            self._trial = False
+
+
+class SourceMetrics:
+    """Counters and recent latencies of one source."""
+
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.skipped = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            ordered = sorted(self.latencies)
+        if not ordered:
+            return None
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        def rounded(value):
+            return round(value, 3) if value is not None else None
+
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "p50": rounded(self.percentile(0.5)),
+            "p95": rounded(self.percentile(0.95)),
+            "p99": rounded(self.percentile(0.99)),
+        }
+
+
+class Resilience:
+    """Breakers, hedging and metrics for a set of sources."""
+
+    def __init__(self, threshold: int = 3, reset_timeout: float = 300.0, hedged: Iterable[str] = (),
+                 hedge_delay: float = 2.0, clock=time.monotonic):
+        """Initialize without any source state; sources appear on first use.
+
+        Args:
+            threshold: Consecutive failures that open a source's circuit
+            reset_timeout: Seconds an open circuit waits before a trial call
+            hedged: Sources whose calls are hedged
+            hedge_delay: Seconds before hedging while a source has too few
+                recorded latencies for its own p95
+            clock: Monotonic clock in seconds (injectable for tests)
+        """
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.hedged = set(hedged)
+        self.hedge_delay = hedge_delay
+        self.clock = clock
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.sources: Dict[str, SourceMetrics] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def configure(self, threshold: int = None, reset_timeout: float = None, hedged: Iterable[str] = None,
+                  hedge_delay: float = None):
+        """Change settings; existing breakers pick up the new thresholds."""
+        with self._lock:
+            if threshold is not None:
+                self.threshold = threshold
+            if reset_timeout is not None:
+                self.reset_timeout = reset_timeout
+            if hedged is not None:
+                self.hedged = set(hedged)
+            if hedge_delay is not None:
+                self.hedge_delay = hedge_delay
+            for breaker in self.breakers.values():
+                breaker.threshold, breaker.reset_timeout = self.threshold, self.reset_timeout
+
+    def reset(self):
+        """Close all circuits and forget all metrics."""
+        with self._lock:
+            self.breakers.clear()
+            self.sources.clear()
+
+    def _source(self, source: str):
+        with self._lock:
+            if source not in self.breakers:
+                self.breakers[source] = CircuitBreaker(self.threshold, self.reset_timeout, self.clock)
+                self.sources[source] = SourceMetrics()
+            return self.breakers[source], self.sources[source]
+
+    def _hedge_after(self, metrics: SourceMetrics) -> float:
+        if len(metrics.latencies) < MIN_HEDGE_SAMPLES:
+            return self.hedge_delay
+        return metrics.percentile(0.95)
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hedge")
+            return self._executor
+
+    def call(self, source: str, fn: Callable[..., Any], *args, timeout: Optional[float] = None,
+             hedge: Optional[bool] = None, **kwargs) -> Any:
+        """Call fn(*args, **kwargs) for `source` under its breaker and the run deadline.
+
+        Args:
+            source: Name of the source ("news", "hackernews", "reddit", ...)
+            fn: The call; any exception it raises counts as a failure
+            timeout: Passed on as fn's `timeout`, cut to the time left
+            hedge: Hedge this call (default: if the source is configured for it)
+
+        Raises:
+            CircuitOpen: The source is failing; nothing was sent
+            DeadlineExceeded: The run is out of time; nothing was sent
+        """
+        breaker, metrics = self._source(source)
+        left = remaining(self.clock)
+        if left is not None and left <= 0:
+            metrics.skipped += 1
+            raise DeadlineExceeded(f"{source}: run deadline passed")
+        if not breaker.allow():
+            metrics.skipped += 1
+            raise CircuitOpen(f"{source}: circuit open after {breaker.failures} failures")
+        if timeout is not None:
+            kwargs["timeout"] = min(timeout, left) if left is not None else timeout
+
+        metrics.calls += 1
+        start = self.clock()
+        try:
+            if hedge if hedge is not None else source in self.hedged:
+                result = self._hedged(metrics, fn, args, kwargs)
+            else:
+                result = fn(*args, **kwargs)
+        except Exception:
+            metrics.failures += 1
+            breaker.record_failure()
+            raise
+        with metrics._lock:
+            metrics.latencies.append(self.clock() - start)
+        breaker.record_success()
+        return result
+
+    def _hedged(self, metrics: SourceMetrics, fn: Callable[..., Any], args, kwargs) -> Any:
+        """First successful reply of the call and, if it is slow, a duplicate."""
+        pool = self._pool()
+        # Each attempt sees the caller's trace and deadline
+        first = pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+        done, _ = wait([first], timeout=self._hedge_after(metrics))
+        if done:
+            return first.result()
+
+        metrics.hedged += 1
+        second = pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+        pending = {first, second}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is second:
+                        metrics.hedge_wins += 1
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def metrics(self) -> Dict[str, Any]:
+        """Per source: breaker state and call metrics."""
+        with self._lock:
+            sources = list(self.sources.items())
+        return {
+            name: dict(metrics.to_dict(), state=self.breakers[name].state)
+            for name, metrics in sorted(sources)
+        }
+
+    def summary(self) -> str:
+        """One line per source with state, failures and latency."""
+        lines = []
+        for name, data in self.metrics().items():
+            p95 = f"{data['p95']:.2f}s" if data["p95"] is not None else "-"
+            lines.append(f"{name}: {data['state']}, {data['calls']} calls, {data['failures']} failed, "
+                         f"{data['skipped']} skipped, {data['hedged']} hedged, p95 {p95}")
+        return "\n".join(lines)
+
+
+# Shared by all extractors of this process
+sources = Resilience()
+
+
+def configure(config):
+    """Apply the CIRCUIT_* and HEDGE* settings of a Config class to `sources`."""
+    sources.configure(
+        threshold=config.CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout=config.CIRCUIT_RESET_TIMEOUT,
+        hedged=config.HEDGED_SOURCES,
+        hedge_delay=config.HEDGE_DELAY,
+    )
+
+
+def call(source: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Resilience.call() on the process-wide `sources`."""
+    return sources.call(source, fn, *args, **kwargs)
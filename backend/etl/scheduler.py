@@ -0,0 +1,312 @@
+"""Adaptive per-keyword refresh scheduler.
+
+Each keyword is refreshed on its own timer. The timer is derived from how
+fast new articles arrive for that keyword (tracked per source), clamped to
+``[min_interval, max_interval]``, stretched when the total demand would
+exceed the hourly fetch budget, and jittered so keywords do not fire in
+lock-step. Hot keywords are therefore refreshed often while quiet ones
+stop spending fetch and LLM quota.
+
+Run as a daemon with ``python -m etl.scheduler`` from the ``backend``
+directory, or start it in-process with ``RefreshScheduler().start()``.
+"""
+import argparse
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from config import Config
+from database.db import Database
+
+# Weight of the latest observation in the arrival-rate moving average
+RATE_SMOOTHING = 0.5
+
+
+@dataclass
+class KeywordState:
+    """Refresh bookkeeping for a single keyword."""
+
+    keyword: str
+    next_run: float
+    interval: float
+    last_run: Optional[float] = None
+    # Smoothed new-item arrival rate per source, in items per hour
+    rates: Dict[str, float] = field(default_factory=dict)
+    runs: int = 0
+
+    @property
+    def velocity(self) -> float:
+        """Total arrival rate across all sources (items per hour)."""
+        return sum(self.rates.values())
+
+
+class RefreshScheduler:
+    """Schedule keyword refreshes based on story velocity."""
+
+    def __init__(
+        self,
+        keywords: List[str] = None,
+        fetch_fn: Callable[[List[str]], List[Dict]] = None,
+        min_interval: float = None,
+        max_interval: float = None,
+        hourly_budget: int = None,
+        target_items: float = None,
+        jitter: float = None,
+        clock: Callable[[], float] = time.time,
+        rng: random.Random = None,
+    ):
+        """Initialize the scheduler.
+
+        Args:
+            keywords: Keywords to refresh. Defaults to Config.KEYWORDS.
+            fetch_fn: Callable that refreshes a list of keywords and returns
+                the newly stored articles. Defaults to fetch_all_trends_data.
+            min_interval: Shortest allowed refresh interval in seconds.
+            max_interval: Longest allowed refresh interval in seconds.
+            hourly_budget: Maximum keyword refreshes per hour, all keywords.
+            target_items: New items we aim to collect per refresh.
+            jitter: Random +/- fraction applied to every interval.
+            clock: Time source, injectable for tests.
+            rng: Random generator, injectable for tests.
+        """
+        self.keywords = list(keywords or Config.KEYWORDS)
+        self.fetch_fn = fetch_fn
+        self.min_interval = float(Config.SCHEDULER_MIN_INTERVAL if min_interval is None else min_interval)
+        self.max_interval = float(Config.SCHEDULER_MAX_INTERVAL if max_interval is None else max_interval)
+        self.hourly_budget = Config.SCHEDULER_HOURLY_BUDGET if hourly_budget is None else hourly_budget
+        self.target_items = Config.SCHEDULER_TARGET_ITEMS if target_items is None else target_items
+        self.jitter = Config.SCHEDULER_JITTER if jitter is None else jitter
+        self.clock = clock
+        self.rng = rng or random.Random()
+
+        # Token bucket holding the remaining fetch budget
+        self._tokens = float(self.hourly_budget)
+        self._tokens_updated = self.clock()
+
+        # Retention job (archive + incremental vacuum) piggybacks on the loop
+        self.maintenance_interval = Config.RETENTION_INTERVAL
+        self._next_maintenance = self.clock() + self.maintenance_interval
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        now = self.clock()
+        self.states: Dict[str, KeywordState] = {
+            # Stagger the first round so keywords do not all fire at once
+            keyword: KeywordState(
+                keyword=keyword,
+                next_run=now + self.rng.uniform(0, self.min_interval * self.jitter),
+                interval=self.min_interval,
+            )
+            for keyword in self.keywords
+        }
+
+    def seed_from_database(self, db: Database = None, hours: int = 24):
+        """Warm the arrival rates from articles already stored in the database."""
+        db = db or Database()
+        for row in db.get_arrival_counts(hours=hours):
+            state = self.states.get(row["keyword"])
+            if state:
+                state.rates[row["source"]] = row["items"] / float(hours)
+        with self._lock:
+            for state in self.states.values():
+                state.interval = self._compute_interval(state)
+
+    def _compute_interval(self, state: KeywordState) -> float:
+        """Time needed to accumulate `target_items` at the observed velocity."""
+        if state.velocity <= 0:
+            return self.max_interval
+        interval = self.target_items / state.velocity * 3600
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def _budget_factor(self) -> float:
+        """Stretch factor that keeps the total refresh rate within budget."""
+        demand = sum(3600 / state.interval for state in self.states.values())
+        if demand <= self.hourly_budget:
+            return 1.0
+        if self.hourly_budget <= 0:
+            return float("inf")
+        return demand / self.hourly_budget
+
+    def _refill_tokens(self, now: float):
+        elapsed = max(0.0, now - self._tokens_updated)
+        self._tokens = min(
+            float(self.hourly_budget),
+            self._tokens + elapsed * self.hourly_budget / 3600,
+        )
+        self._tokens_updated = now
+
+    def record_fetch(self, keyword: str, new_items: Dict[str, int], now: float = None):
+        """Record the outcome of a refresh and schedule the keyword's next run.
+
+        Args:
+            keyword: Keyword that was refreshed
+            new_items: Count of new articles per source
+            now: Completion time. Defaults to the scheduler clock.
+        """
+        now = self.clock() if now is None else now
+        with self._lock:
+            state = self.states.setdefault(
+                keyword, KeywordState(keyword=keyword, next_run=now, interval=self.min_interval)
+            )
+            if state.last_run is not None:
+                hours = max(now - state.last_run, 1.0) / 3600
+                for source in set(state.rates) | set(new_items):
+                    observed = new_items.get(source, 0) / hours
+                    previous = state.rates.get(source, observed)
+                    state.rates[source] = (
+                        RATE_SMOOTHING * observed + (1 - RATE_SMOOTHING) * previous
+                    )
+            state.last_run = now
+            state.runs += 1
+
+            state.interval = self._compute_interval(state)
+            delay = state.interval * self._budget_factor()
+            delay *= 1 + self.rng.uniform(-self.jitter, self.jitter)
+            state.next_run = now + min(self.max_interval, delay)
+
+    def due_keywords(self, now: float = None) -> List[str]:
+        """Keywords whose refresh is due, hottest first."""
+        now = self.clock() if now is None else now
+        with self._lock:
+            due = [state for state in self.states.values() if state.next_run <= now]
+        due.sort(key=lambda state: (-state.velocity, state.next_run))
+        return [state.keyword for state in due]
+
+    def _fetch(self, keyword: str) -> Dict[str, int]:
+        fetch_fn = self.fetch_fn
+        if fetch_fn is None:
+            from etl.data_fetcher import fetch_all_trends_data
+            fetch_fn = fetch_all_trends_data
+        articles = fetch_fn([keyword]) or []
+        return dict(Counter(a["source"] for a in articles if a.get("source")))
+
+    def run_pending(self) -> List[str]:
+        """Refresh every due keyword the remaining budget allows.
+
+        Returns:
+            Keywords that were refreshed
+        """
+        refreshed = []
+        for keyword in self.due_keywords():
+            with self._lock:
+                self._refill_tokens(self.clock())
+                if self._tokens < 1:
+                    break
+                self._tokens -= 1
+
+            try:
+                new_items = self._fetch(keyword)
+            except Exception as e:
+                print(f"Scheduler refresh failed for {keyword}: {e}")
+                new_items = {}
+            self.record_fetch(keyword, new_items)
+            refreshed.append(keyword)
+        return refreshed
+
+    def seconds_until_next(self) -> float:
+        """Seconds until the earliest scheduled refresh."""
+        with self._lock:
+            next_run = min((s.next_run for s in self.states.values()), default=None)
+        if next_run is None:
+            return self.max_interval
+        return max(0.0, next_run - self.clock())
+
+    def snapshot(self) -> List[Dict]:
+        """Current schedule, for logging and diagnostics."""
+        with self._lock:
+            return [
+                {
+                    "keyword": s.keyword,
+                    "next_run": s.next_run,
+                    "interval": round(s.interval, 1),
+                    "velocity": round(s.velocity, 3),
+                    "rates": {k: round(v, 3) for k, v in s.rates.items()},
+                    "runs": s.runs,
+                }
+                for s in self.states.values()
+            ]
+
+    def run_maintenance(self, force: bool = False):
+        """Run the retention job when its interval has elapsed."""
+        if not force and (self.maintenance_interval <= 0 or self.clock() < self._next_maintenance):
+            return
+        self._next_maintenance = self.clock() + self.maintenance_interval
+        try:
+            from database.retention import RetentionManager
+            stats = RetentionManager().run()
+            print(f"🧊 Retention: archived {stats['archived']} articles")
+        except Exception as e:
+            print(f"Retention run failed: {e}")
+
+    def run_forever(self, poll_interval: float = 30.0):
+        """Block, refreshing keywords as they come due, until stop() is called."""
+        while not self._stop.is_set():
+            refreshed = self.run_pending()
+            if refreshed:
+                print(f"🔁 Refreshed: {', '.join(refreshed)}")
+            self.run_maintenance()
+            self._stop.wait(min(poll_interval, max(1.0, self.seconds_until_next())))
+
+    def start(self) -> threading.Thread:
+        """Run the scheduler in a background daemon thread."""
+        if self._thread and self._thread.is_alive():
+            return self._thread
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self.run_forever, name="refresh-scheduler", daemon=True
+        )
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: float = None):
+        """Signal the background thread to exit and wait for it."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+
+def main():
+    """Daemon entry point for the refresh scheduler."""
+    parser = argparse.ArgumentParser(description="Adaptive keyword refresh scheduler")
+    parser.add_argument(
+        "--keywords",
+        type=str,
+        help="Comma-separated list of keywords to schedule"
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Refresh every keyword once and exit"
+    )
+
+    args = parser.parse_args()
+
+    keywords = None
+    if args.keywords:
+        keywords = [k.strip() for k in args.keywords.split(",")]
+
+    Database().create_tables()
+    scheduler = RefreshScheduler(keywords=keywords)
+    scheduler.seed_from_database()
+
+    if args.once:
+        for state in scheduler.states.values():
+            state.next_run = 0
+        scheduler.hourly_budget = max(scheduler.hourly_budget, len(scheduler.states))
+        scheduler._tokens = float(scheduler.hourly_budget)
+        scheduler.run_pending()
+        return
+
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        scheduler.stop()
+
+
+if __name__ == "__main__":
+    main()
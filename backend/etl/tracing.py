@@ -0,0 +1,303 @@
+"""Structured per-run traces of ETL runs.
+
+A RunTrace records, for one run, the wall time of each stage and keyword
+and how much of it was spent blocked in rate-limit sleeps, in network
+requests, in LLM calls and in SQLite. Whatever is left is "other" (parsing,
+tagging, Python overhead). Counters hold items processed, retries and
+errors, so runs can be compared by throughput as well as duration.
+
+The active trace lives in a context variable. Instrumented code calls the
+module-level helpers, which do nothing when no trace is active:
+
+    trace = RunTrace("etl", keywords)
+    with trace:
+        with trace.stage("extract"):
+            with keyword("AI"), span("network"):
+                requests.get(...)
+    trace.save(db)
+
+Traces are stored in the ``etl_runs`` table, served by /api/etl/runs and
+compared from the ``backend`` directory with:
+
+    python -m etl.tracing list
+    python -m etl.tracing show <run_id>
+    python -m etl.tracing diff <run_a> <run_b>
+"""
+import argparse
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+# Where blocked time goes; the rest of a stage's wall time is "other"
+CATEGORIES = ("sleep", "network", "llm", "sqlite")
+
+_current: ContextVar[Optional["RunTrace"]] = ContextVar("etl_trace", default=None)
+_keyword: ContextVar[Optional[str]] = ContextVar("etl_trace_keyword", default=None)
+
+
+def _bucket() -> Dict[str, float]:
+    return dict.fromkeys(("wall",) + CATEGORIES, 0.0)
+
+
+class RunTrace:
+    """Timings and counters of one ETL run."""
+
+    def __init__(self, pipeline: str, keywords: List[str] = None, run_id: str = None, clock=time.perf_counter):
+        """Initialize an empty trace.
+
+        Args:
+            pipeline: Which entry point ran ("etl", "fetch", ...)
+            keywords: Keywords of the run
+            run_id: Identifier. Generated if not provided.
+            clock: Monotonic clock in seconds (injectable for tests)
+        """
+        self.run_id = run_id or time.strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+        self.pipeline = pipeline
+        self.keywords = list(keywords or [])
+        self.clock = clock
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.duration = 0.0
+        self.status = "running"
+        self.error: Optional[str] = None
+        self.totals = dict.fromkeys(CATEGORIES, 0.0)
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.by_keyword: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, int] = {}
+        self._stage: Optional[str] = None
+        self._start = 0.0
+        self._token = None
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "RunTrace":
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self._start = self.clock()
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.finish(error=f"{exc_type.__name__}: {exc}" if exc_type else None)
+        _current.reset(self._token)
+        return False
+
+    def finish(self, error: str = None):
+        """Stop the clock and set the final status."""
+        self.duration = self.clock() - self._start
+        self.finished_at = datetime.now().isoformat(timespec="seconds")
+        self.status = "failed" if error else "ok"
+        self.error = error
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Attribute the time inside the block to stage `name`."""
+        previous, self._stage = self._stage, name
+        start = self.clock()
+        try:
+            yield
+        finally:
+            elapsed = self.clock() - start
+            with self._lock:
+                self.stages.setdefault(name, _bucket())["wall"] += elapsed
+            self._stage = previous
+
+    def add(self, category: str, seconds: float):
+        """Record `seconds` spent in `category` in the current stage and keyword."""
+        keyword = _keyword.get()
+        with self._lock:
+            self.totals[category] += seconds
+            if self._stage:
+                self.stages.setdefault(self._stage, _bucket())[category] += seconds
+            if keyword:
+                self.by_keyword.setdefault(keyword, _bucket())[category] += seconds
+
+    def add_keyword_time(self, keyword: str, seconds: float):
+        """Record wall time spent on `keyword`."""
+        with self._lock:
+            self.by_keyword.setdefault(keyword, _bucket())["wall"] += seconds
+
+    def count(self, name: str, n: int = 1):
+        """Increase counter `name` for the run and the current keyword."""
+        keyword = _keyword.get()
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+            if keyword:
+                bucket = self.by_keyword.setdefault(keyword, _bucket())
+                bucket[name] = bucket.get(name, 0) + n
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The trace as plain data, with "other" time and throughput filled in."""
+        duration = self.duration or (self.clock() - self._start if self._start else 0.0)
+
+        def with_other(bucket: Dict[str, float]) -> Dict[str, float]:
+            row = {key: round(value, 3) for key, value in bucket.items()}
+            row["other"] = round(max(bucket["wall"] - sum(bucket[c] for c in CATEGORIES), 0.0), 3)
+            return row
+
+        totals = {c: round(v, 3) for c, v in self.totals.items()}
+        totals["other"] = round(max(duration - sum(self.totals.values()), 0.0), 3)
+        items = self.counters.get("items", 0)
+        return {
+            "run_id": self.run_id,
+            "pipeline": self.pipeline,
+            "keywords": self.keywords,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "status": self.status,
+            "error": self.error,
+            "duration": round(duration, 3),
+            "items": items,
+            "items_per_second": round(items / duration, 4) if duration else 0.0,
+            "totals": totals,
+            "stages": {name: with_other(bucket) for name, bucket in self.stages.items()},
+            "per_keyword": {name: with_other(bucket) for name, bucket in self.by_keyword.items()},
+            "counters": dict(self.counters),
+        }
+
+    def summary(self) -> str:
+        """One line with duration, throughput and the blocked-time split."""
+        data = self.to_dict()
+        split = ", ".join(f"{name} {seconds:.1f}s" for name, seconds in data["totals"].items())
+        return (f"Run {self.run_id}: {data['duration']:.1f}s, {data['items']} items "
+                f"({data['items_per_second']:.2f}/s) | {split}")
+
+    def save(self, db) -> bool:
+        """Store the trace with db.save_etl_run(). Failures are reported, not raised."""
+        try:
+            db.save_etl_run(self.to_dict())
+            return True
+        except Exception as e:
+            print(f"Could not save run trace {self.run_id}: {e}")
+            return False
+
+
+def current() -> Optional[RunTrace]:
+    """The active trace, if any."""
+    return _current.get()
+
+
+@contextmanager
+def span(category: str) -> Iterator[None]:
+    """Count the time inside the block as `category` (see CATEGORIES)."""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    start = trace.clock()
+    try:
+        yield
+    finally:
+        trace.add(category, trace.clock() - start)
+
+
+@contextmanager
+def keyword(name: str) -> Iterator[None]:
+    """Attribute time and counters inside the block to keyword `name`."""
+    trace = _current.get()
+    if trace is None or not name:
+        yield
+        return
+    token = _keyword.set(name)
+    start = trace.clock()
+    try:
+        yield
+    finally:
+        _keyword.reset(token)
+        trace.add_keyword_time(name, trace.clock() - start)
+
+
+def count(name: str, n: int = 1):
+    """Increase a counter of the active trace, if any."""
+    trace = _current.get()
+    if trace is not None:
+        trace.count(name, n)
+
+
+def sleep(seconds: float):
+    """time.sleep() recorded as rate-limit wait."""
+    with span("sleep"):
+        time.sleep(seconds)
+
+
+def diff_runs(a: Dict[str, Any], b: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Metric-by-metric comparison of two stored traces.
+
+    Returns:
+        Rows with metric, a, b, delta and change (relative to a, or None)
+    """
+    def metrics(trace: Dict[str, Any]) -> Dict[str, float]:
+        values = {"duration": trace["duration"], "items": trace["items"],
+                  "items_per_second": trace["items_per_second"]}
+        values.update({f"time.{name}": seconds for name, seconds in trace["totals"].items()})
+        for name, bucket in trace["stages"].items():
+            values.update({f"stage.{name}.{key}": value for key, value in bucket.items()})
+        for name, bucket in trace["per_keyword"].items():
+            values[f"keyword.{name}.wall"] = bucket["wall"]
+        values.update({f"count.{name}": value for name, value in trace["counters"].items()})
+        return values
+
+    left, right = metrics(a), metrics(b)
+    rows = []
+    for metric in list(left) + [m for m in right if m not in left]:
+        x, y = left.get(metric, 0), right.get(metric, 0)
+        rows.append({
+            "metric": metric,
+            "a": x,
+            "b": y,
+            "delta": round(y - x, 4),
+            "change": round((y - x) / x, 4) if x else None
+        })
+    return rows
+
+
+def print_diff(a: Dict[str, Any], b: Dict[str, Any]):
+    print(f"A: {a['run_id']} ({a['pipeline']}, {a['started_at']})")
+    print(f"B: {b['run_id']} ({b['pipeline']}, {b['started_at']})")
+    print(f"{'metric':<36} {'A':>10} {'B':>10} {'delta':>10} {'change':>8}")
+    for row in diff_runs(a, b):
+        change = f"{row['change']:+.0%}" if row["change"] is not None else "-"
+        print(f"{row['metric']:<36} {row['a']:>10.3f} {row['b']:>10.3f} {row['delta']:>+10.3f} {change:>8}")
+
+
+def main():
+    """List, show or diff stored run traces."""
+    import json
+    from database.db import Database
+
+    parser = argparse.ArgumentParser(description="ETL run traces")
+    commands = parser.add_subparsers(dest="command", required=True)
+    list_parser = commands.add_parser("list", help="Recent runs")
+    list_parser.add_argument("--limit", type=int, default=20)
+    commands.add_parser("show", help="Full trace of one run").add_argument("run_id")
+    diff_parser = commands.add_parser("diff", help="Compare two runs")
+    diff_parser.add_argument("run_a")
+    diff_parser.add_argument("run_b")
+    args = parser.parse_args()
+
+    db = Database()
+    db.create_tables()
+    if args.command == "list":
+        for run in db.get_etl_runs(limit=args.limit):
+            print(f"{run['run_id']}  {run['pipeline']:<8} {run['started_at']}  {run['status']:<7} "
+                  f"{run['duration']:>8.1f}s  {run['items']:>5} items")
+        return
+
+    if args.command == "show":
+        run = db.get_etl_run(args.run_id)
+        if not run:
+            raise SystemExit(f"Unknown run: {args.run_id}")
+        print(json.dumps(run, indent=2))
+        return
+
+    a, b = db.get_etl_run(args.run_a), db.get_etl_run(args.run_b)
+    for run_id, run in ((args.run_a, a), (args.run_b, b)):
+        if not run:
+            raise SystemExit(f"Unknown run: {run_id}")
+    print_diff(a, b)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,4 @@
 """AI transformation using Google Gemini API."""
-import json
-import time
 from typing import Dict, Any, Optional
 import google.generativeai as genai
 import os
@@ -12,45 +10,42 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 from backend.config import Config
+from backend.etl import tracing
+from backend.etl.prompts import SENTIMENT_PROMPT_VERSION, UsageTracker, build_sentiment_prompt, generate_structured
 
 
 class SentimentTransformer:
     """Transform text data using Gemini API for sentiment analysis."""
     
-    def __init__(self):
-        """Initialize Gemini API client."""
+    def __init__(self, max_prompt_tokens: int = None, usage: UsageTracker = None):
+        """Initialize Gemini API client.
+        
+        Args:
+            max_prompt_tokens: Token budget for the article text in each prompt.
+                Defaults to Config.LLM_PROMPT_MAX_TOKENS.
+            usage: Tracker for token counts and latency. A new one is created
+                if not provided; read per-run totals with usage.totals().
+        """
+        self.max_prompt_tokens = max_prompt_tokens or Config.LLM_PROMPT_MAX_TOKENS
+        self.usage = usage or UsageTracker(log_path=Config.LLM_USAGE_LOG or None)
         if Config.GEMINI_API_KEY:
             genai.configure(api_key=Config.GEMINI_API_KEY)
-            self.model = genai.GenerativeModel('gemini-pro')
+            self.model = genai.GenerativeModel(Config.GEMINI_MODEL)
         else:
             self.model = None
     
-    def _create_prompt(self, keyword: str, content: str) -> str:
+    def _create_prompt(self, keyword: str, content: str, title: str = "") -> str:
         """Create prompt for sentiment analysis.
         
         Args:
             keyword: Technology keyword
             content: Text content to analyze
+            title: Article/post title, always kept in full
             
         Returns:
             Formatted prompt string
         """
-        prompt = f"""Analyze the following text about {keyword} and provide a sentiment analysis.
-
-Text: {content[:2000]}
-
-Please provide your analysis in JSON format with the following structure:
-{{
-    "sentiment_score": <float between -1.0 (very negative) and +1.0 (very positive)>,
-    "summary": "<2-3 sentence summary of the text and its sentiment>"
-}}
-
-Important:
-- sentiment_score must be a float between -1.0 and 1.0
-- summary should be 2-3 sentences
-- Respond ONLY with valid JSON, no additional text"""
-        
-        return prompt
+        return build_sentiment_prompt(keyword, title, content, max_tokens=self.max_prompt_tokens)
     
     def analyze_sentiment(self, keyword: str, title: str, content: str) -> Optional[Dict[str, Any]]:
         """Analyze sentiment of text using Gemini API.
@@ -61,48 +56,28 @@ Important:
             content: Article/post content
             
         Returns:
-            Dictionary with sentiment_score and summary, or None if error
+            Dictionary with sentiment_score, summary, model and
+            prompt_version, or None if error
         """
         if not self.model:
             return None
         
-        # Combine title and content for analysis
-        full_text = f"{title}\n\n{content}"
-        
         try:
-            prompt = self._create_prompt(keyword, full_text)
-            response = self.model.generate_content(prompt)
-            
-            # Extract JSON from response
-            response_text = response.text.strip()
-            
-            # Try to find JSON in the response
-            if "```json" in response_text:
-                response_text = response_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in response_text:
-                response_text = response_text.split("```")[1].split("```")[0].strip()
-            
-            # Parse JSON
-            result = json.loads(response_text)
-            
-            # Validate sentiment score
-            sentiment_score = float(result.get("sentiment_score", 0.0))
-            if sentiment_score < -1.0:
-                sentiment_score = -1.0
-            elif sentiment_score > 1.0:
-                sentiment_score = 1.0
-            
-            return {
-                "sentiment_score": sentiment_score,
-                "summary": result.get("summary", "No summary available.")
-            }
+            prompt = self._create_prompt(keyword, content, title=title)
+            with tracing.span("llm"):
+                result = generate_structured(
+                    self.model, prompt, self.usage,
+                    structured=Config.LLM_STRUCTURED_OUTPUT, label="transform"
+                )
+            if result is None:
+                print(f"Unusable model reply after repair for: {title[:60]}")
+                return None
+            result.update(model=Config.GEMINI_MODEL, prompt_version=SENTIMENT_PROMPT_VERSION)
+            return result
         
-        except json.JSONDecodeError as e:
-            print(f"JSON decode error: {e}")
-            print(f"Response text: {response_text if 'response_text' in locals() else 'N/A'}")
-            return None
         except Exception as e:
             print(f"Error in sentiment analysis: {e}")
+            tracing.count("errors")
             return None
     
     def transform_batch(self, data: list) -> list:
@@ -115,22 +90,33 @@ Important:
             List of transformed data with sentiment analysis
         """
         transformed = []
+        # Articles matching several keywords are scored once and shared
+        scored_by_url = {}
         
         for record in data:
-            result = self.analyze_sentiment(
-                keyword=record.get("keyword", ""),
-                title=record.get("title", ""),
-                content=record.get("content", "")
-            )
-            
-            if result:
-                record.update(result)
+            url = record.get("url")
+            if url and url in scored_by_url:
+                record.update(scored_by_url[url])
                 transformed.append(record)
-            else:
-                print(f"Failed to analyze sentiment for: {record.get('title', 'Unknown')}")
+                continue
             
-            # Rate limiting
-            time.sleep(1)
+            with tracing.keyword(record.get("keyword")):
+                result = self.analyze_sentiment(
+                    keyword=record.get("keyword", ""),
+                    title=record.get("title", ""),
+                    content=record.get("content", "")
+                )
+                
+                if result:
+                    record.update(result)
+                    transformed.append(record)
+                    if url:
+                        scored_by_url[url] = result
+                else:
+                    print(f"Failed to analyze sentiment for: {record.get('title', 'Unknown')}")
+                
+                # Rate limiting
+                tracing.sleep(1)
         
         return transformed
 
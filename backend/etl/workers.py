@@ -0,0 +1,396 @@
+"""Sharded ETL across several worker processes.
+
+A run is a set of work items (one per keyword) in the ``etl_leases``
+table. Each worker process repeatedly claims one pending item with a
+single UPDATE, keeps its lease alive with a heartbeat thread while it
+extracts, scores and loads that keyword, and marks it done. If a worker
+dies, its lease expires and another worker picks the item up again, up to
+``max_attempts`` times.
+
+Start a run with four local workers (from the ``backend`` directory):
+
+    python -m etl.workers --workers 4
+
+Add workers on another machine that shares the database file:
+
+    python -m etl.workers --join <run_id> --workers 2
+
+Watch progress of a run:
+
+    python -m etl.workers --status <run_id>
+
+Workers use SQLite's WAL journal so readers and the API are not blocked
+while they write. WAL (and SQLite locking in general) needs a local or
+properly locking file system; for several hosts, use a shared disk that
+supports POSIX locks rather than a plain network share.
+"""
+import argparse
+import multiprocessing
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.api.dashboard import refresh_snapshot
+from backend.config import Config
+from backend.database.db import Database
+
+
+class LeaseQueue:
+    """Work items of one run, handed out through expiring leases."""
+
+    def __init__(self, db: Database, run_id: str, lease_ttl: float = None, max_attempts: int = None,
+                 clock: Callable[[], float] = time.time):
+        """Initialize the queue.
+
+        Args:
+            db: Database holding the etl_leases table
+            run_id: Run the items belong to
+            lease_ttl: Seconds a lease stays valid without a heartbeat
+            max_attempts: Claims per item before it is marked failed
+            clock: Time source, injectable for tests
+        """
+        self.db = db
+        self.run_id = run_id
+        self.lease_ttl = lease_ttl or Config.ETL_LEASE_TTL
+        self.max_attempts = max_attempts or Config.ETL_MAX_ATTEMPTS
+        self.clock = clock
+
+    def enqueue(self, items: List[str]) -> int:
+        """Add items to the run; items already present are left alone.
+
+        Returns:
+            Number of new items
+        """
+        with self.db.get_connection() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO etl_leases (run_id, item) VALUES (?, ?)",
+                [(self.run_id, item) for item in items]
+            )
+            return conn.total_changes - before
+
+    def claim(self, owner: str) -> Optional[Dict[str, Any]]:
+        """Lease the next pending or expired item to `owner`.
+
+        The pick and the update are one statement, so two workers can never
+        hold the same item.
+
+        Returns:
+            Dict with item and token, or None when nothing is claimable
+        """
+        now = self.clock()
+        token = uuid.uuid4().hex
+        with self.db.get_connection() as conn:
+            # Items that ran out of attempts are failed instead of retried forever
+            conn.execute(
+                """
+                UPDATE etl_leases SET status = 'failed', owner = NULL, token = NULL,
+                       finished_at = ?, error = COALESCE(error, 'lease expired too often')
+                WHERE run_id = ? AND status = 'leased' AND lease_expires < ? AND attempts >= ?
+                """,
+                (now, self.run_id, now, self.max_attempts)
+            )
+            cursor = conn.execute(
+                """
+                UPDATE etl_leases SET status = 'leased', owner = ?, token = ?, lease_expires = ?,
+                       attempts = attempts + 1, started_at = COALESCE(started_at, ?)
+                WHERE rowid = (
+                    SELECT rowid FROM etl_leases
+                    WHERE run_id = ?
+                      AND (status = 'pending' OR (status = 'leased' AND lease_expires < ?))
+                    ORDER BY attempts, item
+                    LIMIT 1
+                )
+                """,
+                (owner, token, now + self.lease_ttl, now, self.run_id, now)
+            )
+            if cursor.rowcount == 0:
+                return None
+            row = conn.execute(
+                "SELECT item, attempts FROM etl_leases WHERE run_id = ? AND token = ?",
+                (self.run_id, token)
+            ).fetchone()
+            return {"item": row["item"], "token": token, "attempts": row["attempts"]}
+
+    def heartbeat(self, token: str, progress: Dict[str, int] = None) -> bool:
+        """Extend a lease and store progress counters.
+
+        Returns:
+            False if the lease was lost (expired and claimed by someone else)
+        """
+        progress = progress or {}
+        with self.db.get_connection() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE etl_leases SET lease_expires = ?,
+                       extracted = COALESCE(?, extracted), loaded = COALESCE(?, loaded),
+                       linked = COALESCE(?, linked), errors = COALESCE(?, errors)
+                WHERE run_id = ? AND token = ? AND status = 'leased'
+                """,
+                (self.clock() + self.lease_ttl, progress.get("extracted"), progress.get("loaded"),
+                 progress.get("linked"), progress.get("errors"), self.run_id, token)
+            )
+            return cursor.rowcount == 1
+
+    def finish(self, token: str, stats: Dict[str, int] = None, error: str = None) -> bool:
+        """Mark a leased item done, or failed with `error`.
+
+        Returns:
+            False if the lease had already been lost
+        """
+        stats = stats or {}
+        with self.db.get_connection() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE etl_leases SET status = ?, owner = NULL, token = NULL, lease_expires = NULL,
+                       finished_at = ?, error = ?,
+                       extracted = ?, loaded = ?, linked = ?, errors = ?
+                WHERE run_id = ? AND token = ? AND status = 'leased'
+                """,
+                ("failed" if error else "done", self.clock(), error,
+                 stats.get("extracted", 0), stats.get("loaded", 0), stats.get("linked", 0),
+                 stats.get("errors", 0), self.run_id, token)
+            )
+            return cursor.rowcount == 1
+
+    def release(self, token: str):
+        """Give an item back without counting the attempt, e.g. on shutdown."""
+        with self.db.get_connection() as conn:
+            conn.execute(
+                """
+                UPDATE etl_leases SET status = 'pending', owner = NULL, token = NULL,
+                       lease_expires = NULL, attempts = MAX(attempts - 1, 0)
+                WHERE run_id = ? AND token = ? AND status = 'leased'
+                """,
+                (self.run_id, token)
+            )
+
+    def progress(self) -> Dict[str, Any]:
+        """Aggregated view of the run across all workers."""
+        now = self.clock()
+        with self.db.get_connection() as conn:
+            rows = [dict(row) for row in conn.execute(
+                "SELECT * FROM etl_leases WHERE run_id = ? ORDER BY item", (self.run_id,)
+            ).fetchall()]
+
+        by_status = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+        workers: Dict[str, int] = {}
+        for row in rows:
+            by_status[row["status"]] = by_status.get(row["status"], 0) + 1
+            if row["status"] == "leased" and row["lease_expires"] and row["lease_expires"] >= now:
+                workers[row["owner"]] = workers.get(row["owner"], 0) + 1
+
+        started = min((row["started_at"] for row in rows if row["started_at"]), default=None)
+        finished = by_status["done"] + by_status["failed"]
+        elapsed = now - started if started else 0.0
+        rate = finished / elapsed * 60 if elapsed > 0 else 0.0
+        remaining = len(rows) - finished
+
+        return {
+            "run_id": self.run_id,
+            "items": len(rows),
+            **by_status,
+            "active_workers": len(workers),
+            "extracted": sum(row["extracted"] for row in rows),
+            "loaded": sum(row["loaded"] for row in rows),
+            "linked": sum(row["linked"] for row in rows),
+            "errors": sum(row["errors"] for row in rows),
+            "elapsed": round(elapsed, 1),
+            "items_per_minute": round(rate, 2),
+            "eta_seconds": round(remaining / rate * 60, 1) if rate > 0 and remaining else None,
+            "failures": {row["item"]: row["error"] for row in rows if row["status"] == "failed"},
+        }
+
+
+def process_keyword(keyword: str, report: Callable[[Dict[str, int]], None]) -> Dict[str, int]:
+    """Extract, score and load one keyword; the default work item handler."""
+    from backend.etl.discovery import TrendDiscovery, record_titles
+    from backend.etl.extract import DataExtractor
+    from backend.etl.transform import SentimentTransformer
+    from backend.etl.load import DataLoader
+
+    extractor = DataExtractor()
+    records = extractor.extract_reddit(keyword) + extractor.extract_news(keyword)
+    report({"extracted": len(records)})
+
+    loader = DataLoader()
+    pending, linked = loader.link_existing(records)
+    record_titles(TrendDiscovery.from_config(loader.db, Config), pending)
+    report({"extracted": len(records), "linked": linked})
+
+    stats = loader.load_batch(SentimentTransformer().transform_batch(pending))
+    return {"extracted": len(records), "loaded": stats["loaded"], "linked": linked, "errors": stats["errors"]}
+
+
+def run_worker(queue: LeaseQueue, owner: str = None,
+               handler: Callable[[str, Callable], Dict[str, int]] = process_keyword,
+               stop: threading.Event = None) -> int:
+    """Claim and process items until none are left.
+
+    A heartbeat thread renews the current lease every lease_ttl / 3 seconds
+    and stores the handler's latest progress report.
+
+    Returns:
+        Number of items this worker finished
+    """
+    owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+    stop = stop or threading.Event()
+    done = 0
+
+    while not stop.is_set():
+        lease = queue.claim(owner)
+        if not lease:
+            return done
+
+        progress: Dict[str, int] = {}
+        finished = threading.Event()
+
+        def beat():
+            while not finished.wait(queue.lease_ttl / 3):
+                if not queue.heartbeat(lease["token"], dict(progress)):
+                    print(f"⚠️  {owner} lost the lease on {lease['item']}")
+                    return
+
+        heart = threading.Thread(target=beat, name=f"lease-{lease['item']}", daemon=True)
+        heart.start()
+        try:
+            stats = handler(lease["item"], progress.update)
+            error = None
+        except KeyboardInterrupt:
+            queue.release(lease["token"])
+            raise
+        except Exception as e:
+            stats, error = dict(progress), f"{type(e).__name__}: {e}"
+        finally:
+            finished.set()
+            heart.join()
+
+        if queue.finish(lease["token"], stats, error):
+            done += 1
+            status = f"failed ({error})" if error else f"{stats.get('loaded', 0)} loaded"
+            print(f"[{owner}] {lease['item']}: {status}")
+    return done
+
+
+def _worker_main(db_path: str, run_id: str, lease_ttl: float, index: int):
+    """Entry point of a spawned worker process."""
+    queue = LeaseQueue(Database(db_path=db_path), run_id, lease_ttl=lease_ttl)
+    run_worker(queue, owner=f"{socket.gethostname()}:{os.getpid()}:{index}")
+
+
+def print_progress(progress: Dict[str, Any]):
+    """One status line for a run."""
+    eta = f", ETA {progress['eta_seconds']:.0f}s" if progress["eta_seconds"] else ""
+    print(
+        f"[{progress['run_id']}] {progress['done']}/{progress['items']} done, "
+        f"{progress['leased']} running on {progress['active_workers']} workers, "
+        f"{progress['failed']} failed | loaded {progress['loaded']}, linked {progress['linked']} | "
+        f"{progress['items_per_minute']} items/min{eta}"
+    )
+
+
+def run_workers(keywords: List[str] = None, workers: int = None, run_id: str = None,
+                db: Database = None, lease_ttl: float = None, poll_interval: float = 5.0) -> Dict[str, Any]:
+    """Start (or join) a run and process it with `workers` local processes.
+
+    Args:
+        keywords: Items to enqueue for a new run. Defaults to Config.KEYWORDS.
+        workers: Number of processes. Defaults to Config.ETL_WORKERS.
+        run_id: Existing run to join. A new run is created if omitted.
+        db: Database instance. Creates new one if not provided.
+        lease_ttl: Lease lifetime in seconds.
+        poll_interval: Seconds between progress lines.
+
+    Returns:
+        Final progress of the run
+    """
+    db = db or Database()
+    db.create_tables()
+    with db.get_connection() as conn:
+        # Concurrent writers from several processes; persistent per file
+        conn.execute("PRAGMA journal_mode = WAL")
+
+    queue = LeaseQueue(db, run_id or time.strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6], lease_ttl=lease_ttl)
+    if not run_id:
+        queue.enqueue(keywords or Config.KEYWORDS)
+    workers = workers or Config.ETL_WORKERS
+
+    # spawn: the Gemini and Reddit clients are not fork-safe
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=_worker_main, args=(db.db_path, queue.run_id, queue.lease_ttl, i),
+                        name=f"etl-worker-{i}")
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    print(f"🚀 Run {queue.run_id}: {workers} workers")
+
+    try:
+        while any(process.is_alive() for process in processes):
+            print_progress(queue.progress())
+            for process in processes:
+                process.join(timeout=poll_interval / len(processes))
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+
+    progress = queue.progress()
+    print_progress(progress)
+    refresh_snapshot(db)
+    return progress
+
+
+def main():
+    """Entry point for sharded ETL runs."""
+    parser = argparse.ArgumentParser(description="Run the ETL with several worker processes")
+    parser.add_argument(
+        "--keywords",
+        type=str,
+        help="Comma-separated list of keywords to process"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of worker processes on this machine"
+    )
+    parser.add_argument(
+        "--join",
+        metavar="RUN_ID",
+        help="Add workers to an existing run instead of starting a new one"
+    )
+    parser.add_argument(
+        "--status",
+        metavar="RUN_ID",
+        help="Print the progress of a run and exit"
+    )
+
+    args = parser.parse_args()
+
+    if args.status:
+        db = Database()
+        db.create_tables()
+        progress = LeaseQueue(db, args.status).progress()
+        print_progress(progress)
+        for item, error in progress["failures"].items():
+            print(f"  ❌ {item}: {error}")
+        return
+
+    keywords = None
+    if args.keywords:
+        keywords = [k.strip() for k in args.keywords.split(",")]
+
+    run_workers(keywords=keywords, workers=args.workers, run_id=args.join)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,7 +11,7 @@ def init_application():
     db.create_tables()
     
     # 2. Verileri temizle (İsteğe bağlı, temiz başlangıç için)
-    # db.execute("DELETE FROM sentiments") 
+    # db.execute("DELETE FROM articles") 
     
     # 3. ETL işlemini başlat
     print("2. Mock veriler çekiliyor ve veritabanına yazılıyor...")
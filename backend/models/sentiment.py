@@ -1,23 +1,58 @@
 """Data models for sentiment analysis."""
-from dataclasses import dataclass
-from typing import Optional
+import math
+from itertools import compress
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from datetime import datetime
 
+import numpy as np
+
+# Field order of a sentiment row, as taken by Database.insert_sentiment(s)
+ROW_FIELDS = ("keyword", "source", "title", "content", "url", "sentiment_score", "summary", "model", "prompt_version")
+SCORE_INDEX = ROW_FIELDS.index("sentiment_score")
+
+
+def _score(value: Any) -> float:
+    """Score as a float; unparseable values become NaN and fail validation."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
 
-@dataclass
 class SentimentRecord:
-    """Represents a sentiment analysis record."""
-    
-    keyword: str
-    source: str
-    title: str
-    content: str
-    url: str
-    sentiment_score: float
-    summary: str
-    created_at: Optional[datetime] = None
-    id: Optional[int] = None
-    
+    """Represents a sentiment analysis record.
+
+    Slotted rather than a dataclass so records carry no per-instance
+    __dict__ (dataclass(slots=True) needs Python 3.10).
+    """
+
+    __slots__ = ROW_FIELDS + ("created_at", "id")
+
+    def __init__(self, keyword: str, source: str, title: str, content: str, url: str, sentiment_score: float,
+                 summary: str, created_at: Optional[datetime] = None, id: Optional[int] = None,
+                 model: Optional[str] = None, prompt_version: Optional[str] = None):
+        self.keyword = keyword
+        self.source = source
+        self.title = title
+        self.content = content
+        self.url = url
+        self.sentiment_score = sentiment_score
+        self.summary = summary
+        self.created_at = created_at
+        self.id = id
+        # Model and prompt version that produced the score
+        self.model = model
+        self.prompt_version = prompt_version
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"SentimentRecord({fields})"
+
+    def __eq__(self, other: Any) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
     def validate(self) -> bool:
         """Validate the sentiment record."""
         if not (-1.0 <= self.sentiment_score <= 1.0):
@@ -26,3 +61,51 @@ class SentimentRecord:
             return False
         return True
 
+    def to_row(self) -> tuple:
+        """Field values in ROW_FIELDS order."""
+        return (self.keyword, self.source, self.title, self.content, self.url, self.sentiment_score,
+                self.summary, self.model, self.prompt_version)
+
+
+class SentimentBatch:
+    """Many records kept as plain tuples in ROW_FIELDS order.
+
+    Rows go from the transformed dicts to Database.insert_sentiments without
+    a record object per row, and a whole batch is validated with a few
+    array operations.
+    """
+
+    __slots__ = ("rows",)
+
+    def __init__(self, rows: List[tuple]):
+        self.rows = rows
+
+    @classmethod
+    def from_dicts(cls, records: Iterable[Dict[str, Any]]) -> "SentimentBatch":
+        """Rows from transformed record dicts, with load_record's defaults."""
+        return cls([
+            (record.get("keyword", ""), record.get("source", ""), record.get("title", ""),
+             record.get("content", ""), record.get("url", ""), _score(record.get("sentiment_score", 0.0)),
+             record.get("summary", ""), record.get("model"), record.get("prompt_version"))
+            for record in records
+        ])
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def valid_mask(self) -> np.ndarray:
+        """Per row: score within [-1, 1] and keyword and source non-empty."""
+        rows, count = self.rows, len(self.rows)
+
+        def column(index, dtype):
+            return np.fromiter((row[index] for row in rows), dtype=dtype, count=count)
+
+        scores = column(SCORE_INDEX, float)
+        # NaN compares false, so unparseable scores are rejected too
+        in_range = (scores >= -1.0) & (scores <= 1.0)
+        return in_range & column(0, object).astype(bool) & column(1, object).astype(bool)
+
+    def split(self) -> Tuple[List[tuple], List[tuple]]:
+        """(valid rows, invalid rows), each in batch order."""
+        mask = self.valid_mask()
+        return list(compress(self.rows, mask)), list(compress(self.rows, ~mask))
@@ -0,0 +1,120 @@
+"""Multi-worker API server.
+
+The master process builds the app once, prewarms it (imports, database
+pages, column store) and binds the listening socket, then forks workers
+that inherit all of that state. A crashed worker is replaced by a fresh
+fork of the already-warm master, so respawns cost milliseconds.
+
+    python serve.py --workers 4
+
+The same setup with gunicorn, if installed:
+
+    gunicorn -w 4 --preload -b 127.0.0.1:5001 "app:create_app(prewarm=True)"
+"""
+import argparse
+import os
+import signal
+import socket
+import sys
+import time
+
+from werkzeug.serving import make_server
+
+from config import Config
+
+
+def _serve(app, host: str, port: int, fd: int, threaded: bool):
+    """Worker loop: serve requests on the inherited listening socket."""
+    server = make_server(host, port, app, threaded=threaded, fd=fd)
+    server.serve_forever()
+
+
+def run_prefork(app, host: str, port: int, workers: int, threaded: bool = True):
+    """Fork `workers` processes sharing one listening socket; respawn on exit."""
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind((host, port))
+    listener.listen(128)
+    listener.set_inheritable(True)
+
+    children = set()
+    running = True
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            try:
+                _serve(app, host, port, listener.fileno(), threaded)
+            finally:
+                os._exit(0)
+        children.add(pid)
+
+    def shutdown(signum, frame):
+        nonlocal running
+        running = False
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    for _ in range(workers):
+        spawn()
+    print(f"🚀 Serving on http://{host}:{port} with {workers} workers (master pid {os.getpid()})")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        children.discard(pid)
+        if running:
+            print(f"⚠️  Worker {pid} exited (status {status}); respawning")
+            # Avoid a tight fork loop if workers die on startup
+            time.sleep(0.1)
+            spawn()
+
+    listener.close()
+
+
+def main():
+    """Entry point for the multi-worker server."""
+    parser = argparse.ArgumentParser(description="Run the API with several pre-forked workers")
+    parser.add_argument("--host", default=Config.FLASK_HOST, help="Bind address")
+    parser.add_argument("--port", type=int, default=5001, help="Bind port")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 2,
+        help="Number of worker processes"
+    )
+    parser.add_argument(
+        "--no-threads",
+        action="store_true",
+        help="Handle one request at a time per worker"
+    )
+
+    args = parser.parse_args()
+
+    from app import create_app
+    started = time.perf_counter()
+    app = create_app(prewarm=True)
+    print(f"App created and prewarmed in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    if not hasattr(os, "fork"):
+        print("os.fork is unavailable on this platform; serving with a single process")
+        app.run(host=args.host, port=args.port, threaded=not args.no_threads)
+        return
+
+    run_prefork(app, args.host, args.port, args.workers, threaded=not args.no_threads)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+"""Tests for rollups and time-series analytics."""
+import unittest
+import os
+import tempfile
+import numpy as np
+from backend.app import create_app
+from backend.analytics.cache import GenerationCache
+from backend.analytics.correlations import compute_correlations, correlation_matrix, rank_rows
+from backend.analytics.movers import compute_movers, window_bounds
+from backend.analytics.timeseries import build_daily_matrix, compute_timeseries, ewma, rolling_stats
+from backend.database.db import Database
+
+
+def _rows(keyword, values, start_day=1):
+    return [
+        {"keyword": keyword, "day": f"2024-01-{start_day + i:02d}", "articles": 1, "sentiment_sum": value}
+        for i, value in enumerate(values) if value is not None
+    ]
+
+
+class TestTimeseries(unittest.TestCase):
+    """Test the vectorized statistics."""
+
+    def test_matrix_fills_gaps(self):
+        """Missing days become NaN columns."""
+        matrix = build_daily_matrix(_rows("AI", [0.1, None, 0.3]) + _rows("Rust", [0.5]))
+        self.assertEqual(matrix.keywords, ["AI", "Rust"])
+        self.assertEqual(matrix.mean.shape, (2, 3))
+        self.assertTrue(np.isnan(matrix.mean[0, 1]))
+        self.assertEqual(matrix.counts[1].tolist(), [1, 0, 0])
+
+    def test_rolling_stats_match_naive(self):
+        """Rolling mean/std equal a straightforward per-window computation."""
+        values = np.array([[0.1, 0.4, np.nan, -0.2, 0.3, 0.0]])
+        roll_mean, roll_std = rolling_stats(values, window=3, min_periods=1)
+        for day in range(values.shape[1]):
+            window = values[0, max(0, day - 2):day + 1]
+            window = window[~np.isnan(window)]
+            self.assertAlmostEqual(roll_mean[0, day], window.mean())
+            if len(window) >= 2:
+                self.assertAlmostEqual(roll_std[0, day], window.std(ddof=1))
+
+    def test_ewma_carries_across_gaps(self):
+        """EWMA starts at the first value and holds through gaps."""
+        result = ewma(np.array([[np.nan, 1.0, np.nan, 0.0]]), alpha=0.5)
+        self.assertTrue(np.isnan(result[0, 0]))
+        self.assertEqual(result[0, 1:].tolist(), [1.0, 1.0, 0.5])
+
+    def test_spike_is_flagged(self):
+        """A sharp swing after a stable week is reported as an anomaly."""
+        stable = [0.5, 0.52, 0.48, 0.5, 0.51, 0.49, 0.5]
+        matrix = build_daily_matrix(_rows("AI", stable + [-0.6]) + _rows("Rust", stable + [0.5]))
+        result = compute_timeseries(matrix, window=7)
+
+        self.assertEqual([(a["keyword"], a["date"]) for a in result["anomalies"]], [("AI", "2024-01-08")])
+        last = result["series"]["AI"][-1]
+        self.assertAlmostEqual(last["delta"], -1.1)
+        self.assertLess(last["zscore"], -2)
+
+
+class TestMovers(unittest.TestCase):
+    """Test window comparison and ranking."""
+
+    def _row(self, keyword, current, previous):
+        row = {"keyword": keyword}
+        for prefix, scores in (("cur", current), ("prev", previous)):
+            row[f"{prefix}_articles"] = len(scores)
+            row[f"{prefix}_sentiment_sum"] = sum(scores)
+            row[f"{prefix}_sentiment_sq_sum"] = sum(s * s for s in scores)
+        return row
+
+    def test_window_bounds(self):
+        """The previous window ends the day before the current one starts."""
+        self.assertEqual(window_bounds("2024-01-14", 7), (("2024-01-08", "2024-01-14"), ("2024-01-01", "2024-01-07")))
+        self.assertEqual(window_bounds("2024-01-14", 1, compare=3)[1], ("2024-01-11", "2024-01-13"))
+
+    def test_well_supported_shift_ranks_first(self):
+        """Welch z favours a consistent shift over a bigger but noisy one."""
+        rows = [
+            self._row("AI", [0.1, 0.12, 0.08, 0.1, 0.11, 0.09], [0.5, 0.52, 0.48, 0.5, 0.49, 0.51]),
+            self._row("Rust", [0.9, -0.9, 0.9], [-0.2, 0.8, -0.9]),
+            self._row("Go", [0.5], [0.0]),
+            self._row("Zig", [0.3, 0.3, 0.3], []),
+        ]
+        movers = compute_movers(rows, min_articles=3)
+        self.assertEqual([m["keyword"] for m in movers], ["AI", "Rust", "Go", "Zig"])
+        self.assertAlmostEqual(movers[0]["delta"], -0.4)
+        self.assertLess(movers[0]["z_score"], -5)
+        self.assertLess(movers[0]["p_value"], 0.001)
+        self.assertIsNone(movers[2]["z_score"])
+        self.assertEqual(movers[3]["volume_change"], 3)
+        self.assertIsNone(movers[3]["volume_change_pct"])
+
+        self.assertEqual(compute_movers(rows, sort="delta")[0]["keyword"], "Go")
+        self.assertEqual(compute_movers(rows, sort="volume")[0]["keyword"], "Zig")
+        with self.assertRaises(ValueError):
+            compute_movers(rows, sort="bogus")
+
+
+class TestCorrelations(unittest.TestCase):
+    """Test the masked correlation matrix."""
+
+    def test_matches_pairwise_numpy(self):
+        """Each entry equals np.corrcoef over the days both series have data."""
+        values = np.array([
+            [0.1, 0.4, np.nan, -0.2, 0.3, 0.0, 0.5],
+            [0.2, np.nan, 0.1, -0.3, 0.2, 0.1, 0.4],
+            [-0.1, -0.5, 0.2, 0.3, np.nan, 0.0, -0.4],
+        ])
+        corr, overlap = correlation_matrix(values, min_periods=3)
+        for i in range(3):
+            for j in range(3):
+                both = ~np.isnan(values[i]) & ~np.isnan(values[j])
+                self.assertEqual(overlap[i, j], both.sum())
+                self.assertAlmostEqual(corr[i, j], np.corrcoef(values[i, both], values[j, both])[0, 1])
+
+    def test_lag(self):
+        """A series shifted by L days correlates perfectly at lag L, in one direction."""
+        leader = np.array([0.1, 0.5, -0.2, 0.3, 0.0, 0.4, -0.1, 0.2])
+        values = np.vstack([leader, np.concatenate([[np.nan, np.nan], leader[:-2]])])
+        corr, _ = correlation_matrix(values, lag=2, min_periods=3)
+        self.assertAlmostEqual(corr[0, 1], 1.0)
+        backwards, _ = correlation_matrix(values, lag=-2, min_periods=3)
+        self.assertAlmostEqual(backwards[1, 0], 1.0)
+        self.assertTrue(np.isnan(correlation_matrix(values, lag=10)[0][0, 1]))
+
+    def test_spearman_and_gaps(self):
+        """Ranks average ties; constant or sparse pairs have no coefficient."""
+        self.assertEqual(rank_rows(np.array([[0.3, np.nan, 0.1, 0.3]]))[0, [0, 2, 3]].tolist(), [2.5, 1.0, 2.5])
+        matrix = build_daily_matrix(_rows("AI", [0.1, 0.2, 0.3, 0.9, 1.0]) + _rows("Go", [1, 2, 3, 4, 5])
+                                    + _rows("Zig", [0.5] * 5))
+        result = compute_correlations(matrix, method="spearman", min_periods=3)
+        self.assertEqual(result["matrix"][0][1], 1.0)
+        self.assertIsNone(result["matrix"][0][2])
+        self.assertEqual(result["pairs"], [{"keywords": ["AI", "Go"], "correlation": 1.0, "days": 5}])
+        with self.assertRaises(ValueError):
+            compute_correlations(matrix, method="kendall")
+
+
+class TestGenerationCache(unittest.TestCase):
+    """Test generation-keyed caching."""
+
+    def test_recomputes_on_new_generation(self):
+        """Results are reused within a generation and recomputed after it moves."""
+        cache = GenerationCache(max_entries=2)
+        calls = []
+        compute = lambda: calls.append(1) or len(calls)
+        self.assertEqual(cache.get_or_compute("k", 1, compute), 1)
+        self.assertEqual(cache.get_or_compute("k", 1, compute), 1)
+        self.assertEqual(cache.get_or_compute("k", 2, compute), 2)
+        self.assertEqual(cache.hits, 1)
+
+
+class TestRollups(unittest.TestCase):
+    """Test trigger-maintained daily rollups."""
+
+    def setUp(self):
+        """Set up test database."""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.temp_db.close()
+        self.db = Database(db_path=self.temp_db.name)
+        self.db.create_tables()
+
+    def tearDown(self):
+        """Clean up test database."""
+        if os.path.exists(self.temp_db.name):
+            os.unlink(self.temp_db.name)
+
+    def _insert(self, keyword, url, score):
+        self.db.insert_sentiment(keyword=keyword, source="news", title="t", content="c",
+                                 url=url, sentiment_score=score, summary="s")
+
+    def test_triggers_match_rebuild(self):
+        """Incremental rollups equal a full rebuild after inserts, updates and deletes."""
+        generation = self.db.get_data_generation()
+        self._insert("AI", "u1", 0.5)
+        self._insert("AI", "u2", -0.1)
+        self._insert("Python", "u1", 0.5)
+        with self.db.get_connection() as conn:
+            conn.execute("UPDATE articles SET sentiment_score = 0.9 WHERE url = 'u2'")
+            conn.execute("DELETE FROM articles WHERE url = 'u1'")
+        self.assertGreater(self.db.get_data_generation(), generation)
+
+        incremental = self.db.get_daily_aggregates()
+        self.db.rebuild_rollups()
+        rebuilt = self.db.get_daily_aggregates()
+        self.assertEqual(len(incremental), 1)
+        self.assertEqual(len(rebuilt), 1)
+        for key in ("keyword", "day", "articles"):
+            self.assertEqual(incremental[0][key], rebuilt[0][key])
+        self.assertAlmostEqual(incremental[0]["sentiment_sum"], rebuilt[0]["sentiment_sum"])
+        self.assertAlmostEqual(incremental[0]["sentiment_sum"], 0.9)
+
+    def test_timeseries_endpoint(self):
+        """The endpoint returns per-keyword series and validates parameters."""
+        self._insert("AI", "u1", 0.5)
+        client = create_app(db=self.db).test_client()
+        response = client.get("/api/analytics/timeseries?keywords=AI")
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(len(data["data"]["AI"]), 1)
+        self.assertEqual(data["data"]["AI"][0]["sentiment"], 0.5)
+
+        self.assertEqual(client.get("/api/analytics/timeseries?window=1").status_code, 400)
+        self.assertEqual(client.get("/api/analytics/timeseries?end_date=bad").status_code, 400)
+
+
+    def test_movers_endpoint(self):
+        """Windows are read from the rollups and the result is cached per generation."""
+        for i, (day, score) in enumerate([("2024-01-02", 0.6), ("2024-01-03", 0.4),
+                                          ("2024-01-09", -0.2), ("2024-01-10", -0.4)]):
+            self._insert("AI", f"u{i}", score)
+            with self.db.get_connection() as conn:
+                conn.execute("UPDATE articles SET created_at = ? WHERE url = ?", (f"{day} 12:00:00", f"u{i}"))
+                conn.execute("UPDATE article_keywords SET created_at = ? WHERE article_id = "
+                             "(SELECT id FROM articles WHERE url = ?)", (f"{day} 12:00:00", f"u{i}"))
+        self.db.rebuild_rollups()
+
+        app = create_app(db=self.db)
+        client = app.test_client()
+        response = client.get("/api/movers?end_date=2024-01-14&min_articles=2")
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data["previous"], {"start_date": "2024-01-01", "end_date": "2024-01-07"})
+        mover = data["data"][0]
+        self.assertEqual((mover["keyword"], mover["current_articles"], mover["previous_articles"]), ("AI", 2, 2))
+        self.assertAlmostEqual(mover["delta"], -0.8)
+        self.assertLess(mover["z_score"], 0)
+
+        client.get("/api/movers?end_date=2024-01-14&min_articles=2")
+        self.assertEqual(app.extensions["analytics_cache"].hits, 1)
+        self.assertEqual(client.get("/api/movers?sort=bogus").status_code, 400)
+        self.assertEqual(client.get("/api/movers?window=0").status_code, 400)
+
+    def test_correlations_endpoint(self):
+        """The endpoint correlates the requested keywords and validates parameters."""
+        self._insert("AI", "u1", 0.5)
+        self._insert("Python", "u1", 0.5)
+        client = create_app(db=self.db).test_client()
+        response = client.get("/api/analytics/correlations?keywords=Python,AI&min_periods=2")
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()["data"]
+        self.assertEqual(data["keywords"], ["AI", "Python"])
+        self.assertEqual(data["overlap"][0][1], 1)
+        self.assertIsNone(data["matrix"][0][1])
+
+        self.assertEqual(client.get("/api/analytics/correlations?method=bogus").status_code, 400)
+        self.assertEqual(client.get("/api/analytics/correlations?lag=100").status_code, 400)
+
+    def test_batch_endpoint(self):
+        """Many keywords are answered in one request, in the order asked."""
+        self._insert("AI", "u1", 0.5)
+        self._insert("AI", "u2", -0.1)
+        self._insert("Python", "u1", 0.5)
+        client = create_app(db=self.db).test_client()
+        response = client.get("/api/batch?keywords=Python,AI,Rust,AI&sources=news&articles=1")
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()["data"]
+        self.assertEqual([(e["keyword"], e["articles"]) for e in data], [("Python", 1), ("AI", 2), ("Rust", 0)])
+        self.assertAlmostEqual(data[1]["avg_sentiment"], 0.2)
+        self.assertEqual(data[1]["series"][0]["articles"], 2)
+        self.assertEqual(([e["url"] for e in data[1]["latest"]], data[2]["latest"]), (["u2"], []))
+        self.assertIsNone(data[2]["avg_sentiment"])
+
+        self.assertEqual(client.get("/api/batch?keywords=AI&sources=reddit").get_json()["data"][0]["articles"], 0)
+        self.assertEqual(client.get("/api/batch").status_code, 400)
+        self.assertEqual(client.get("/api/batch?keywords=AI&articles=500").status_code, 400)
+        self.assertEqual(client.get("/api/batch?keywords=AI&end_date=bogus").status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,7 @@
 """Tests for Flask API endpoints."""
+import os
+import subprocess
+import sys
 import unittest
 from backend.app import app
 
@@ -52,6 +55,28 @@ class TestAPI(unittest.TestCase):
         self.assertIn("total_count", data["stats"])
         self.assertIn("average_sentiment", data["stats"])
 
+    def test_import_is_lazy(self):
+        """Creating the app does not import the ETL pipeline, the LLM client or NumPy."""
+        backend_dir = os.path.join(os.path.dirname(__file__), "..", "..", "backend")
+        code = (
+            "import sys; from app import create_app; create_app(); "
+            "print(any(m in sys.modules for m in ('google.generativeai', 'etl.data_fetcher', 'praw', 'numpy')))"
+        )
+        result = subprocess.run([sys.executable, "-c", code], cwd=backend_dir,
+                                capture_output=True, text=True, timeout=60)
+        self.assertEqual(result.stdout.strip().splitlines()[-1], "False", result.stderr)
+
+    def test_default_app_is_built_on_access(self):
+        """Importing create_app builds no app; `app` is built once, on first use."""
+        backend_dir = os.path.join(os.path.dirname(__file__), "..", "..", "backend")
+        code = (
+            "import app as module; from app import create_app; print(module._default_app is None); "
+            "from app import app; print(app is module.app)"
+        )
+        result = subprocess.run([sys.executable, "-c", code], cwd=backend_dir,
+                                capture_output=True, text=True, timeout=60)
+        self.assertEqual(result.stdout.strip().splitlines()[-2:], ["True", "True"], result.stderr)
+
 
 if __name__ == "__main__":
     unittest.main()
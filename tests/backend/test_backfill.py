@@ -0,0 +1,139 @@
+"""Tests for score provenance and the re-scoring backfill."""
+import unittest
+import os
+import shutil
+import sqlite3
+import tempfile
+from backend.database.db import Database
+from backend.database.retention import RetentionManager
+from backend.etl.backfill import Backfill
+
+
+class TestBackfill(unittest.TestCase):
+    """Test chunked, resumable re-scoring."""
+
+    def setUp(self):
+        """Set up test database with unversioned and versioned articles."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = Database(db_path=os.path.join(self.temp_dir, "test.db"))
+        self.db.create_tables()
+        for i in range(5):
+            self.db.insert_sentiment(keyword="AI", source="news", title=f"title {i}", content=f"content {i}",
+                                     url=f"u{i}", sentiment_score=0.1, summary=f"summary {i}")
+        self.db.insert_sentiment(keyword="AI", source="news", title="current", content="c", url="current",
+                                 sentiment_score=0.3, summary="s", model="m2", prompt_version="v2")
+        self.calls = []
+
+    def tearDown(self):
+        """Clean up test database."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _scorer(self, article):
+        self.calls.append(article["title"])
+        if article["title"] == "title 2":
+            return None
+        return {"sentiment_score": 0.9, "summary": f"new {article['title']}"}
+
+    def _backfill(self, **kwargs):
+        return Backfill(self.db, scorer=self._scorer, model="m2", prompt_version="v2",
+                        chunk_size=2, concurrency=2, interval=0, **kwargs)
+
+    def test_rescores_stale_rows(self):
+        """Stale rows get new scores and provenance; rollups follow."""
+        totals = self._backfill().run(verbose=False)
+        self.assertEqual((totals["scored"], totals["failed"]), (4, 1))
+        self.assertNotIn("current", self.calls)
+
+        with self.db.get_connection() as conn:
+            rows = {row["url"]: dict(row) for row in conn.execute("SELECT * FROM articles").fetchall()}
+        self.assertEqual((rows["u0"]["sentiment_score"], rows["u0"]["model"], rows["u0"]["prompt_version"]),
+                         (0.9, "m2", "v2"))
+        self.assertEqual(rows["u0"]["summary"], "new title 0")
+        self.assertIsNone(rows["u2"]["model"])
+
+        self.assertAlmostEqual(self.db.get_daily_aggregates()[0]["sentiment_sum"], 4 * 0.9 + 0.1 + 0.3)
+        self.assertEqual(self.db.get_backfill_checkpoint("m2/v2")["scored"], 4)
+        self.assertEqual(self.db.get_etl_runs(pipeline="backfill")[0]["items"], 4)
+
+    def test_resumes_from_checkpoint(self):
+        """A stopped backfill continues after the last chunk; --restart retries failures."""
+        backfill = self._backfill()
+        self.assertEqual(backfill.run(limit=2, verbose=False)["scored"], 2)
+        self.assertEqual(backfill.status()["remaining"], 3)
+
+        backfill.run(verbose=False)
+        self.assertEqual(self.calls, ["title 0", "title 1", "title 2", "title 3", "title 4"])
+        self.assertEqual(backfill.status()["remaining"], 0)
+
+        backfill.run(restart=True, verbose=False)
+        self.assertEqual(self.calls[-1], "title 2")
+        self.assertEqual(self.db.count_stale_articles("m2", "v2"), 1)
+
+    def test_prompt_families(self):
+        """Headline scores are left to the headline prompt's backfill."""
+        self.db.insert_sentiment(keyword="AI", source="hackernews", title="headline", content="", url="h",
+                                 sentiment_score=0.2, summary="headline", model="m2", prompt_version="score-v1")
+        article = Backfill(self.db, scorer=self._scorer, model="m2", prompt_version="sentiment-v2", interval=0)
+        self.assertNotIn("h", [a["title"] for a in self.db.get_stale_articles("m2", "sentiment-v2",
+                                                                              family="sentiment")])
+        self.assertEqual(article.status()["remaining"], 5)
+
+        headline = Backfill(self.db, scorer=self._scorer, model="m2", prompt_version="score-v2", interval=0)
+        self.assertEqual(headline.status()["remaining"], 1)
+        headline.run(verbose=False)
+        self.assertEqual(self.calls, ["headline"])
+        self.assertEqual(article.status()["remaining"], 5)
+
+    def test_unscored_headlines(self):
+        """Unscored headlines stay out of the rollups and only the headline backfill scores them."""
+        before = self.db.get_daily_aggregates()[0]
+        self.db.insert_sentiment(keyword="AI", source="news", title="headline", content="", url="h",
+                                 sentiment_score=0.0, summary="headline", prompt_version="score-unscored")
+        self.assertEqual(self.db.get_daily_aggregates()[0]["articles"], before["articles"])
+        self.db.rebuild_rollups()
+        self.assertEqual(self.db.get_daily_aggregates()[0]["articles"], before["articles"])
+
+        article = Backfill(self.db, scorer=self._scorer, model="m2", prompt_version="sentiment-v2", interval=0)
+        self.assertEqual(article.status()["remaining"], 5)
+        Backfill(self.db, scorer=self._scorer, model="m2", prompt_version="score-v2", interval=0).run(verbose=False)
+        self.assertEqual(self.calls, ["headline"])
+
+        after = self.db.get_daily_aggregates()[0]
+        self.assertEqual(after["articles"], before["articles"] + 1)
+        self.assertAlmostEqual(after["sentiment_sum"], before["sentiment_sum"] + 0.9)
+
+    def test_archived_summary(self):
+        """Archived articles are scored from their stored text and keep it compressed."""
+        with self.db.get_connection() as conn:
+            conn.execute("UPDATE articles SET created_at = datetime('now', '-90 days') WHERE url = 'u0'")
+        RetentionManager(self.db, hot_days=30).archive()
+
+        stale = self.db.get_stale_articles("m2", "v2", limit=1)[0]
+        self.assertTrue(stale["archived"])
+        self.assertEqual((stale["content"], stale["keyword"]), ("content 0", "AI"))
+
+        self._backfill().run(limit=1, verbose=False)
+        article = self.db.get_article(stale["id"])
+        self.assertEqual(article["summary"], "new title 0")
+        self.assertEqual(article["content"], "content 0")
+
+    def test_adds_columns_to_old_databases(self):
+        """Databases created before versioning gain the provenance columns."""
+        path = os.path.join(self.temp_dir, "old.db")
+        conn = sqlite3.connect(path)
+        conn.execute("""
+        CREATE TABLE articles (id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT UNIQUE, source TEXT NOT NULL,
+            title TEXT, content TEXT, sentiment_score REAL NOT NULL, summary TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)
+        """)
+        conn.execute("INSERT INTO articles (url, source, sentiment_score) VALUES ('u', 'news', 0.2)")
+        conn.commit()
+        conn.close()
+
+        db = Database(db_path=path)
+        db.create_tables()
+        self.assertEqual(db.count_stale_articles("m2", "v2"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
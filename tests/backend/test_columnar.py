@@ -0,0 +1,141 @@
+"""Tests for the in-memory columnar store."""
+import unittest
+import os
+import json
+import shutil
+import tempfile
+import threading
+from backend.app import create_app
+from backend.analytics.columnar import ColumnarStore
+from backend.database.db import Database
+
+
+class TestColumnarStore(unittest.TestCase):
+    """Test that the columnar store agrees with SQLite."""
+
+    def setUp(self):
+        """Set up test database and store."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = Database(db_path=os.path.join(self.temp_dir, "test.db"))
+        self.db.create_tables()
+        self._insert("AI", "u1", 0.5, "news")
+        self._insert("Python", "u1", 0.5, "news")
+        self._insert("AI", "u2", -0.3, "reddit")
+        self.store = ColumnarStore(self.db)
+        self.store.load()
+
+    def tearDown(self):
+        """Clean up test database."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _insert(self, keyword, url, score, source="news"):
+        self.db.insert_sentiment(keyword=keyword, source=source, title="t", content="c",
+                                 url=url, sentiment_score=score, summary="s")
+
+    def test_counts_match_database(self):
+        """Filtered counts equal the SQL counts."""
+        today = self.db.get_sentiments()[0]["created_at"][:10]
+        for filters in ({}, {"keyword": "AI"}, {"source": "reddit"}, {"keyword": "Rust"},
+                        {"start_date": today, "end_date": today}, {"end_date": "2000-01-01"}):
+            self.assertEqual(self.store.count(**filters), self.db.count_sentiments(**filters), filters)
+
+    def test_stats_match_database(self):
+        """Stats equal Database.get_advanced_stats."""
+        self.assertEqual(self.store.stats(), self.db.get_advanced_stats())
+
+    def test_incremental_append(self):
+        """New links are appended without a reload."""
+        self._insert("Rust", "u3", 0.9)
+        self._insert("AI", "u3", 0.9)
+        self.assertEqual(self.store.sync(), 2)
+        self.assertEqual(len(self.store), 5)
+        self.assertEqual(self.store.stats(), self.db.get_advanced_stats())
+
+    def test_rewrite_triggers_reload(self):
+        """Updated scores are picked up through a full reload."""
+        with self.db.get_connection() as conn:
+            conn.execute("UPDATE articles SET sentiment_score = 1.0 WHERE url = 'u2'")
+        self.assertEqual(self.store.sync(), -1)
+        self.assertEqual(self.store.stats(), self.db.get_advanced_stats())
+
+    def test_snapshot_roundtrip(self):
+        """A store loaded from the memory-mapped snapshot catches up with new rows."""
+        snapshot = os.path.join(self.temp_dir, "columnar")
+        ColumnarStore(self.db, snapshot_path=snapshot).load()
+        self._insert("Rust", "u3", 0.9)
+
+        store = ColumnarStore(self.db, snapshot_path=snapshot)
+        store.load()
+        self.assertEqual(len(store), 4)
+        self.assertEqual(store.count(keyword="Rust"), 1)
+
+    def test_concurrent_snapshot_writers(self):
+        """Workers sharing a snapshot directory never collide and leave one current snapshot."""
+        snapshot = os.path.join(self.temp_dir, "columnar")
+        errors = []
+
+        def worker():
+            store = ColumnarStore(self.db, snapshot_path=snapshot)
+            try:
+                for _ in range(20):
+                    store.reload()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+        store = ColumnarStore(self.db, snapshot_path=snapshot)
+        self.assertTrue(store._load_snapshot())
+        self.assertEqual(len(store), 3)
+
+    def test_inconsistent_snapshot_is_ignored(self):
+        """A snapshot whose columns disagree with its meta is rebuilt from SQLite."""
+        snapshot = os.path.join(self.temp_dir, "columnar")
+        ColumnarStore(self.db, snapshot_path=snapshot).load()
+        with open(os.path.join(snapshot, "CURRENT"), encoding="utf-8") as f:
+            meta_path = os.path.join(snapshot, f.read(), "meta.json")
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        meta["keywords"] = meta["keywords"][:1]
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+        store = ColumnarStore(self.db, snapshot_path=snapshot)
+        self.assertFalse(store._load_snapshot())
+        store.load()
+        self.assertEqual(store.count(keyword="Python"), 1)
+
+    def test_failed_snapshot_write_does_not_fail_queries(self):
+        """An unwritable snapshot path only skips the snapshot."""
+        blocker = os.path.join(self.temp_dir, "not-a-dir")
+        open(blocker, "w").close()
+        store = ColumnarStore(self.db, snapshot_path=blocker)
+        store.load()
+        self._insert("Rust", "u3", 0.9)
+        self.assertEqual(store.count(keyword="Rust"), 1)
+
+    def test_trends_match_sql_path(self):
+        """/api/trends returns the same data with and without the store."""
+        expected = create_app(db=self.db).test_client().get("/api/trends").get_json()["data"]
+        client = create_app(db=self.db, column_store=self.store).test_client()
+        actual = client.get("/api/trends").get_json()["data"]
+        sentiments = client.get("/api/sentiments?keyword=AI&limit=1").get_json()
+        key = lambda item: (item["date"], item["keyword"])
+        self.assertEqual(sorted(expected, key=key), sorted(actual, key=key))
+        self.assertEqual(sentiments["count"], 1)
+        self.assertEqual(sentiments["total"], 2)
+
+    def test_total_without_store(self):
+        """Without the store the total is only counted when asked for."""
+        client = create_app(db=self.db).test_client()
+        self.assertNotIn("total", client.get("/api/sentiments?keyword=AI&limit=1").get_json())
+        self.assertEqual(client.get("/api/sentiments?keyword=AI&limit=1&total=true").get_json()["total"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
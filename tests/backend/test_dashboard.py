@@ -0,0 +1,109 @@
+"""Tests for the precomputed dashboard snapshot."""
+import unittest
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from backend.api.dashboard import DashboardCache, refresh_snapshot
+from backend.app import create_app
+from backend.database.db import Database
+
+
+class TestDashboard(unittest.TestCase):
+    """Test /api/dashboard and snapshot refreshes."""
+
+    def setUp(self):
+        """Set up test database with a few articles."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = Database(db_path=os.path.join(self.temp_dir, "test.db"))
+        self.db.create_tables()
+        self._insert("AI", "u1", 0.5)
+        self._insert("Rust", "u2", -0.5)
+        self.app = create_app(db=self.db)
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        """Clean up test database."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _insert(self, keyword, url, score):
+        self.db.insert_sentiment(keyword=keyword, source="news", title="t", content="c",
+                                 url=url, sentiment_score=score, summary="s")
+
+    def test_payload_matches_individual_endpoints(self):
+        """One response carries what /api/stats, /api/keywords and /api/trends return."""
+        response = self.client.get("/api/dashboard")
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertTrue(data["success"])
+        self.assertEqual(data["stats"], self.client.get("/api/stats").get_json()["stats"])
+        self.assertEqual(data["keywords"], ["AI", "Rust"])
+        self.assertEqual(data["trends"], self.client.get("/api/trends").get_json()["data"])
+        self.assertEqual(data["generation"], self.db.get_data_generation())
+
+    def test_gzip_clients_get_stored_bytes(self):
+        """The stored compressed blob is sent unchanged with Content-Encoding."""
+        response = self.client.get("/api/dashboard", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(response.data, bytes(self.db.get_dashboard_snapshot()["body"]))
+        self.assertTrue(json.loads(gzip.decompress(response.data))["success"])
+
+    def test_etag_revalidation(self):
+        """A matching If-None-Match gets 304 until the data changes."""
+        etag = self.client.get("/api/dashboard").headers["ETag"]
+        response = self.client.get("/api/dashboard", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+
+        self._insert("AI", "u3", 0.1)
+        response = self.client.get("/api/dashboard", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        self.assertEqual(response.get_json()["stats"]["total_articles"], 3)
+
+    def test_etag_per_encoding(self):
+        """The gzip and identity bodies carry different ETags and vary on Accept-Encoding."""
+        plain = self.client.get("/api/dashboard")
+        gzipped = self.client.get("/api/dashboard", headers={"Accept-Encoding": "gzip"})
+        self.assertNotEqual(plain.headers["ETag"], gzipped.headers["ETag"])
+        self.assertIn("Accept-Encoding", gzipped.headers["Vary"])
+
+        response = self.client.get("/api/dashboard", headers={"If-None-Match": gzipped.headers["ETag"]})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get("/api/dashboard", headers={"If-None-Match": gzipped.headers["ETag"],
+                                                             "Accept-Encoding": "gzip"})
+        self.assertEqual(response.status_code, 304)
+
+    def test_built_once_per_generation(self):
+        """Repeated requests reuse the snapshot; other workers load the stored one."""
+        for _ in range(3):
+            self.client.get("/api/dashboard")
+        self.assertEqual(self.app.extensions["dashboard"].metrics(), {"hits": 2, "loads": 0, "builds": 1})
+
+        other_worker = DashboardCache(self.db)
+        other_worker.get()
+        self.assertEqual(other_worker.metrics(), {"hits": 0, "loads": 1, "builds": 0})
+
+    def test_refresh_after_load(self):
+        """refresh_snapshot rebuilds only when the generation moved."""
+        self.assertIsNotNone(refresh_snapshot(self.db))
+        self.assertIsNone(refresh_snapshot(self.db))
+        self._insert("Rust", "u3", 0.2)
+        snapshot = refresh_snapshot(self.db)
+        self.assertEqual(snapshot.generation, self.db.get_data_generation())
+
+        cache = self.app.extensions["dashboard"]
+        self.client.get("/api/dashboard")
+        self.assertEqual(cache.metrics()["loads"], 1)
+        self.assertEqual(cache.metrics()["builds"], 0)
+
+    def test_older_snapshot_does_not_overwrite_newer(self):
+        """A slow builder finishing late keeps the newer stored snapshot."""
+        self.assertTrue(self.db.save_dashboard_snapshot(5, "new", b"x", 1))
+        self.assertFalse(self.db.save_dashboard_snapshot(4, "old", b"y", 1))
+        self.assertEqual(self.db.get_dashboard_snapshot()["etag"], "new")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 """Tests for database operations."""
 import unittest
 import os
+import sqlite3
 import tempfile
 from backend.database.db import Database
 
@@ -123,6 +124,89 @@ class TestDatabase(unittest.TestCase):
         self.assertAlmostEqual(stats["average_sentiment"], 0.6, places=1)
 
 
+
+class TestArticleKeywords(unittest.TestCase):
+    """Test the article <-> keyword many-to-many model."""
+    
+    def setUp(self):
+        """Set up test database with schema."""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.temp_db.close()
+        self.db = Database(db_path=self.temp_db.name)
+        self.db.create_tables()
+    
+    def tearDown(self):
+        """Clean up test database."""
+        if os.path.exists(self.temp_db.name):
+            os.unlink(self.temp_db.name)
+    
+    def _insert(self, keyword, url="https://example.com/shared", score=0.5):
+        return self.db.insert_sentiment(
+            keyword=keyword,
+            source="news",
+            title="Python AI news",
+            content="Content",
+            url=url,
+            sentiment_score=score,
+            summary="Summary"
+        )
+    
+    def test_same_article_for_two_keywords(self):
+        """One article can belong to several keywords but is stored once."""
+        self.assertTrue(self._insert("AI"))
+        self.assertTrue(self._insert("Python", score=0.9))
+        self.assertFalse(self._insert("Python"))
+        
+        self.assertEqual(len(self.db.get_sentiments(keyword="AI")), 1)
+        self.assertEqual(len(self.db.get_sentiments(keyword="Python")), 1)
+        self.assertEqual(self.db.get_advanced_stats()["total_articles"], 1)
+        # The original score is kept; the article is not re-scored
+        self.assertEqual(self.db.get_sentiments(keyword="Python")[0]["sentiment_score"], 0.5)
+    
+    def test_link_keyword(self):
+        """Existing articles can be linked to a keyword without re-inserting."""
+        self._insert("AI")
+        self.assertEqual(self.db.get_existing_urls(["https://example.com/shared", "x"]), {"https://example.com/shared"})
+        self.assertTrue(self.db.link_keyword("https://example.com/shared", "Python"))
+        self.assertFalse(self.db.link_keyword("https://example.com/shared", "Python"))
+        self.assertFalse(self.db.link_keyword("https://example.com/missing", "Python"))
+        self.assertEqual(sorted(self.db.get_keywords()), ["AI", "Python"])
+    
+    def test_date_filters(self):
+        """Date range filters include the whole end day."""
+        self._insert("AI")
+        today = self.db.get_sentiments()[0]["created_at"][:10]
+        self.assertEqual(len(self.db.get_sentiments(start_date=today, end_date=today)), 1)
+        self.assertEqual(len(self.db.get_sentiments(end_date="2000-01-01")), 0)
+    
+    def test_migrates_legacy_table(self):
+        """Rows in the old single-table layout are migrated."""
+        os.unlink(self.temp_db.name)
+        conn = sqlite3.connect(self.temp_db.name)
+        conn.executescript("""
+        CREATE TABLE sentiments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            keyword TEXT NOT NULL,
+            source TEXT NOT NULL,
+            title TEXT,
+            content TEXT,
+            url TEXT UNIQUE,
+            sentiment_score REAL,
+            summary TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        INSERT INTO sentiments (keyword, source, title, url, sentiment_score)
+            VALUES ('AI', 'news', 'Old', 'https://example.com/old', 0.2);
+        """)
+        conn.close()
+        
+        self.db.create_tables()
+        rows = self.db.get_sentiments(keyword="AI")
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["url"], "https://example.com/old")
+        self.assertTrue(self._insert("Python", url="https://example.com/old"))
+
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -0,0 +1,131 @@
+"""Tests for trending term discovery."""
+import unittest
+import os
+import random
+import shutil
+import tempfile
+from collections import Counter
+from backend.app import create_app
+from backend.database.db import Database
+from backend.etl.discovery import CountMinSketch, SpaceSaving, TrendDiscovery, record_titles, terms
+
+DAY = 24 * 3600
+
+
+class TestSketches(unittest.TestCase):
+    """Test the counting structures and tokenization."""
+
+    def test_terms(self):
+        """Words and pairs are kept whole; stopwords and numbers do not bound n-grams."""
+        found = terms("Why Next.js 15 and C++ are the state of the art", max_ngram=2)
+        self.assertIn("next.js", found)
+        self.assertIn("c++", found)
+        self.assertNotIn("15", found)
+        self.assertNotIn("next.js 15", found)
+        self.assertNotIn("the", found)
+        self.assertIn("rust in production", terms("Rust in production", max_ngram=3))
+        self.assertNotIn("rust in", terms("Rust in production", max_ngram=3))
+
+    def test_space_saving_bounds(self):
+        """Every true heavy hitter is kept and count - error <= true count <= count."""
+        rng = random.Random(7)
+        stream = [f"t{min(int(rng.paretovariate(1.2)), 400)}" for _ in range(5000)]
+        truth = Counter(stream)
+        summary = SpaceSaving(capacity=50)
+        sketch = CountMinSketch(width=256, depth=4)
+        for term in stream:
+            summary.add(term)
+            sketch.add(term)
+
+        self.assertEqual(len(summary.counts), 50)
+        for term, (count, error) in summary.counts.items():
+            self.assertLessEqual(count - error, truth[term])
+            self.assertGreaterEqual(count, truth[term])
+        for term, count in truth.items():
+            if count > len(stream) / 50:
+                self.assertIn(term, summary.counts)
+            self.assertGreaterEqual(sketch.estimate(term), count)
+
+    def test_sketch_round_trip(self):
+        """Counters survive serialization."""
+        sketch = CountMinSketch(width=64, depth=3)
+        sketch.add("rust", 5)
+        restored = CountMinSketch(64, 3, sketch.to_bytes())
+        self.assertEqual(restored.estimate("rust"), 5)
+
+
+class TestTrendDiscovery(unittest.TestCase):
+    """Test windows stored in the database."""
+
+    def setUp(self):
+        """Set up test database."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = Database(db_path=os.path.join(self.temp_dir, "test.db"))
+        self.db.create_tables()
+        self.now = 10 * DAY
+        self.discovery = TrendDiscovery(self.db, window_hours=24, baseline_windows=2, capacity=20,
+                                        width=128, depth=3, clock=lambda: self.now)
+
+    def tearDown(self):
+        """Clean up test database."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_rising_terms(self):
+        """A term frequent only in the latest window ranks above steady ones."""
+        for day in range(3):
+            self.now = (10 + day) * DAY
+            titles = [f"Python tips part {i}" for i in range(5)]
+            if day == 2:
+                titles += [f"Trying Bun runtime {i}" for i in range(4)]
+            self.discovery.observe(titles)
+        self.now = 13 * DAY
+        self.discovery.observe(["Bun runtime again", "More Python tips"])
+
+        # Only the baseline windows and the current one are kept
+        self.assertEqual(len(self.db.get_discovery_windows(limit=10)), 3)
+        result = self.discovery.rising(min_count=1, tracked=["Python"])
+        self.assertEqual(result["window"]["titles"], 2)
+        self.assertEqual(result["baseline"]["titles"], 14)
+        ranked = [item["term"] for item in result["terms"]]
+        self.assertNotIn("python", ranked)
+        self.assertLess(ranked.index("again"), ranked.index("tips"))
+        self.assertLess(ranked.index("bun runtime"), ranked.index("tips"))
+
+    def test_concurrent_writers_merge(self):
+        """A save against a window changed in between is replayed, not lost."""
+        other = TrendDiscovery(self.db, window_hours=24, capacity=20, width=128, depth=3, clock=lambda: self.now)
+        save = self.db.save_discovery_window
+        calls = []
+
+        def racing_save(*args):
+            # Another process writes first the first time we try to save
+            if not calls:
+                calls.append(1)
+                other.observe(["Deno release notes"])
+            return save(*args)
+
+        self.db.save_discovery_window = racing_save
+        self.assertEqual(self.discovery.observe(["Deno is fast"]), 1)
+        result = self.discovery.rising(min_count=1)
+        self.assertEqual(result["window"]["titles"], 2)
+        self.assertEqual({item["term"]: item["count"] for item in result["terms"]}["deno"], 2)
+
+    def test_record_titles_dedupes_urls(self):
+        """An article tagged with several keywords is counted once."""
+        records = [{"url": "u1", "title": "Zig compiler"}, {"url": "u1", "title": "Zig compiler"}]
+        self.assertEqual(record_titles(self.discovery, records), 1)
+
+    def test_discover_endpoint(self):
+        """The endpoint reports the latest window and validates parameters."""
+        client = create_app(db=self.db).test_client()
+        self.assertEqual(client.get("/api/discover").get_json()["data"], [])
+
+        TrendDiscovery(self.db).observe(["Zig compiler", "Zig compiler news", "Zig compiler"])
+        data = client.get("/api/discover?min_count=2").get_json()
+        self.assertEqual(data["window"]["titles"], 3)
+        self.assertIn("zig compiler", [item["term"] for item in data["data"]])
+        self.assertEqual(client.get("/api/discover?limit=0").status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
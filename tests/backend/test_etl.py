@@ -1,8 +1,16 @@
 """Tests for ETL operations."""
 import unittest
+import os
+import shutil
+import sqlite3
+import tempfile
 from unittest.mock import Mock, patch
-from backend.etl.extract import DataExtractor
+from backend.database.db import Database
+from backend.etl.extract import DataExtractor, build_or_queries, match_keywords
+from backend.etl.keyword_matcher import KeywordMatcher, pack_queries, parse_aliases, tag_items
+from backend.etl.load import DataLoader
 from backend.etl.transform import SentimentTransformer
+from backend.models.sentiment import SentimentBatch, SentimentRecord
 
 
 class TestETLExtract(unittest.TestCase):
@@ -18,7 +26,7 @@ class TestETLExtract(unittest.TestCase):
         # This test verifies the extractor can be initialized
         self.assertIsNotNone(self.extractor)
     
-    @patch('backend.etl.extract.requests.get')
+    @patch('backend.etl.extract.http_client.get')
     def test_extract_news(self, mock_get):
         """Test News API extraction."""
         # Mock response
@@ -40,6 +48,101 @@ class TestETLExtract(unittest.TestCase):
         # This would require proper config setup
         # For now, just test the structure
         self.assertIsNotNone(self.extractor)
+    
+    def _post(self, post_id, title, selftext=""):
+        return Mock(id=post_id, title=title, selftext=selftext, permalink=f"/r/x/{post_id}",
+                    created_utc=1704067200)
+    
+    def test_keyword_matching(self):
+        """Keywords match as whole words, including punctuation-heavy ones."""
+        keywords = ["AI", "C++", "Next.js"]
+        self.assertEqual(match_keywords("Why I moved to next.js and C++", keywords), ["C++", "Next.js"])
+        self.assertEqual(match_keywords("He said it was fine", keywords), [])
+        self.assertEqual(build_or_queries(["AI", "Next.js"]), ['AI OR "Next.js"'])
+        self.assertEqual(len(build_or_queries(["a" * 300, "b" * 300])), 2)
+    
+    def test_keyword_matcher_aliases(self):
+        """Aliases count as their keyword and overlapping patterns are all found."""
+        aliases = parse_aliases("Next.js:NextJS|Next js, AI:Artificial Intelligence")
+        self.assertEqual(aliases, {"Next.js": ["NextJS", "Next js"], "AI": ["Artificial Intelligence"]})
+        matcher = KeywordMatcher(["Next.js", "AI", "he", "hers"], aliases)
+        self.assertEqual(matcher.match("Shipping NEXTJS apps with artificial intelligence"), ["Next.js", "AI"])
+        self.assertEqual(matcher.match("next js, said hers"), ["Next.js", "hers"])
+        self.assertEqual(matcher.match("ushers nextjsx"), [])
+    
+    def test_pack_queries(self):
+        """Queries stay under the limit and record the keywords they cover."""
+        queries = pack_queries(["AI", "Next.js", "Python"], max_length=20)
+        self.assertEqual(queries, [('AI OR "Next.js"', ["AI", "Next.js"]), ("Python", ["Python"])])
+        self.assertEqual(pack_queries(["AI", "Next.js"], 100, separator=" ", quote=False),
+                         [("AI Next.js", ["AI", "Next.js"])])
+    
+    def test_tag_items(self):
+        """Single-keyword results are trusted, combined ones tagged, duplicates dropped."""
+        matcher = KeywordMatcher(["AI", "Python"])
+        results = [
+            (["Rust"], {"url": "1", "title": "anything"}),
+            (["AI", "Python"], {"url": "2", "title": "Python and AI"}),
+            (["AI", "Python"], {"url": "2", "title": "Python and AI"}),
+            (["AI", "Python"], {"url": "3", "title": "More AI"}),
+        ]
+        tagged = tag_items(results, matcher, ["title"], limit=1)
+        self.assertEqual([(k, item["url"]) for k, item in tagged], [("Rust", "1"), ("AI", "2"), ("Python", "2")])
+    
+    @patch('backend.etl.extract.http_client.get')
+    def test_extract_news_multi(self, mock_get):
+        """All keywords are fetched with one NewsAPI request and tagged locally."""
+        mock_response = Mock()
+        mock_response.json.return_value = {
+            "status": "ok",
+            "articles": [
+                {"title": "NextJS meets AI", "content": "c", "url": "u1", "publishedAt": "2024-01-01T00:00:00Z"},
+                {"title": "Python 4", "content": "c", "url": "u2", "publishedAt": "2024-01-01T00:00:00Z"},
+                {"title": "Off topic", "content": "c", "url": "u3", "publishedAt": "2024-01-01T00:00:00Z"},
+            ]
+        }
+        mock_get.return_value = mock_response
+        
+        with patch('backend.etl.extract.Config.NEWS_API_KEY', "key"):
+            records = self.extractor.extract_news_multi(["Next.js", "AI", "Python"], limit=2)
+        
+        mock_get.assert_called_once()
+        params = mock_get.call_args[1]["params"]
+        self.assertEqual(params["q"], '"Next.js" OR AI OR Python')
+        self.assertEqual(params["pageSize"], 6)
+        self.assertEqual([(r["keyword"], r["url"]) for r in records],
+                         [("Next.js", "u1"), ("AI", "u1"), ("Python", "u2")])
+    
+    def test_extract_reddit_multi(self):
+        """All keywords are fetched with one multireddit search and tagged locally."""
+        self.extractor.reddit = Mock()
+        multireddit = self.extractor.reddit.subreddit.return_value
+        multireddit.search.return_value = [
+            self._post("1", "Python and AI in 2024"),
+            self._post("2", "Unrelated post"),
+            self._post("3", "More Python"),
+        ]
+        
+        records = self.extractor.extract_reddit_multi(["Python", "AI"], limit=1,
+                                                      subreddits=["programming", "webdev"])
+        
+        self.extractor.reddit.subreddit.assert_called_once_with("programming+webdev")
+        multireddit.search.assert_called_once()
+        self.assertEqual(multireddit.search.call_args[0][0], "Python OR AI")
+        self.assertEqual([(r["keyword"], r["url"]) for r in records],
+                         [("Python", "https://reddit.com/r/x/1"), ("AI", "https://reddit.com/r/x/1")])
+    
+    def test_stream_reddit(self):
+        """The stream yields matching records and passes idle ticks through."""
+        self.extractor.reddit = Mock()
+        stream = self.extractor.reddit.subreddit.return_value.stream.submissions
+        stream.return_value = iter([self._post("1", "Rust news"), None, self._post("2", "AI news")])
+        
+        records = list(self.extractor.stream_reddit(["AI"], subreddits=["technology"]))
+        
+        self.assertEqual(stream.call_args[1]["skip_existing"], True)
+        self.assertIsNone(records[0])
+        self.assertEqual(records[1]["keyword"], "AI")
 
 
 class TestETLTransform(unittest.TestCase):
@@ -71,6 +174,71 @@ class TestETLTransform(unittest.TestCase):
         self.assertTrue(hasattr(self.transformer, 'analyze_sentiment'))
 
 
+class TestETLLoad(unittest.TestCase):
+    """Test batch validation and loading."""
+    
+    def setUp(self):
+        """Set up test database and loader."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = Database(db_path=os.path.join(self.temp_dir, "test.db"))
+        self.db.create_tables()
+        self.loader = DataLoader(db=self.db)
+    
+    def tearDown(self):
+        """Clean up test database."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _record(self, keyword, url, score=0.5, source="news"):
+        return {"keyword": keyword, "source": source, "title": f"title {url}", "content": "c",
+                "url": url, "sentiment_score": score, "summary": "s", "model": "m"}
+    
+    def test_batch_validation(self):
+        """Scores outside [-1, 1], unparseable scores and missing keys are rejected together."""
+        batch = SentimentBatch.from_dicts([
+            self._record("AI", "u1"), self._record("AI", "u2", score=1.5), self._record("", "u3"),
+            self._record("AI", "u4", score="bad"), self._record("AI", "u5", source=None),
+        ])
+        self.assertEqual(batch.valid_mask().tolist(), [True, False, False, False, False])
+        valid, invalid = batch.split()
+        self.assertEqual(([row[4] for row in valid], len(invalid)), (["u1"], 4))
+        
+        record = SentimentRecord("AI", "news", "t", "c", "u", 0.5, "s")
+        self.assertFalse(hasattr(record, "__dict__"))
+        self.assertEqual(record.to_row()[:6], ("AI", "news", "t", "c", "u", 0.5))
+    
+    def test_load_batch(self):
+        """Rows are stored per keyword with executemany; duplicates and invalid rows are counted."""
+        self.db.insert_sentiment(keyword="AI", source="news", title="t", content="c", url="u1",
+                                 sentiment_score=0.1, summary="s")
+        stats = self.loader.load_batch([
+            self._record("AI", "u1"), self._record("AI", "u2"), self._record("Python", "u2"),
+            self._record("Python", "u3", score=2.0),
+        ])
+        self.assertEqual(stats, {"loaded": 2, "duplicates": 1, "errors": 1})
+        with self.db.get_connection() as conn:
+            models = dict(conn.execute("SELECT url, model FROM articles").fetchall())
+        self.assertEqual(models, {"u1": None, "u2": "m"})
+        self.assertEqual(sorted((row["keyword"], row["url"]) for row in self.db.get_sentiments()),
+                         [("AI", "u1"), ("AI", "u2"), ("Python", "u2")])
+        self.assertEqual(sum(row["articles"] for row in self.db.get_daily_aggregates()), 3)
+    
+    def test_load_batch_falls_back_to_rows(self):
+        """A failed batch transaction is retried row by row; each row is counted once."""
+        self.db.insert_sentiment(keyword="AI", source="news", title="t", content="c", url="u0",
+                                 sentiment_score=0.1, summary="s")
+        insert = self.db.insert_sentiments
+
+        def flaky(rows):
+            if len(rows) > 1 or rows[0][4] == "u2":
+                raise sqlite3.OperationalError("locked")
+            return insert(rows)
+
+        with patch.object(self.db, "insert_sentiments", side_effect=flaky):
+            stats = self.loader.load_batch([self._record("AI", "u0"), self._record("AI", "u1"),
+                                            self._record("AI", "u2")])
+        self.assertEqual(stats, {"loaded": 1, "duplicates": 1, "errors": 1})
+
+
 if __name__ == "__main__":
     unittest.main()
 
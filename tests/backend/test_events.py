@@ -0,0 +1,116 @@
+"""Tests for the change feed and the /api/stream endpoint."""
+import unittest
+import json
+import os
+import shutil
+import tempfile
+from backend.app import create_app
+from backend.api.events import ChangeFeed, EventBus
+from backend.database.db import Database
+
+
+def parse_events(chunks):
+    """Split SSE bytes into (event, id, data) tuples, ignoring comments."""
+    events = []
+    for block in b"".join(chunks).decode("utf-8").split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line and not line.startswith(":"))
+        if "event" in fields:
+            events.append((fields["event"], fields.get("id"), json.loads(fields["data"])))
+    return events
+
+
+class TestEvents(unittest.TestCase):
+    """Test delta events, resume and the SSE endpoint."""
+
+    def setUp(self):
+        """Set up test database with one article and a feed at its end."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = Database(db_path=os.path.join(self.temp_dir, "test.db"))
+        self.db.create_tables()
+        self._insert("AI", "u1", 0.5)
+        self.bus = EventBus(buffer_size=4)
+        self.feed = ChangeFeed(self.db, self.bus)
+
+    def tearDown(self):
+        """Clean up test database."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _insert(self, keyword, url, score):
+        self.db.insert_sentiment(keyword=keyword, source="news", title="t", content="c",
+                                 url=url, sentiment_score=score, summary="s")
+
+    def _read(self, seq):
+        payloads, _, _ = self.bus.events_after(seq)
+        return parse_events(payloads)
+
+    def test_publishes_only_deltas(self):
+        """New links produce an articles and an aggregates event; no change, no event."""
+        self.assertEqual(self.feed.poll(), 0)
+        self._insert("AI", "u2", -0.5)
+        self._insert("Rust", "u2", -0.5)
+        self.assertEqual(self.feed.poll(), 2)
+
+        events = self._read(0)
+        self.assertEqual([e[0] for e in events], ["articles", "aggregates"])
+        self.assertEqual([a["url"] for a in events[0][2]], ["u2", "u2"])
+        totals = {row["keyword"]: row for row in events[1][2]}
+        self.assertEqual(totals["AI"]["articles"], 2)
+        self.assertEqual(totals["AI"]["sentiment"], 0.0)
+        self.assertEqual(totals["Rust"]["articles"], 1)
+        self.assertEqual(events[0][1], str(self.feed.cursor))
+
+    def test_score_update_publishes_refresh(self):
+        """Changes that add no links are signalled with a refresh event."""
+        with self.db.get_connection() as conn:
+            conn.execute("UPDATE articles SET sentiment_score = 0.9")
+        self.feed.poll()
+        self.assertEqual([e[0] for e in self._read(0)], ["refresh"])
+
+    def test_resume_from_buffer_and_database(self):
+        """Last-Event-ID resumes from the buffer, or from SQLite once evicted."""
+        start = self.feed.cursor
+        for i in range(3):
+            self._insert("AI", f"n{i}", 0.1)
+            self.feed.poll()
+        # Resuming after the second poll returns only the third one
+        resume = self.bus.seq_after_event_id(self.feed.cursor - 1)
+        self.assertEqual([e[1] for e in self._read(resume)], [str(self.feed.cursor)] * 2)
+
+        # The buffer holds 4 events (2 polls); the first poll is only in the database
+        self.assertIsNone(self.bus.seq_after_event_id(start))
+        replayed = parse_events(self.feed.replay(start))
+        self.assertEqual([a["url"] for e in replayed if e[0] == "articles" for a in e[2]], ["n0", "n1", "n2"])
+
+    def test_replay_is_capped(self):
+        """A client too far behind gets one refresh event at the cursor instead of the history."""
+        start = self.feed.cursor
+        for i in range(3):
+            self._insert("AI", f"n{i}", 0.1)
+        self.feed.poll()
+        self.feed.replay_limit = 2
+        self.assertEqual(parse_events(self.feed.replay(start)),
+                         [("refresh", str(self.feed.cursor), {"reason": "too_far_behind"})])
+        self.feed.replay_limit = 3
+        self.assertEqual(len(parse_events(self.feed.replay(start))), 2)
+
+    def test_stream_endpoint(self):
+        """The endpoint replays missed events and ends when the bus closes."""
+        app = create_app(db=self.db)
+        client = app.test_client()
+        self.assertEqual(client.get("/api/stream", headers={"Last-Event-ID": "x"}).status_code, 400)
+
+        response = client.get("/api/stream", headers={"Last-Event-ID": "0"}, buffered=False)
+        self.assertEqual(response.mimetype, "text/event-stream")
+        chunks = response.iter_encoded()
+        received = [next(chunks), next(chunks), next(chunks)]
+        app.extensions["change_feed"].stop()
+        received.extend(chunks)
+        response.close()
+
+        events = parse_events(received)
+        self.assertEqual([e[0] for e in events], ["articles", "aggregates"])
+        self.assertEqual(events[0][2][0]["url"], "u1")
+
+
+if __name__ == "__main__":
+    unittest.main()
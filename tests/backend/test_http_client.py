@@ -0,0 +1,109 @@
+"""Tests for the pooled HTTP client and its response cache."""
+import unittest
+import os
+import shutil
+import tempfile
+from unittest.mock import Mock
+import requests
+from backend.etl.http_client import HttpClient, parse_ttls
+
+URL = "https://hn.algolia.com/api/v1/search"
+
+
+class FakeClock:
+    """Clock advanced by hand."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def reply(status=200, body=b'{"hits": []}', headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.headers.update(headers or {})
+    return response
+
+
+class TestHttpClient(unittest.TestCase):
+    """Test fresh hits, revalidation and what is never cached."""
+
+    def setUp(self):
+        """Set up a client on a temporary cache directory and a fake session."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.clock = FakeClock()
+        self.client = HttpClient(cache_dir=self.temp_dir, ttls=parse_ttls("hn.algolia.com=300, newsapi.org=900"),
+                                 clock=self.clock)
+        self.session = Mock()
+        self.client._session = self.session
+
+    def tearDown(self):
+        """Clean up the cache directory."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_fresh_responses_cost_nothing(self):
+        """Within the TTL a repeated query is answered from disk."""
+        self.session.get.return_value = reply(headers={"Content-Type": "application/json"})
+        self.assertEqual(self.client.get(URL, params={"query": "AI"}, timeout=5).json(), {"hits": []})
+        self.assertIsNone(self.client.lookup(URL, {"query": "Python"}))
+
+        self.clock.now += 299
+        cached = self.client.lookup(URL, {"query": "AI"})
+        self.assertEqual((cached.status_code, cached.json()), (200, {"hits": []}))
+        self.assertEqual(self.client.get(URL, params={"query": "AI"}).json(), {"hits": []})
+        self.assertEqual(self.session.get.call_count, 1)
+        self.assertEqual(self.client.metrics()["hits"], 2)
+
+        self.clock.now += 1
+        self.assertIsNone(self.client.lookup(URL, {"query": "AI"}))
+
+    def test_revalidation(self):
+        """Stale responses are revalidated; a 304 reuses the stored body."""
+        self.session.get.return_value = reply(headers={"ETag": '"v1"', "Last-Modified": "Mon, 19 Oct 2026 10:00:00 GMT"})
+        self.client.get(URL, params={"query": "AI"})
+
+        self.clock.now += 600
+        self.session.get.return_value = reply(status=304, body=b"")
+        self.assertEqual(self.client.get(URL, params={"query": "AI"}).json(), {"hits": []})
+        headers = self.session.get.call_args[1]["headers"]
+        self.assertEqual((headers["If-None-Match"], headers["If-Modified-Since"]),
+                         ('"v1"', "Mon, 19 Oct 2026 10:00:00 GMT"))
+        # The 304 restarted the freshness window
+        self.assertIsNotNone(self.client.lookup(URL, {"query": "AI"}))
+        self.assertEqual(self.client.metrics()["revalidated"], 1)
+
+    def test_not_cached(self):
+        """Error replies and hosts without a TTL always go to the network; keys stay off disk."""
+        self.session.get.return_value = reply(status=429, body=b"{}")
+        self.client.get("https://newsapi.org/v2/everything", params={"q": "AI", "apiKey": "secret"})
+        self.assertIsNone(self.client.lookup("https://newsapi.org/v2/everything", {"q": "AI", "apiKey": "secret"}))
+
+        self.session.get.return_value = reply()
+        self.client.get("https://newsapi.org/v2/everything", params={"q": "AI", "apiKey": "secret"})
+        self.client.get("https://example.com/api", params={"q": "AI"})
+        self.client.get("https://example.com/api", params={"q": "AI"})
+        self.assertEqual(self.session.get.call_count, 4)
+
+        for root, _, files in os.walk(self.temp_dir):
+            for name in files:
+                with open(os.path.join(root, name), "rb") as f:
+                    self.assertNotIn(b"secret", f.read())
+
+    def test_prune(self):
+        """Only the newest `max_entries` responses are kept."""
+        self.client.max_entries = 2
+        self.session.get.return_value = reply()
+        for i in range(4):
+            self.client.get(URL, params={"query": str(i)})
+            path = self.client._paths(URL, {"query": str(i)})[0]
+            os.utime(path, (i, i))
+        self.assertEqual(self.client.prune(), 2)
+        self.assertIsNone(self.client.lookup(URL, {"query": "0"}))
+        self.assertIsNotNone(self.client.lookup(URL, {"query": "3"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
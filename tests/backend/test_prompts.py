@@ -0,0 +1,144 @@
+"""Tests for prompt construction and LLM usage accounting."""
+import unittest
+import json
+import os
+import tempfile
+from unittest.mock import Mock
+from backend.etl.prompts import (RECENT_CALLS, ParseError, UsageTracker, build_score_prompt,
+                                 build_sentiment_prompt, estimate_tokens, generate_structured, parse_sentiment,
+                                 truncate_text)
+
+
+class TestPrompts(unittest.TestCase):
+    """Test truncation and prompt budgets."""
+
+    def test_truncation_keeps_title_and_lead_sentences(self):
+        """Whole lead sentences are kept within the budget."""
+        content = "First sentence here. Second one follows! " + "Filler sentence. " * 100
+        text = truncate_text("Big news", content, max_tokens=15)
+        self.assertEqual(text, "Big news\nFirst sentence here. Second one follows!")
+        self.assertLessEqual(len(text), 15 * 4)
+
+    def test_truncation_of_long_first_sentence(self):
+        """A sentence longer than the budget is cut at a word boundary."""
+        text = truncate_text("Title", "word " * 200, max_tokens=20)
+        self.assertTrue(text.startswith("Title\nword"))
+        self.assertTrue(text.endswith("…"))
+        self.assertLessEqual(len(text), 20 * 4)
+
+    def test_repeated_title_is_dropped(self):
+        """Content that starts with the title does not repeat it."""
+        self.assertEqual(truncate_text("Rust 2.0", "Rust 2.0. It is out.", 50), "Rust 2.0\nIt is out.")
+
+    def test_prompts_are_compact(self):
+        """Prompts stay within the budget plus the shared header."""
+        prompt = build_sentiment_prompt("Python", "Title", "Body text. " * 500, max_tokens=100)
+        self.assertIn("Python", prompt)
+        self.assertIn("sentiment_score", prompt)
+        self.assertLess(estimate_tokens(prompt), 100 + 60)
+
+        score_prompt = build_score_prompt(None, "A headline")
+        self.assertNotIn("{keyword}", score_prompt)
+        self.assertIn("A headline", score_prompt)
+
+
+class TestUsageTracker(unittest.TestCase):
+    """Test usage recording and totals."""
+
+    def test_reported_and_estimated_usage(self):
+        """SDK token counts are used when present and estimated otherwise."""
+        tracker = UsageTracker()
+        model = Mock()
+        model.generate_content.return_value = Mock(
+            text="0.5", usage_metadata=Mock(prompt_token_count=40, candidates_token_count=3))
+        tracker.generate(model, "prompt")
+
+        model.generate_content.return_value = Mock(text="0.5", usage_metadata=None)
+        tracker.generate(model, "x" * 80)
+
+        model.generate_content.side_effect = RuntimeError("429")
+        with self.assertRaises(RuntimeError):
+            tracker.generate(model, "prompt")
+
+        totals = tracker.totals()
+        self.assertEqual(totals["calls"], 3)
+        self.assertEqual(totals["failures"], 1)
+        self.assertEqual(totals["prompt_tokens"], 40 + 20 + 2)
+        self.assertEqual(totals["output_tokens"], 3 + 1)
+        self.assertTrue(totals["estimated"])
+
+        tracker.reset()
+        self.assertEqual(tracker.totals()["calls"], 0)
+
+    def test_usage_log(self):
+        """Every call is appended to the JSON-lines log."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "usage.jsonl")
+            tracker = UsageTracker(log_path=path)
+            tracker.record("prompt", latency=0.25, label="test")
+            with open(path, encoding="utf-8") as f:
+                entry = json.loads(f.readline())
+            self.assertEqual(entry["label"], "test")
+            self.assertEqual(entry["latency"], 0.25)
+
+    def test_records_are_bounded(self):
+        """Long-running processes keep only recent records but count every call."""
+        tracker = UsageTracker()
+        for _ in range(RECENT_CALLS + 10):
+            tracker.record("x" * 8, latency=0.5)
+        self.assertEqual(len(tracker.records), RECENT_CALLS)
+        totals = tracker.totals()
+        self.assertEqual(totals["calls"], RECENT_CALLS + 10)
+        self.assertEqual(totals["prompt_tokens"], 2 * (RECENT_CALLS + 10))
+        self.assertEqual(totals["latency_p50"], 0.5)
+
+
+class TestStructuredOutput(unittest.TestCase):
+    """Test strict parsing and the repair retry."""
+
+    def test_parse_is_strict(self):
+        """Only a well-formed object with an in-range score is accepted."""
+        self.assertEqual(parse_sentiment('{"sentiment_score": 0.5, "summary": "ok"}'),
+                         {"sentiment_score": 0.5, "summary": "ok"})
+        self.assertEqual(parse_sentiment('```json\n{"sentiment_score": -1}\n```', require_summary=False),
+                         {"sentiment_score": -1.0})
+        for bad in ("Score for Web3: 0.8", '{"sentiment_score": 3}', '{"sentiment_score": true}',
+                    '{"sentiment_score": "0.5", "summary": "x"}', '{"sentiment_score": 0.1, "summary": ""}',
+                    "[0.5]", ""):
+            with self.assertRaises(ParseError, msg=bad):
+                parse_sentiment(bad)
+
+    def _model(self, *texts):
+        model = Mock()
+        model.generate_content.side_effect = [Mock(text=t, usage_metadata=None) for t in texts]
+        return model
+
+    def test_schema_is_requested(self):
+        """Calls carry a JSON response schema."""
+        tracker = UsageTracker()
+        model = self._model('{"sentiment_score": 0.2}')
+        self.assertEqual(generate_structured(model, "p", tracker, require_summary=False),
+                         {"sentiment_score": 0.2})
+        config = model.generate_content.call_args[1]["generation_config"]
+        self.assertEqual(config["response_mime_type"], "application/json")
+        self.assertEqual(config["response_schema"]["required"], ["sentiment_score"])
+        self.assertEqual(tracker.totals()["parse_failures"], 0)
+
+    def test_one_repair_retry(self):
+        """A malformed reply gets exactly one repair call and is counted."""
+        tracker = UsageTracker()
+        model = self._model("0.8 I think", '{"sentiment_score": 0.8}')
+        self.assertEqual(generate_structured(model, "p", tracker, require_summary=False)["sentiment_score"], 0.8)
+        self.assertIn("could not be used", model.generate_content.call_args[0][0])
+
+        model = self._model("nope", "still nope")
+        self.assertIsNone(generate_structured(model, "p", tracker, require_summary=False))
+        self.assertEqual(model.generate_content.call_count, 2)
+
+        totals = tracker.totals()
+        self.assertEqual((totals["parse_failures"], totals["repairs"], totals["repaired"]), (2, 2, 1))
+        self.assertEqual(totals["wasted_calls"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
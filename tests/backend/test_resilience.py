@@ -0,0 +1,111 @@
+"""Tests for source deadlines, circuit breakers and hedged requests."""
+import unittest
+import threading
+from unittest.mock import Mock, patch
+import requests
+from backend.etl import resilience
+from backend.etl.extract import DataExtractor
+from backend.etl.resilience import CircuitOpen, DeadlineExceeded, Resilience
+
+
+class FakeClock:
+    """Clock advanced by hand."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def failing(*args, **kwargs):
+    raise ConnectionError("down")
+
+
+class TestResilience(unittest.TestCase):
+    """Test one source's breaker, deadline and hedging."""
+
+    def setUp(self):
+        """Set up a registry on a fake clock."""
+        self.clock = FakeClock()
+        self.sources = Resilience(threshold=2, reset_timeout=60, clock=self.clock)
+
+    def test_breaker_opens_and_recovers(self):
+        """Failures open the circuit; after the cool-down one trial call decides."""
+        for _ in range(2):
+            with self.assertRaises(ConnectionError):
+                self.sources.call("news", failing)
+        fn = Mock(return_value="ok")
+        with self.assertRaises(CircuitOpen):
+            self.sources.call("news", fn)
+        fn.assert_not_called()
+
+        self.clock.now = 61
+        with self.assertRaises(ConnectionError):
+            self.sources.call("news", failing)
+        self.assertEqual(self.sources.metrics()["news"]["state"], "open")
+
+        self.clock.now = 122
+        self.assertEqual(self.sources.call("news", fn), "ok")
+        metrics = self.sources.metrics()["news"]
+        self.assertEqual((metrics["state"], metrics["calls"], metrics["failures"], metrics["skipped"]),
+                         ("closed", 4, 3, 1))
+
+    def test_deadline(self):
+        """Timeouts are cut to the time left; nothing starts after the deadline."""
+        fn = Mock(return_value="ok")
+        with resilience.deadline(5, clock=self.clock):
+            self.clock.now = 3
+            self.sources.call("hackernews", fn, timeout=10)
+            self.assertEqual(fn.call_args[1]["timeout"], 2)
+            self.clock.now = 6
+            with self.assertRaises(DeadlineExceeded):
+                self.sources.call("hackernews", fn, timeout=10)
+        self.assertEqual(fn.call_count, 1)
+        self.assertIsNone(resilience.remaining())
+
+    def test_hedged_request(self):
+        """A slow first attempt is raced by a duplicate; the first reply wins."""
+        sources = Resilience(hedged=["hackernews"], hedge_delay=0.01)
+        release = threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            if len(calls) == 1:
+                release.wait(5)
+                return "slow"
+            return "fast"
+
+        try:
+            self.assertEqual(sources.call("hackernews", fetch), "fast")
+        finally:
+            release.set()
+        metrics = sources.metrics()["hackernews"]
+        self.assertEqual((metrics["hedged"], metrics["hedge_wins"]), (1, 1))
+        self.assertEqual(sources.call("hackernews", lambda: "ok", hedge=False), "ok")
+
+
+class TestExtractorResilience(unittest.TestCase):
+    """Test the extractors against a failing source."""
+
+    def tearDown(self):
+        """Close the circuits opened by the test."""
+        resilience.sources.reset()
+
+    @patch('backend.etl.extract.http_client.get')
+    def test_failing_news_is_skipped(self, mock_get):
+        """Once the circuit opens, later searches are not sent."""
+        mock_get.side_effect = requests.exceptions.ConnectionError("down")
+        extractor = DataExtractor()
+        with patch('backend.etl.extract.Config.NEWS_API_KEY', "key"), \
+                patch.object(resilience.sources, "threshold", 1):
+            resilience.sources.reset()
+            self.assertEqual(extractor.extract_news("AI"), [])
+            self.assertEqual(extractor.extract_news("Python"), [])
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(resilience.sources.metrics()["news"]["skipped"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""Tests for retention tiers and cold storage."""
+import unittest
+import os
+import shutil
+import tempfile
+from backend.app import create_app
+from backend.database.codecs import AVAILABLE_CODECS, compress, decompress
+from backend.database.db import Database
+from backend.database.retention import RetentionManager
+
+
+class TestRetention(unittest.TestCase):
+    """Test archiving, transparent reads and vacuum."""
+
+    def setUp(self):
+        """Set up test database with one old and one recent article."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = Database(db_path=os.path.join(self.temp_dir, "test.db"))
+        self.db.create_tables()
+        for url in ("old", "new"):
+            self.db.insert_sentiment(keyword="AI", source="news", title=f"{url} title",
+                                     content=f"{url} content " * 50, url=url,
+                                     sentiment_score=0.5, summary=f"{url} summary")
+        with self.db.get_connection() as conn:
+            conn.execute("UPDATE articles SET created_at = datetime('now', '-90 days') WHERE url = 'old'")
+        self.manager = RetentionManager(self.db, hot_days=30, batch_size=1, vacuum_pages=100)
+
+    def tearDown(self):
+        """Clean up test database."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _article_id(self, url):
+        with self.db.get_connection() as conn:
+            return conn.execute("SELECT id FROM articles WHERE url = ?", (url,)).fetchone()[0]
+
+    def test_codecs_roundtrip(self):
+        """Every available codec restores the original bytes."""
+        for codec in AVAILABLE_CODECS:
+            self.assertEqual(decompress(compress(b"hello" * 100, codec), codec), b"hello" * 100)
+
+    def test_archives_only_cold_rows(self):
+        """Old rows lose inline text, recent rows keep it."""
+        self.assertEqual(self.manager.archive(), 1)
+        self.assertEqual(self.manager.archive(), 0)
+
+        with self.db.get_connection() as conn:
+            rows = dict(conn.execute("SELECT url, content FROM articles").fetchall())
+        self.assertIsNone(rows["old"])
+        self.assertTrue(rows["new"].startswith("new content"))
+
+    def test_transparent_decompression(self):
+        """A single archived article is returned with its text restored."""
+        self.manager.archive()
+        article = self.db.get_article(self._article_id("old"))
+        self.assertTrue(article["archived"])
+        self.assertEqual(article["summary"], "old summary")
+        self.assertTrue(article["content"].startswith("old content"))
+        self.assertEqual(article["keywords"], ["AI"])
+
+        client = create_app(db=self.db).test_client()
+        response = client.get(f"/api/articles/{self._article_id('old')}")
+        self.assertEqual(response.get_json()["data"]["summary"], "old summary")
+        self.assertEqual(client.get("/api/articles/999").status_code, 404)
+
+    def test_archiving_keeps_aggregates_and_search(self):
+        """Scores, rollups and title search are unaffected by archiving."""
+        before = self.db.get_daily_aggregates()
+        self.manager.archive()
+        self.assertEqual(before, self.db.get_daily_aggregates())
+        self.assertEqual(len(self.db.search("old title")["results"]), 1)
+
+    def test_search_after_archive(self):
+        """Archived articles still match on their summary and content."""
+        self.assertEqual(len(self.db.search("content")["results"]), 2)
+        self.manager.archive()
+        self.assertEqual(len(self.db.search("content")["results"]), 2)
+        results = self.db.search("old summary")["results"]
+        self.assertEqual([result["id"] for result in results], [self._article_id("old")])
+
+    def test_search_snippet_after_archive(self):
+        """Body hits on archived articles get a snippet from the archived text."""
+        self.manager.archive()
+        results = self.db.search("content")["results"]
+        snippets = {result["id"]: result["snippet"] for result in results}
+        self.assertIsNotNone(snippets[self._article_id("old")])
+        self.assertIn("<mark>content</mark>", snippets[self._article_id("old")])
+        self.assertTrue(snippets[self._article_id("old")].startswith("old <mark>content</mark>"))
+
+    def test_vacuum_reclaims_pages(self):
+        """New databases use incremental vacuum and it shrinks the free list."""
+        with self.db.get_connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA auto_vacuum").fetchone()[0], 2)
+        stats = self.manager.run()
+        self.assertEqual(stats["archived"], 1)
+        self.assertLessEqual(stats["free_pages_after"], stats["free_pages_before"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+"""Tests for the adaptive refresh scheduler."""
+import random
+import unittest
+from backend.etl.scheduler import RefreshScheduler
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestRefreshScheduler(unittest.TestCase):
+    """Test adaptive interval computation and budgeting."""
+
+    def setUp(self):
+        """Set up a scheduler with a fake clock and no jitter."""
+        self.clock = FakeClock(1000.0)
+        self.fetched = []
+        self.results = {}
+
+        def fetch(keywords):
+            self.fetched.extend(keywords)
+            return self.results.get(keywords[0], [])
+
+        self.scheduler = RefreshScheduler(
+            keywords=["AI", "Rust"],
+            fetch_fn=fetch,
+            min_interval=60,
+            max_interval=3600,
+            hourly_budget=100,
+            target_items=2,
+            jitter=0.0,
+            clock=self.clock,
+            rng=random.Random(0),
+        )
+
+    def test_hot_keyword_refreshes_sooner(self):
+        """A keyword with more new items gets a shorter interval."""
+        for keyword in ("AI", "Rust"):
+            self.scheduler.record_fetch(keyword, {}, now=0)
+        self.scheduler.record_fetch("AI", {"news": 20, "hackernews": 10}, now=600)
+        self.scheduler.record_fetch("Rust", {"news": 1}, now=600)
+
+        ai = self.scheduler.states["AI"]
+        rust = self.scheduler.states["Rust"]
+        self.assertLess(ai.interval, rust.interval)
+        self.assertGreater(ai.velocity, rust.velocity)
+        self.assertIn("hackernews", ai.rates)
+
+    def test_intervals_are_clamped(self):
+        """Intervals stay within the configured bounds."""
+        self.scheduler.record_fetch("AI", {}, now=0)
+        self.scheduler.record_fetch("AI", {"news": 10000}, now=60)
+        self.assertEqual(self.scheduler.states["AI"].interval, 60)
+
+        self.scheduler.record_fetch("Rust", {}, now=0)
+        self.scheduler.record_fetch("Rust", {}, now=60)
+        self.assertEqual(self.scheduler.states["Rust"].interval, 3600)
+
+    def test_explicit_zero_and_jitter_stay_in_bounds(self):
+        """An explicit 0 is kept and jitter never pushes a run past max_interval."""
+        scheduler = RefreshScheduler(keywords=["AI"], fetch_fn=lambda keywords: [], min_interval=0,
+                                     max_interval=3600, jitter=0.5, clock=self.clock, rng=random.Random(1))
+        self.assertEqual(scheduler.min_interval, 0)
+        for now in range(0, 20 * 3600, 3600):
+            scheduler.record_fetch("AI", {}, now=now)
+            self.assertLessEqual(scheduler.states["AI"].next_run, now + 3600)
+
+    def test_budget_limits_refreshes(self):
+        """run_pending stops once the hourly budget is spent."""
+        self.scheduler.hourly_budget = 1
+        self.scheduler._tokens = 1.0
+        self.clock.now = 10 ** 6
+        self.scheduler._tokens_updated = self.clock.now
+
+        refreshed = self.scheduler.run_pending()
+        self.assertEqual(len(refreshed), 1)
+        self.assertEqual(self.fetched, refreshed)
+
+    def test_run_pending_counts_sources(self):
+        """Fetched articles are counted per source and schedule the next run."""
+        self.results["AI"] = [
+            {"source": "news"}, {"source": "news"}, {"status": "completed_no_new_data"}
+        ]
+        self.clock.now = 10 ** 6
+        self.scheduler.run_pending()
+
+        self.assertCountEqual(self.fetched, ["AI", "Rust"])
+        for state in self.scheduler.states.values():
+            self.assertGreater(state.next_run, self.clock.now)
+        self.assertEqual(self.scheduler.due_keywords(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+"""Tests for full-text search."""
+import unittest
+import os
+import tempfile
+from backend.app import create_app
+from backend.database.db import Database, build_match_query, decode_search_cursor
+
+
+class TestSearch(unittest.TestCase):
+    """Test the FTS5 index, ranking and pagination."""
+
+    def setUp(self):
+        """Set up test database with a few articles."""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.temp_db.close()
+        self.db = Database(db_path=self.temp_db.name)
+        self.db.create_tables()
+
+        articles = [
+            ("Rust", "Rust compile times improve", "Faster builds", "The new compiler cuts compile times."),
+            ("Rust", "Cargo workspaces", "Tips", "Rust compile caching with sccache."),
+            ("Python", "Python 3.13 released", "New release", "Free-threaded build available."),
+        ]
+        for i, (keyword, title, summary, content) in enumerate(articles):
+            self.db.insert_sentiment(
+                keyword=keyword,
+                source="news",
+                title=title,
+                content=content,
+                url=f"https://example.com/{i}",
+                sentiment_score=0.5,
+                summary=summary
+            )
+
+    def tearDown(self):
+        """Clean up test database."""
+        if os.path.exists(self.temp_db.name):
+            os.unlink(self.temp_db.name)
+
+    def test_match_query_quotes_terms(self):
+        """Punctuation in user input is quoted rather than parsed."""
+        self.assertEqual(build_match_query('Next.js "app" rout*'), '"Next.js" """app""" "rout"*')
+        self.assertEqual(build_match_query("   "), "")
+
+    def test_ranked_results(self):
+        """Title matches rank above content-only matches."""
+        page = self.db.search("rust compile")
+        titles = [row["title"] for row in page["results"]]
+        self.assertEqual(titles, ["Rust compile times improve", "Cargo workspaces"])
+        self.assertIn("<mark>", page["results"][0]["snippet"])
+        self.assertEqual(page["results"][0]["keywords"], ["Rust"])
+
+    def test_filters(self):
+        """Keyword and date filters narrow the results."""
+        self.assertEqual(len(self.db.search("build", keyword="Python")["results"]), 1)
+        self.assertEqual(len(self.db.search("build", keyword="Rust")["results"]), 1)
+        self.assertEqual(len(self.db.search("rust", end_date="2000-01-01")["results"]), 0)
+
+    def test_keyset_pagination(self):
+        """Pages follow each other without overlap."""
+        first = self.db.search("compile", limit=1)
+        self.assertIsNotNone(first["next_cursor"])
+
+        second = self.db.search("compile", limit=1, after=decode_search_cursor(first["next_cursor"]))
+        self.assertIsNone(second["next_cursor"])
+        self.assertNotEqual(first["results"][0]["id"], second["results"][0]["id"])
+
+    def test_index_follows_updates_and_deletes(self):
+        """Triggers keep the index in sync with the articles table."""
+        with self.db.get_connection() as conn:
+            conn.execute("UPDATE articles SET title = 'Zig comptime' WHERE url = 'https://example.com/2'")
+            conn.execute("DELETE FROM articles WHERE url = 'https://example.com/0'")
+        self.assertEqual(len(self.db.search("zig")["results"]), 1)
+        self.assertEqual(len(self.db.search("python")["results"]), 0)
+        self.assertEqual(len(self.db.search("compile")["results"]), 1)
+
+    def test_search_endpoint(self):
+        """The endpoint validates input and returns a page of results."""
+        client = create_app(db=self.db).test_client()
+        self.assertEqual(client.get("/api/search").status_code, 400)
+        self.assertEqual(client.get("/api/search?q=rust&cursor=bad").status_code, 400)
+
+        response = client.get("/api/search?q=rust&limit=1")
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertTrue(data["success"])
+        self.assertEqual(data["count"], 1)
+        self.assertIsNotNone(data["next_cursor"])
+
+
+if __name__ == "__main__":
+    unittest.main()
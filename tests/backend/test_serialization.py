@@ -0,0 +1,80 @@
+"""Tests for fast JSON encoding and response compression."""
+import unittest
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from unittest import mock
+import numpy as np
+from backend.app import create_app
+from backend.api import serialization
+from backend.api.serialization import Rows, dumps
+from backend.database.db import Database
+
+
+class TestSerialization(unittest.TestCase):
+    """Test the serializer and the compressed API responses."""
+
+    def setUp(self):
+        """Set up test database with enough rows to cross the threshold."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = Database(db_path=os.path.join(self.temp_dir, "test.db"))
+        self.db.create_tables()
+        for i in range(20):
+            self.db.insert_sentiment(keyword="AI", source="news", title=f"title {i}",
+                                     content="content " * 20, url=f"u{i}",
+                                     sentiment_score=0.5, summary="summary")
+        self.client = create_app(db=self.db).test_client()
+
+    def tearDown(self):
+        """Clean up test database."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_rows_encode_like_dicts(self):
+        """Rows encode to the same JSON as the equivalent dicts."""
+        columns, rows = self.db.get_sentiment_rows()
+        self.assertEqual(json.loads(dumps(Rows(columns, rows))), self.db.get_sentiments())
+
+        table = json.loads(dumps(Rows(columns, rows, shape="table")))
+        self.assertEqual(table["columns"], columns)
+        self.assertEqual(len(table["rows"]), 20)
+        self.assertEqual(json.loads(dumps({"at": datetime(2024, 1, 2)})), {"at": "2024-01-02T00:00:00"})
+
+    def test_numpy_scalars(self):
+        """NumPy scalars encode as plain JSON values with and without orjson."""
+        value = {"mean": np.float64(0.25), "std": np.float32(0.5), "count": np.int64(3), "rising": np.bool_(True)}
+        expected = {"mean": 0.25, "std": 0.5, "count": 3, "rising": True}
+        self.assertEqual(json.loads(dumps(value)), expected)
+        with mock.patch.object(serialization, "orjson", None):
+            self.assertEqual(json.loads(dumps(value)), expected)
+
+    def test_large_response_is_gzipped(self):
+        """Large bodies are compressed when the client accepts gzip."""
+        response = self.client.get("/api/sentiments", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response.headers["Vary"])
+        data = json.loads(gzip.decompress(response.get_data()))
+        self.assertEqual(data["count"], 20)
+
+        plain = self.client.get("/api/sentiments")
+        self.assertNotIn("Content-Encoding", plain.headers)
+        self.assertEqual(plain.get_json()["data"], data["data"])
+
+    def test_small_response_is_not_compressed(self):
+        """Bodies under the threshold are sent as-is."""
+        response = self.client.get("/api/health", headers={"Accept-Encoding": "gzip"})
+        self.assertNotIn("Content-Encoding", response.headers)
+
+    def test_table_shape(self):
+        """shape=table returns columns and row arrays; unknown shapes are rejected."""
+        data = self.client.get("/api/sentiments?shape=table&limit=2").get_json()
+        self.assertIn("keyword", data["data"]["columns"])
+        self.assertEqual(len(data["data"]["rows"]), 2)
+        self.assertEqual(data["count"], 2)
+        self.assertEqual(self.client.get("/api/sentiments?shape=xml").status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
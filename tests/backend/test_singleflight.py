@@ -0,0 +1,127 @@
+"""Tests for request coalescing."""
+import unittest
+import os
+import shutil
+import tempfile
+import threading
+import time
+from backend.api import singleflight
+from backend.api.singleflight import SingleFlight
+from backend.app import create_app
+from backend.database.db import Database
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Test that concurrent identical calls share one computation."""
+
+    def _run_concurrently(self, flight, key, compute, count):
+        results, errors = [], []
+
+        def worker():
+            try:
+                results.append(flight.do(key, compute))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        return threads, results, errors
+
+    def test_concurrent_calls_share_result(self):
+        """Only the first caller computes; the rest wait and share."""
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            return {"value": 42}
+
+        threads, results, _ = self._run_concurrently(flight, "k", compute, 8)
+        while flight.metrics()["requests"] < 8:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([r[0] for r in results], [{"value": 42}] * 8)
+        self.assertEqual(sum(shared for _, shared in results), 7)
+        metrics = flight.metrics()
+        self.assertEqual((metrics["executions"], metrics["coalesced"]), (1, 7))
+        self.assertEqual(metrics["coalescing_ratio"], 0.875)
+        self.assertEqual(metrics["in_flight"], 0)
+
+        # Nothing is cached once the call has finished
+        self.assertEqual(flight.do("k", lambda: 1), (1, False))
+
+    def test_errors_reach_every_waiter(self):
+        """An exception in the shared computation is raised to all callers."""
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def compute():
+            release.wait(5)
+            raise RuntimeError("db down")
+
+        threads, results, errors = self._run_concurrently(flight, "k", compute, 3)
+        while flight.metrics()["requests"] < 3:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(errors), 3)
+        self.assertFalse(results)
+
+    def test_reset_after_fork(self):
+        """Forked workers start without inherited in-flight calls."""
+        flight = SingleFlight()
+        flight._calls["stale"] = object()
+        singleflight._reset_after_fork()
+        self.assertEqual(flight.metrics()["in_flight"], 0)
+
+
+class TestCoalescedEndpoints(unittest.TestCase):
+    """Test coalescing through the API."""
+
+    def setUp(self):
+        """Set up test database with a slow stats query."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = Database(db_path=os.path.join(self.temp_dir, "test.db"))
+        self.db.create_tables()
+        stats = self.db.get_advanced_stats
+
+        def slow_stats():
+            time.sleep(0.2)
+            return stats()
+
+        self.db.get_advanced_stats = slow_stats
+        self.app = create_app(db=self.db)
+
+    def tearDown(self):
+        """Clean up test database."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_stats_requests_are_coalesced(self):
+        """Concurrent /api/stats requests run the query once."""
+        responses = []
+
+        def request():
+            responses.append(self.app.test_client().get("/api/stats").get_json())
+
+        threads = [threading.Thread(target=request) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertTrue(all(r["success"] for r in responses))
+        metrics = self.app.test_client().get("/api/metrics").get_json()["single_flight"]
+        self.assertEqual(metrics["requests"], 5)
+        self.assertLess(metrics["executions"], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+"""Tests for ETL run traces."""
+import unittest
+import os
+import shutil
+import tempfile
+from backend.app import create_app
+from backend.database.db import Database
+from backend.etl import tracing
+from backend.etl.load import DataLoader
+from backend.etl.tracing import RunTrace, diff_runs
+
+
+class FakeClock:
+    """Clock advanced by hand."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRunTrace(unittest.TestCase):
+    """Test timing attribution of a trace."""
+
+    def setUp(self):
+        """Set up a trace on a fake clock."""
+        self.clock = FakeClock()
+        self.trace = RunTrace("etl", ["AI", "Rust"], run_id="run-1", clock=self.clock)
+
+    def _spend(self, category, seconds):
+        with tracing.span(category):
+            self.clock.now += seconds
+
+    def test_time_split(self):
+        """Blocked time is attributed to the run, its stage and its keyword."""
+        with self.trace:
+            with self.trace.stage("extract"):
+                self._spend("network", 2)
+                self.clock.now += 1
+            with self.trace.stage("transform"):
+                with tracing.keyword("AI"):
+                    self._spend("llm", 3)
+                    self._spend("sleep", 1)
+                    tracing.count("items", 2)
+                    tracing.count("retries")
+
+        data = self.trace.to_dict()
+        self.assertEqual(data["status"], "ok")
+        self.assertEqual(data["duration"], 7)
+        self.assertEqual(data["totals"], {"sleep": 1, "network": 2, "llm": 3, "sqlite": 0, "other": 1})
+        self.assertEqual(data["stages"]["extract"]["wall"], 3)
+        self.assertEqual(data["stages"]["extract"]["other"], 1)
+        self.assertEqual(data["stages"]["transform"]["llm"], 3)
+        self.assertEqual(data["per_keyword"]["AI"]["wall"], 4)
+        self.assertEqual(data["per_keyword"]["AI"]["items"], 2)
+        self.assertEqual(data["counters"], {"items": 2, "retries": 1})
+        self.assertAlmostEqual(data["items_per_second"], 2 / 7, places=4)
+
+    def test_helpers_are_noops_without_trace(self):
+        """Instrumented code runs unchanged outside a traced run."""
+        with tracing.keyword("AI"), tracing.span("network"):
+            tracing.count("items")
+        self.assertIsNone(tracing.current())
+        self.assertEqual(self.trace.counters, {})
+
+    def test_failed_run(self):
+        """An exception marks the run failed and still ends the trace."""
+        with self.assertRaises(ValueError):
+            with self.trace:
+                raise ValueError("boom")
+        self.assertEqual(self.trace.status, "failed")
+        self.assertIn("boom", self.trace.error)
+        self.assertIsNone(tracing.current())
+
+    def test_diff(self):
+        """Diff rows compare every metric and give the relative change."""
+        with self.trace:
+            self._spend("sleep", 4)
+        other = RunTrace("etl", run_id="run-2", clock=self.clock)
+        with other:
+            self._spend("sleep", 2)
+        rows = {row["metric"]: row for row in diff_runs(self.trace.to_dict(), other.to_dict())}
+        self.assertEqual(rows["time.sleep"]["delta"], -2)
+        self.assertEqual(rows["time.sleep"]["change"], -0.5)
+        self.assertIsNone(rows["items"]["change"])
+
+
+class TestRunStorage(unittest.TestCase):
+    """Test persisting traces and serving them."""
+
+    def setUp(self):
+        """Set up test database."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = Database(db_path=os.path.join(self.temp_dir, "test.db"))
+        self.db.create_tables()
+        self.client = create_app(db=self.db).test_client()
+
+    def tearDown(self):
+        """Clean up test database."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_loader_is_traced(self):
+        """Loading counts items and SQLite time under the record's keyword."""
+        trace = RunTrace("etl", ["AI"], run_id="run-1")
+        with trace:
+            with trace.stage("load"):
+                stats = DataLoader(db=self.db).load_batch([{
+                    "keyword": "AI", "source": "news", "title": "t", "content": "c",
+                    "url": "u1", "sentiment_score": 0.5, "summary": "s"
+                }])
+        self.assertEqual(stats["loaded"], 1)
+        self.assertTrue(trace.save(self.db))
+
+        stored = self.db.get_etl_run("run-1")
+        self.assertEqual(stored["items"], 1)
+        self.assertEqual(stored["per_keyword"]["AI"]["items"], 1)
+        self.assertGreater(stored["stages"]["load"]["sqlite"], 0)
+
+    def test_runs_endpoint(self):
+        """Runs are listed newest first; a single run includes its detail."""
+        for run_id in ("run-1", "run-2"):
+            trace = RunTrace("etl", run_id=run_id)
+            with trace:
+                with trace.stage("extract"):
+                    pass
+            trace.save(self.db)
+
+        data = self.client.get("/api/etl/runs").get_json()
+        self.assertEqual([run["run_id"] for run in data["data"]], ["run-2", "run-1"])
+        self.assertNotIn("stages", data["data"][0])
+
+        run = self.client.get("/api/etl/runs/run-1").get_json()["data"]
+        self.assertIn("extract", run["stages"])
+        self.assertEqual(self.client.get("/api/etl/runs/missing").status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+"""Tests for lease-based ETL workers."""
+import unittest
+import os
+import shutil
+import tempfile
+import threading
+from backend.database.db import Database
+from backend.etl.workers import LeaseQueue, run_worker
+
+
+class FakeClock:
+    """Manually advanced time source."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLeases(unittest.TestCase):
+    """Test claiming, heartbeats, expiry and progress."""
+
+    def setUp(self):
+        """Set up test database and a queue with three items."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = Database(db_path=os.path.join(self.temp_dir, "test.db"))
+        self.db.create_tables()
+        self.clock = FakeClock()
+        self.queue = LeaseQueue(self.db, "run", lease_ttl=60, max_attempts=2, clock=self.clock)
+        self.assertEqual(self.queue.enqueue(["AI", "Python", "Rust"]), 3)
+
+    def tearDown(self):
+        """Clean up test database."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_claims_are_exclusive(self):
+        """Every item is handed out once while its lease is alive."""
+        self.assertEqual(self.queue.enqueue(["AI"]), 0)
+        claimed = [self.queue.claim(f"w{i}") for i in range(4)]
+        self.assertEqual(sorted(c["item"] for c in claimed[:3]), ["AI", "Python", "Rust"])
+        self.assertIsNone(claimed[3])
+
+    def test_expired_lease_is_reclaimed(self):
+        """A crashed worker's item goes to another worker after the TTL."""
+        lost = self.queue.claim("crashed")
+        self.queue.claim("w1")
+        self.queue.claim("w1")
+        self.clock.now += 30
+        self.assertIsNone(self.queue.claim("w2"))
+        self.assertTrue(self.queue.heartbeat(lost["token"], {"extracted": 5}))
+
+        self.clock.now += 61
+        reclaimed = self.queue.claim("w2")
+        self.assertEqual(reclaimed["item"], lost["item"])
+        self.assertFalse(self.queue.heartbeat(lost["token"]))
+        self.assertFalse(self.queue.finish(lost["token"], {"loaded": 1}))
+        self.assertTrue(self.queue.finish(reclaimed["token"], {"loaded": 2}))
+
+    def test_items_fail_after_max_attempts(self):
+        """An item whose lease keeps expiring is eventually marked failed."""
+        for _ in range(2):
+            self.queue.claim("crashy")
+            self.queue.claim("crashy")
+            self.queue.claim("crashy")
+            self.clock.now += 61
+        self.assertIsNone(self.queue.claim("w"))
+        progress = self.queue.progress()
+        self.assertEqual(progress["failed"], 3)
+        self.assertIn("AI", progress["failures"])
+
+    def test_workers_drain_queue(self):
+        """Concurrent workers process every item once and progress adds up."""
+        queue = LeaseQueue(self.db, "run", lease_ttl=60)
+        seen = []
+        lock = threading.Lock()
+
+        def handler(item, report):
+            report({"extracted": 2})
+            with lock:
+                seen.append(item)
+            if item == "Rust":
+                raise RuntimeError("boom")
+            return {"extracted": 2, "loaded": 1, "linked": 0, "errors": 0}
+
+        threads = [threading.Thread(target=run_worker, args=(queue, f"w{i}", handler)) for i in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(seen), ["AI", "Python", "Rust"])
+        progress = queue.progress()
+        self.assertEqual((progress["done"], progress["failed"], progress["loaded"]), (2, 1, 2))
+        self.assertEqual(progress["extracted"], 6)
+        self.assertIn("boom", progress["failures"]["Rust"])
+
+
+if __name__ == "__main__":
+    unittest.main()